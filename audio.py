@@ -0,0 +1,65 @@
+"""Sound effects shared by the Tk apps.
+
+A SoundBank decodes its files once and plays them on a few reserved
+pygame channels. Channel.play returns at once because pygame mixes on its
+own thread, so the Tk thread never waits on disk or the decoder. A sound
+started again within min_interval of its last start is dropped, and so
+is a sound that finds every channel busy. Fast typing therefore never
+builds up a backlog. Without pygame or the files, play() returns after
+one attribute check.
+"""
+
+import os
+import time
+
+
+class SoundBank:
+    def __init__(self, paths, channels=4, min_interval=0.03):
+        self.paths = list(paths)
+        self.channel_count = channels
+        self.min_interval = min_interval
+        self.sounds = {}
+        self.channels = []
+        self.last_played = {}
+        self.enabled = None  # unknown until preload()
+
+    def preload(self):
+        """Import pygame, start the mixer and decode every file that exists."""
+        if self.enabled is not None:
+            return self.enabled
+        self.enabled = False
+        try:
+            import pygame
+
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            if pygame.mixer.get_num_channels() < self.channel_count:
+                pygame.mixer.set_num_channels(self.channel_count)
+            # Reserved channels are left alone by pygame's automatic channel picking
+            pygame.mixer.set_reserved(self.channel_count)
+            self.channels = [pygame.mixer.Channel(n) for n in range(self.channel_count)]
+            for path in self.paths:
+                if os.path.exists(path):
+                    self.sounds[path] = pygame.mixer.Sound(path)
+        except Exception:  # no pygame, no audio device or an unreadable file
+            self.sounds.clear()
+            return False
+        self.enabled = bool(self.sounds)
+        return self.enabled
+
+    def play(self, path):
+        if self.enabled is False:
+            return
+        if self.enabled is None and not self.preload():
+            return
+        sound = self.sounds.get(path)
+        if sound is None:
+            return
+        now = time.perf_counter()
+        if now - self.last_played.get(path, 0.0) < self.min_interval:
+            return
+        for channel in self.channels:
+            if not channel.get_busy():
+                channel.play(sound)
+                self.last_played[path] = now
+                return
@@ -1,15 +1,19 @@
 import tkinter as tk
 from tkinter import messagebox
 import random
-import time
+
+from tictactoe.board_canvas import BoardCanvas
+from tictactoe.transposition import TABLE, board_key, probe_window, store_result
+from tictactoe.worker import SearchWorker
 
 # Initialize variables
 board = [[" " for _ in range(3)] for _ in range(3)]
-buttons = [[None for _ in range(3)] for _ in range(3)]
+canvas = None
 player_first = True
 player_score = 0
 ai_score = 0
 draw_score = 0
+pending_ai = None
 
 # Minimax with Alpha-Beta Pruning
 def is_full(b):
@@ -34,6 +38,12 @@ def minimax(b, depth, is_max, alpha, beta):
     if winner == "O": return -1
     if is_full(b): return 0
 
+    key, _ = board_key(b, is_max)
+    score, alpha, beta = probe_window(TABLE, key, alpha, beta)
+    if score is not None:
+        return score
+    window = (alpha, beta)
+
     if is_max:
         max_eval = -float('inf')
         for i in range(3):
@@ -46,6 +56,9 @@ def minimax(b, depth, is_max, alpha, beta):
                     alpha = max(alpha, eval)
                     if beta <= alpha:
                         break
+            if beta <= alpha:
+                break
+        store_result(TABLE, key, max_eval, window)
         return max_eval
     else:
         min_eval = float('inf')
@@ -59,29 +72,31 @@ def minimax(b, depth, is_max, alpha, beta):
                     beta = min(beta, eval)
                     if beta <= alpha:
                         break
+            if beta <= alpha:
+                break
+        store_result(TABLE, key, min_eval, window)
         return min_eval
 
-def best_move():
+def best_move(b=None, stop=None):
+    # The GUI passes a copy of the board and runs this on a worker thread.
+    # A cancelled search stops between root moves; its result is dropped.
+    b = board if b is None else b
     best_val = -float('inf')
     move = (-1, -1)
     for i in range(3):
         for j in range(3):
-            if board[i][j] == " ":
-                board[i][j] = "X"
-                move_val = minimax(board, 0, False, -float('inf'), float('inf'))
-                board[i][j] = " "
+            if stop is not None and stop.is_set():
+                return move
+            if b[i][j] == " ":
+                b[i][j] = "X"
+                move_val = minimax(b, 0, False, -float('inf'), float('inf'))
+                b[i][j] = " "
                 if move_val > best_val:
                     move = (i, j)
                     best_val = move_val
     return move
 
-# GUI
-root = tk.Tk()
-root.title("Tic Tac Toe - AI vs Player")
-
-score_label = tk.Label(root, text="Player: 0  AI: 0  Draws: 0", font=("Arial", 14))
-score_label.grid(row=5, column=0, columnspan=3)
-
+# GUI (built under __main__ so the search functions import without a window)
 def update_scoreboard():
     score_label.config(text=f"Player: {player_score}  AI: {ai_score}  Draws: {draw_score}")
 
@@ -98,23 +113,46 @@ def get_winning_line(b):
         return [(0, 2), (1, 1), (2, 0)]
     return []
 
+def ai_busy():
+    return pending_ai is not None or worker.busy()
+
+def schedule_ai_move():
+    global pending_ai
+    pending_ai = root.after(300, start_ai_move)
+
+def start_ai_move():
+    global pending_ai
+    pending_ai = None
+    worker.submit(best_move, place_ai_move, [row[:] for row in board], on_error=ai_failed)
+
+def ai_failed(error):
+    # The human may move again rather than wait for a move that will never arrive
+    messagebox.showerror("AI error", f"The AI could not move: {error}")
+
+def cancel_ai_move():
+    global pending_ai
+    if pending_ai is not None:
+        root.after_cancel(pending_ai)
+        pending_ai = None
+    worker.cancel()
+
+def place_ai_move(move):
+    ai_i, ai_j = move
+    board[ai_i][ai_j] = "X"
+    canvas.set_cell(ai_i, ai_j, "X")
+    winner = check_winner(board)
+    if winner or is_full(board):
+        end_game()
+
 def button_click(i, j):
-    global player_score, ai_score, draw_score
-    if board[i][j] == " " and check_winner(board) is None:
+    if board[i][j] == " " and check_winner(board) is None and not ai_busy():
         board[i][j] = "O"
-        buttons[i][j].config(text="O", state="disabled")
+        canvas.set_cell(i, j, "O")
         winner = check_winner(board)
         if winner or is_full(board):
             end_game()
         else:
-            root.update()
-            time.sleep(0.3)
-            ai_i, ai_j = best_move()
-            board[ai_i][ai_j] = "X"
-            buttons[ai_i][ai_j].config(text="X", state="disabled")
-            winner = check_winner(board)
-            if winner or is_full(board):
-                end_game()
+            schedule_ai_move()
 
 def end_game():
     global player_score, ai_score, draw_score
@@ -129,22 +167,16 @@ def end_game():
         draw_score += 1
         messagebox.showinfo("Game Over", "It's a draw!")
 
-    for (i, j) in get_winning_line(board):
-        buttons[i][j].config(bg="lightgreen")
+    canvas.highlight(get_winning_line(board))
     update_scoreboard()
 
 def reset_board():
     global board
+    cancel_ai_move()
     board = [[" " for _ in range(3)] for _ in range(3)]
-    for i in range(3):
-        for j in range(3):
-            buttons[i][j].config(text=" ", bg="white", state="normal")
+    canvas.clear()
     if not player_first:
-        root.update()
-        time.sleep(0.3)
-        ai_i, ai_j = best_move()
-        board[ai_i][ai_j] = "X"
-        buttons[ai_i][ai_j].config(text="X", state="disabled")
+        schedule_ai_move()
 
 def choose_player():
     global player_first
@@ -152,19 +184,22 @@ def choose_player():
     player_first = response
     reset_board()
 
-for i in range(3):
-    for j in range(3):
-        b = tk.Button(root, text=" ", width=5, height=2, font=("Segoe UI", 24, "bold"),
-                      bg="white", fg="black", activebackground="lightblue",
-                      command=lambda i=i, j=j: button_click(i, j))
-        b.grid(row=i, column=j)
-        buttons[i][j] = b
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Tic Tac Toe - AI vs Player")
+    worker = SearchWorker(root)
+
+    score_label = tk.Label(root, text="Player: 0  AI: 0  Draws: 0", font=("Arial", 14))
+    score_label.grid(row=5, column=0, columnspan=3)
+
+    canvas = BoardCanvas(root, size=3, cell=110, on_click=button_click, font_family="Segoe UI")
+    canvas.grid(row=0, column=0, rowspan=3, columnspan=3)
 
-reset_button = tk.Button(root, text="Reset Game", font=("Arial", 14), command=reset_board)
-reset_button.grid(row=4, column=0, columnspan=1)
+    reset_button = tk.Button(root, text="Reset Game", font=("Arial", 14), command=reset_board)
+    reset_button.grid(row=4, column=0, columnspan=1)
 
-choose_button = tk.Button(root, text="Choose Player First", font=("Arial", 14), command=choose_player)
-choose_button.grid(row=4, column=1, columnspan=2)
+    choose_button = tk.Button(root, text="Choose Player First", font=("Arial", 14), command=choose_player)
+    choose_button.grid(row=4, column=1, columnspan=2)
 
-choose_player()
-root.mainloop()
\ No newline at end of file
+    choose_player()
+    root.mainloop()
@@ -2,6 +2,9 @@ import tkinter as tk
 from tkinter import messagebox
 import random
 
+from tictactoe.board_canvas import BoardCanvas
+from tictactoe.transposition import TABLE, board_key, probe_window, store_result
+
 # Constants for players
 HUMAN = "O"
 AI = "X"
@@ -14,7 +17,7 @@ class TicTacToe:
         self.root = root
         self.root.title("Tic Tac Toe with AI (Alpha-Beta Pruning)")
         self.board = [[" " for _ in range(3)] for _ in range(3)]
-        self.buttons = [[None for _ in range(3)] for _ in range(3)]
+        self.canvas = None
         self.current_player = HUMAN
         self.ai_player = AI
         self.first_player = tk.StringVar(value=HUMAN)
@@ -35,14 +38,8 @@ class TicTacToe:
         tk.Button(menu_frame, text="Reset Game", command=self.reset_game).pack(side=tk.LEFT)
 
     def create_board(self):
-        board_frame = tk.Frame(self.root)
-        board_frame.grid(row=2, column=0, columnspan=3)
-        for i in range(3):
-            for j in range(3):
-                btn = tk.Button(board_frame, text=" ", font=("Arial", 32), width=4, height=2,
-                                command=lambda r=i, c=j: self.make_move(r, c))
-                btn.grid(row=i, column=j)
-                self.buttons[i][j] = btn
+        self.canvas = BoardCanvas(self.root, size=3, cell=120, on_click=self.make_move)
+        self.canvas.grid(row=2, column=0, columnspan=3, pady=5)
 
     def create_scoreboard(self):
         self.score_label = tk.Label(self.root, text=self.get_score_text(), font=("Arial", 12))
@@ -57,11 +54,7 @@ class TicTacToe:
 
     def reset_game(self):
         self.board = [[" " for _ in range(3)] for _ in range(3)]
-        for i in range(3):
-            for j in range(3):
-                self.buttons[i][j]["text"] = " "
-                self.buttons[i][j]["bg"] = "SystemButtonFace"
-                self.buttons[i][j]["state"] = "normal"
+        self.canvas.clear()
         self.status_label.config(text=f"{self.current_player}'s turn")
         if self.first_player.get() == AI:
             self.root.after(500, self.ai_move)
@@ -69,7 +62,7 @@ class TicTacToe:
     def make_move(self, row, col):
         if self.board[row][col] == " ":
             self.board[row][col] = self.current_player
-            self.buttons[row][col]["text"] = self.current_player
+            self.canvas.set_cell(row, col, self.current_player)
             if self.check_game_over():
                 return
             self.current_player = AI if self.current_player == HUMAN else HUMAN
@@ -101,6 +94,12 @@ class TicTacToe:
         elif self.is_full():
             return 0
 
+        key, _ = board_key(board, is_max)
+        score, alpha, beta = probe_window(TABLE, key, alpha, beta)
+        if score is not None:
+            return score
+        window = (alpha, beta)
+
         if is_max:
             best = float('-inf')
             for i in range(3):
@@ -112,7 +111,8 @@ class TicTacToe:
                         alpha = max(alpha, best)
                         if beta <= alpha:
                             break
-            return best
+                if beta <= alpha:
+                    break
         else:
             best = float('inf')
             for i in range(3):
@@ -124,7 +124,10 @@ class TicTacToe:
                         beta = min(beta, best)
                         if beta <= alpha:
                             break
-            return best
+                if beta <= alpha:
+                    break
+        store_result(TABLE, key, best, window)
+        return best
 
     def check_winner(self):
         # Rows, cols, diagonals
@@ -160,26 +163,20 @@ class TicTacToe:
     def highlight_winner(self, winner):
         for i in range(3):
             if self.board[i][0] == self.board[i][1] == self.board[i][2] == winner:
-                for j in range(3):
-                    self.buttons[i][j]["bg"] = "lightgreen"
+                self.canvas.highlight([(i, 0), (i, 2)])
                 return
             if self.board[0][i] == self.board[1][i] == self.board[2][i] == winner:
-                for j in range(3):
-                    self.buttons[j][i]["bg"] = "lightgreen"
+                self.canvas.highlight([(0, i), (2, i)])
                 return
         if self.board[0][0] == self.board[1][1] == self.board[2][2] == winner:
-            for i in range(3):
-                self.buttons[i][i]["bg"] = "lightgreen"
+            self.canvas.highlight([(0, 0), (2, 2)])
             return
         if self.board[0][2] == self.board[1][1] == self.board[2][0] == winner:
-            for i in range(3):
-                self.buttons[i][2 - i]["bg"] = "lightgreen"
+            self.canvas.highlight([(0, 2), (2, 0)])
             return
 
     def end_game(self):
-        for i in range(3):
-            for j in range(3):
-                self.buttons[i][j]["state"] = "disabled"
+        self.canvas.set_enabled(False)
         self.score_label.config(text=self.get_score_text())
 
 
@@ -1,34 +1,60 @@
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import messagebox, simpledialog
 import random
 import time
 import threading
+from functools import partial
 
-# Try to load sound (optional)
-try:
-    import pygame
-    pygame.init()
-    SOUND_ENABLED = True
-    CLICK_SOUND = "click.wav"  # Add your sound files
-    WIN_SOUND = "win.wav"
-except:
-    SOUND_ENABLED = False
+from audio import SoundBank
+
+from tictactoe import engines, mcts, nxn, records, tablebase
+from tictactoe.board_canvas import BoardCanvas
+from tictactoe.instrument import SearchStats, append_trace
+from tictactoe.ponder import Ponderer
+from tictactoe.worker import SearchWorker
+
+# Optional sound effects; silent without pygame or the files
+CLICK_SOUND = "click.wav"  # Add your sound files
+WIN_SOUND = "win.wav"
+
+# Board modes: (size, k in a row, cell size in pixels)
+BOARD_MODES = {
+    "3x3": (3, 3, 110),
+    "4x4": (4, 4, 85),
+    "15x15 (5 in a row)": (15, 5, 34),
+    "19x19 (5 in a row)": (19, 5, 28),
+}
+AI_BUDGET = {"Medium": 0.2, "Hard": 1.5}  # seconds per move on larger boards
+MCTS_BUDGET = {3: 0.3, 4: 1.0}  # seconds per MCTS move by board size, 1.5 otherwise
+TRACE_FILE = "search_trace.jsonl"  # one search record per AI move while Debug is on
+GAMES_FILE = "games.ttr"  # finished 3x3 and 4x4 games, see tictactoe/records.py
+REPLAY_MS = 600
 
 # Main Game Class
 class TicTacToe:
     def __init__(self, root):
         self.root = root
         self.root.title("Tic Tac Toe with Alpha-Beta Pruning")
+        self.size, self.k = 3, 3
         self.board = [[" " for _ in range(3)] for _ in range(3)]
-        self.buttons = [[None]*3 for _ in range(3)]
+        self.canvas = None
         self.player_turn = True
         self.first_player = tk.StringVar(value="Human")
         self.difficulty = tk.StringVar(value="Hard")
+        self.board_mode = tk.StringVar(value="3x3")
+        self.debug = tk.BooleanVar(value=False)
+        self.ponder = tk.BooleanVar(value=True)
         self.score = {"Human": 0, "AI": 0, "Draws": 0}
         self.history = []
+        self.worker = SearchWorker(root)
+        self.ponderer = Ponderer(root, self.ponder_reply)
+        self.pending_ai = None
+        self.pending_replay = None
+        self.sounds = SoundBank([CLICK_SOUND, WIN_SOUND], channels=2)
 
         self.create_widgets()
         self.reset_board(first_time=True)
+        self.root.after_idle(self.sounds.preload)
 
     def create_widgets(self):
         # Top Controls
@@ -39,35 +65,41 @@ class TicTacToe:
         tk.OptionMenu(control_frame, self.first_player, "Human", "AI").pack(side=tk.LEFT, padx=5)
 
         tk.Label(control_frame, text="Difficulty:").pack(side=tk.LEFT)
-        tk.OptionMenu(control_frame, self.difficulty, "Easy", "Medium", "Hard").pack(side=tk.LEFT, padx=5)
+        tk.OptionMenu(control_frame, self.difficulty, "Easy", "Medium", "Hard", "MCTS").pack(side=tk.LEFT, padx=5)
+
+        tk.Label(control_frame, text="Board:").pack(side=tk.LEFT)
+        tk.OptionMenu(control_frame, self.board_mode, *BOARD_MODES,
+                      command=lambda _: self.reset_board()).pack(side=tk.LEFT, padx=5)
 
         tk.Button(control_frame, text="New Game", command=self.reset_board).pack(side=tk.LEFT, padx=5)
         tk.Button(control_frame, text="Undo", command=self.undo_move).pack(side=tk.LEFT, padx=5)
+        tk.Button(control_frame, text="Replay", command=self.replay_game).pack(side=tk.LEFT, padx=5)
+        tk.Checkbutton(control_frame, text="Ponder", variable=self.ponder,
+                       command=self.start_pondering).pack(side=tk.LEFT, padx=5)
+        tk.Checkbutton(control_frame, text="Debug", variable=self.debug,
+                       command=lambda: self.debug_label.config(text="")).pack(side=tk.LEFT, padx=5)
 
-        # Board Frame
-        board_frame = tk.Frame(self.root)
-        board_frame.pack()
-
-        for i in range(3):
-            for j in range(3):
-                btn = tk.Button(board_frame, text=" ", width=6, height=3,
-                                font=("Arial", 20), command=lambda i=i, j=j: self.make_move(i, j))
-                btn.grid(row=i, column=j, padx=5, pady=5)
-                self.buttons[i][j] = btn
+        # Board
+        self.canvas = BoardCanvas(self.root, on_click=self.make_move)
+        self.canvas.pack(padx=10)
+        self.build_board()
 
         # Status and Score
         self.status_label = tk.Label(self.root, text="", font=("Arial", 14))
         self.status_label.pack(pady=10)
 
+        self.debug_label = tk.Label(self.root, text="", font=("Courier", 9), fg="gray30")
+        self.debug_label.pack()
+
         self.score_label = tk.Label(self.root, text="", font=("Arial", 12))
         self.score_label.pack()
 
+    def build_board(self):
+        self.size, self.k, cell = BOARD_MODES[self.board_mode.get()]
+        self.canvas.resize(self.size, cell)
+
     def play_sound(self, sound):
-        if SOUND_ENABLED:
-            try:
-                pygame.mixer.Sound(sound).play()
-            except:
-                pass
+        self.sounds.play(sound)
 
     def update_status(self, msg):
         self.status_label.config(text=msg)
@@ -76,59 +108,162 @@ class TicTacToe:
         self.score_label.config(text=f"Human: {self.score['Human']}  |  AI: {self.score['AI']}  |  Draws: {self.score['Draws']}")
 
     def reset_board(self, first_time=False):
-        self.board = [[" " for _ in range(3)] for _ in range(3)]
+        self.cancel_ai()
+        self.ponderer.clear()
+        if BOARD_MODES[self.board_mode.get()][:2] != (self.size, self.k):
+            self.build_board()
+        self.board = [[" " for _ in range(self.size)] for _ in range(self.size)]
         self.history.clear()
-        self.player_turn = self.first_player.get() == "Human"
-        for i in range(3):
-            for j in range(3):
-                btn = self.buttons[i][j]
-                btn.config(text=" ", state=tk.NORMAL, bg="SystemButtonFace")
+        self.ai_first = self.first_player.get() != "Human"  # of this game; the menu may change mid-game
+        self.player_turn = not self.ai_first
+        self.canvas.clear()
         self.update_status("Your turn!" if self.player_turn else "AI is thinking...")
         self.update_scoreboard()
-        if not self.player_turn and not first_time:
-            self.root.after(500, self.ai_move)
+        if self.player_turn:
+            self.start_pondering()
+        elif not first_time:
+            self.schedule_ai()
 
     def make_move(self, i, j):
         if self.board[i][j] == " " and self.player_turn:
             self.board[i][j] = "O"
             self.history.append((i, j))
-            self.buttons[i][j].config(text="O")
+            self.canvas.set_cell(i, j, "O")
+            self.ponderer.cancel()
             self.play_sound(CLICK_SOUND)
             if self.check_game("O"):
                 return
             self.player_turn = False
             self.update_status("AI is thinking...")
-            self.root.after(500, self.ai_move)
+            self.schedule_ai()
 
     def undo_move(self):
-        if self.history:
-            last = self.history.pop()
-            self.board[last[0]][last[1]] = " "
-            self.buttons[last[0]][last[1]].config(text=" ", bg="SystemButtonFace")
-            self.player_turn = not self.player_turn
-            self.update_status("Your turn!" if self.player_turn else "AI is thinking...")
+        self.cancel_ai()
+        # Take back the AI reply together with the human move before it
+        while self.history:
+            i, j = self.history.pop()
+            mark = self.board[i][j]
+            self.board[i][j] = " "
+            if mark == "O":
+                break
+        self.canvas.sync(self.board)  # redraws only the cells that were taken back
+        self.canvas.clear_highlight()
+        self.canvas.set_enabled(True)
+        if self.ai_first and not self.history:
+            # Back to the start of a game the AI opens, so the AI moves again
+            self.player_turn = False
+            self.update_status("AI is thinking...")
+            self.schedule_ai()
+            return
+        self.player_turn = True
+        self.update_status("Your turn!")
+        self.start_pondering()
+
+    def schedule_ai(self):
+        # A pondered reply is played straight away
+        hit = self.ponder.get() and self.ponderer.ready(self.board, self.difficulty.get())
+        self.pending_ai = self.root.after(50 if hit else 500, self.ai_move)
+
+    def start_pondering(self):
+        self.ponderer.cancel()
+        if self.ponder.get() and self.player_turn and self.difficulty.get() != "Easy":
+            last = self.history[-1] if self.history else None
+            self.ponderer.start(self.board, self.difficulty.get(), last)
+
+    def ponder_reply(self, board, level, stop=None):
+        # Runs on the ponder thread; boards the human move ends are skipped. MCTS
+        # ponders in-process so it never holds the pool the real move needs.
+        if self.check_winner(board) or all(cell != " " for row in board for cell in row):
+            return None
+        return self.get_ai_move(board, level, stop=stop, workers=1)
+
+    def cancel_ai(self):
+        if self.pending_ai is not None:
+            self.root.after_cancel(self.pending_ai)
+            self.pending_ai = None
+        if self.pending_replay is not None:
+            self.root.after_cancel(self.pending_replay)
+            self.pending_replay = None
+        self.worker.cancel()
+        self.ponderer.cancel()
 
     def ai_move(self):
-        i, j = self.get_ai_move()
+        # Search a snapshot on a worker thread; the window stays responsive meanwhile
+        self.pending_ai = None
+        board = [row[:] for row in self.board]
+        level = self.difficulty.get()
+        stats = SearchStats(level) if self.debug.get() else None
+        started = time.perf_counter()
+        move = self.ponderer.take(board, level) if self.ponder.get() else None
+        if move is not None:
+            if stats is not None:
+                stats.source = "ponder"
+            self.place_ai_move(move, stats, started)
+            return
+        self.worker.submit(partial(self.get_ai_move, stats=stats),
+                           lambda move: self.place_ai_move(move, stats, started), board, level,
+                           on_error=self.ai_failed)
+
+    def ai_failed(self, error):
+        # Give the turn back rather than wait for a move that will never arrive
+        self.canvas.set_enabled(True)
+        self.player_turn = True
+        self.update_status(f"AI move failed ({error}); your turn")
+
+    def place_ai_move(self, move, stats=None, started=None):
+        i, j = move
         self.board[i][j] = "X"
-        self.buttons[i][j].config(text="X")
+        self.history.append((i, j))
+        self.canvas.set_cell(i, j, "X")
+        if stats is not None:
+            self.report_search(stats, move, started)
         self.play_sound(CLICK_SOUND)
         if self.check_game("X"):
             return
         self.player_turn = True
         self.update_status("Your turn!")
+        self.start_pondering()
 
-    def get_ai_move(self):
-        empty = [(i, j) for i in range(3) for j in range(3) if self.board[i][j] == " "]
-        level = self.difficulty.get()
+    def report_search(self, stats, move, started):
+        record = stats.record(board_size=self.size, move=list(move),
+                              move_ms=round((time.perf_counter() - started) * 1000, 3),
+                              history=[list(m) for m in self.history],
+                              ponder_hits=self.ponderer.hits, ponder_misses=self.ponderer.misses)
+        self.debug_label.config(text=f"{stats.summary()} | {self.ponderer.summary()}")
+        try:
+            append_trace(TRACE_FILE, record)
+        except OSError:
+            pass
+
+    def get_ai_move(self, board=None, level=None, stop=None, stats=None, workers=None):
+        # Called on the worker thread with a board snapshot, so no Tk access here
+        board = self.board if board is None else board
+        level = self.difficulty.get() if level is None else level
+        size = len(board)
+        empty = [(i, j) for i in range(size) for j in range(size) if board[i][j] == " "]
         if level == "Easy":
+            if stats is not None:
+                stats.source = "random"
             return random.choice(empty)
-        elif level == "Medium":
-            move = self.alpha_beta(self.board, 2, -float("inf"), float("inf"), True)[1]
+        elif level == "MCTS":
+            # Root-parallel UCT over all cores unless workers is given; stop cancels it either way
+            move = mcts.best_move(board, self.k, budget=MCTS_BUDGET.get(size, 1.5), workers=workers,
+                                  stop=stop, stats=stats)
             return move if move else random.choice(empty)
-        else:
-            move = self.alpha_beta(self.board, 9, -float("inf"), float("inf"), True)[1]
+        elif size != 3:
+            table = tablebase.load(size, self.k) if level == "Hard" else None
+            if table is not None:
+                # Generated offline with python -m tictactoe.tablebase
+                if stats is not None:
+                    stats.source = "tablebase"
+                found = table.best_move(board, "X")
+                if found:
+                    return found[0]
+            move = nxn.best_move(board, self.k, budget=AI_BUDGET[level],
+                                 max_depth=2 if level == "Medium" else None, stop=stop, stats=stats)
             return move if move else random.choice(empty)
+        else:
+            return engines.choose_move(level, board, stats=stats)
 
     def alpha_beta(self, board, depth, alpha, beta, is_max):
         winner = self.check_winner(board)
@@ -168,6 +303,7 @@ class TicTacToe:
             self.score["Human" if winner == "O" else "AI"] += 1
             self.update_scoreboard()
             self.disable_board()
+            self.save_record(winner)
             self.play_sound(WIN_SOUND)
             return True
         elif all(cell != " " for row in self.board for cell in row):
@@ -175,15 +311,70 @@ class TicTacToe:
             self.score["Draws"] += 1
             self.update_scoreboard()
             self.disable_board()
+            self.save_record("draw")
             return True
         return False
 
+    def save_record(self, result):
+        if self.size > 4 or not self.history:
+            return
+        i, j = self.history[0]
+        try:
+            with records.RecordWriter(GAMES_FILE) as writer:
+                writer.append(self.size, [i * self.size + j for i, j in self.history],
+                              records.OUTCOMES[result], records.engine_id(self.difficulty.get()),
+                              records.engine_id("human"), o_first=self.board[i][j] == "O")
+        except (OSError, ValueError):
+            pass
+
+    def replay_game(self):
+        try:
+            with records.RecordReader(GAMES_FILE) as reader:
+                count = len(reader)
+                index = simpledialog.askinteger("Replay", f"Game number (1-{count}):", parent=self.root,
+                                                initialvalue=count, minvalue=1, maxvalue=count) if count else None
+                game = reader.game(index - 1) if index else None
+        except (OSError, ValueError):
+            count, game = 0, None
+        if not count:
+            messagebox.showinfo("Replay", "No recorded games yet.")
+        if game is None:
+            return
+        self.cancel_ai()
+        mode = next(name for name, spec in BOARD_MODES.items() if spec[:2] == (game["size"], game["size"]))
+        self.board_mode.set(mode)
+        if BOARD_MODES[mode][:2] != (self.size, self.k):
+            self.build_board()
+        self.board = [[" " for _ in range(self.size)] for _ in range(self.size)]
+        self.history.clear()
+        self.canvas.clear()
+        self.canvas.set_enabled(False)
+        self.player_turn = False
+        self.ai_first = not game["o_first"]
+        self.update_status(f"Replaying game {index}: {game['x_engine']} (X) vs {game['o_engine']} (O)")
+        self.replay_step(game["moves"], "O" if game["o_first"] else "X")
+
+    def replay_step(self, moves, mark):
+        self.pending_replay = None
+        if len(self.history) == len(moves):
+            winner = self.check_winner(self.board)
+            if winner:
+                self.highlight_winner(winner)
+            self.update_status(f"Replay over: {winner + ' wins' if winner else 'draw'}")
+            return
+        i, j = moves[len(self.history)]
+        self.board[i][j] = mark
+        self.history.append((i, j))
+        self.canvas.set_cell(i, j, mark)
+        self.pending_replay = self.root.after(REPLAY_MS, self.replay_step, moves, "O" if mark == "X" else "X")
+
     def disable_board(self):
-        for row in self.buttons:
-            for btn in row:
-                btn.config(state=tk.DISABLED)
+        self.canvas.set_enabled(False)
 
     def check_winner(self, b):
+        if len(b) != 3:
+            line = nxn.winning_line(b, self.k)
+            return line[0] if line else None
         # Rows, columns, diagonals
         lines = [b[i] for i in range(3)] + [[b[0][j], b[1][j], b[2][j]] for j in range(3)] + [[b[0][0], b[1][1], b[2][2]], [b[0][2], b[1][1], b[2][0]]]
         for line in lines:
@@ -192,23 +383,9 @@ class TicTacToe:
         return None
 
     def highlight_winner(self, winner):
-        b = self.board
-        for i in range(3):
-            if b[i][0] == b[i][1] == b[i][2] == winner:
-                for j in range(3):
-                    self.buttons[i][j].config(bg="lightgreen")
-                return
-        for j in range(3):
-            if b[0][j] == b[1][j] == b[2][j] == winner:
-                for i in range(3):
-                    self.buttons[i][j].config(bg="lightgreen")
-                return
-        if b[0][0] == b[1][1] == b[2][2] == winner:
-            for i in range(3):
-                self.buttons[i][i].config(bg="lightgreen")
-        elif b[0][2] == b[1][1] == b[2][0] == winner:
-            for i in range(3):
-                self.buttons[i][2 - i].config(bg="lightgreen")
+        line = nxn.winning_line(self.board, self.k)
+        if line and line[0] == winner:
+            self.canvas.highlight(line[1])
 
 # Run the game
 if __name__ == "__main__":
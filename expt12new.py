@@ -1,45 +1,29 @@
 import tkinter as tk
 from tkinter import messagebox
 
-# Disease data: symptoms with weights and advice
-DISEASE_DATABASE = {
-    "Flu": {
-        "symptoms": {"fever": 2, "cough": 2, "sore throat": 1, "body aches": 2, "runny nose": 1, "fatigue": 1},
-        "advice": "Get rest, stay hydrated. Antiviral meds may help if prescribed."
-    },
-    "COVID-19": {
-        "symptoms": {"fever": 2, "cough": 2, "shortness of breath": 3, "loss of taste": 3, "headache": 1, "fatigue": 2},
-        "advice": "Consider getting a COVID test. Isolate and monitor oxygen."
-    },
-    "Measles": {
-        "symptoms": {"fever": 2, "rash": 3, "runny nose": 1, "cough": 1},
-        "advice": "Avoid contact with others. Consult doctor immediately."
-    },
-    "Common Cold": {
-        "symptoms": {"cough": 1, "sore throat": 1, "runny nose": 2, "headache": 1},
-        "advice": "Rest and drink warm fluids. Usually self-resolves in a few days."
-    },
-    "Dengue": {
-        "symptoms": {"fever": 3, "rash": 2, "headache": 2, "body aches": 2},
-        "advice": "Check platelet count. Visit hospital if bleeding or high fever."
-    },
-    "Malaria": {
-        "symptoms": {"fever": 3, "headache": 2, "body aches": 2, "chills": 3},
-        "advice": "Needs blood test. Go to nearest clinic for malaria screening."
-    }
-}
-
-SYMPTOMS_LIST = [
-    "fever", "cough", "sore throat", "body aches",
-    "rash", "headache", "runny nose", "shortness of breath",
-    "loss of taste", "fatigue", "chills"
-]
+from medical.diagnosis import KNOWLEDGE_BASE, NO_DIAGNOSIS, conflict, format_summary, generate_result
+from medical.kb import Watcher
+from medical.live import LiveDiagnosis
+from medical.memo import memo_for
+from medical.results_view import ResultsView
+from medical.rules import compile_rules
+
+RELOAD_MS = 1000  # how often the knowledge base file is checked for changes
+PRECOMPUTE_WORK = 8192  # disease scores per idle slice of memo precomputation, roughly 15 ms
 
 class MedicalExpertSystemGUI:
-    def __init__(self, root):
+    def __init__(self, root, knowledge_base=KNOWLEDGE_BASE):
         self.root = root
         self.root.title("Medical Expert System")
         self.symptom_vars = {}
+        self.kb = knowledge_base
+        self.watcher = Watcher(knowledge_base)
+        self.rules = self.compile_rules()
+        self.diagnosed = False
+        self.live = None  # LiveDiagnosis while live mode is on
+        self.shown_summary = None
+        self.precompute_job = None
+        self.kb_error = None  # why the last reload failed, shown until one succeeds
 
         title = tk.Label(root, text="🩺 Medical Expert System", font=("Arial", 16, "bold"))
         title.pack(pady=10)
@@ -49,65 +33,150 @@ class MedicalExpertSystemGUI:
 
         self.symptom_frame = tk.Frame(root)
         self.symptom_frame.pack(pady=5)
+        self.build_symptoms()
 
-        for i, symptom in enumerate(SYMPTOMS_LIST):
-            var = tk.BooleanVar()
+        diagnose_button = tk.Button(root, text="Diagnose", command=self.diagnose, font=("Arial", 12), bg="lightblue")
+        diagnose_button.pack(pady=(10, 0))
+
+        self.live_var = tk.BooleanVar()
+        live_check = tk.Checkbutton(root, text="Live diagnosis", variable=self.live_var,
+                                    command=self.toggle_live, font=("Arial", 10))
+        live_check.pack()
+
+        self.result_text = tk.Text(root, height=5, width=80, font=("Courier", 10), wrap="word")
+        self.result_text.pack(padx=10, pady=(10, 5))
+
+        self.results_view = ResultsView(root, advice=lambda disease: self.kb.database[disease]["advice"])
+        self.results_view.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+
+        self.status = tk.Label(root, anchor='w', font=("Arial", 9))
+        self.status.pack(fill='x', padx=10, pady=(0, 5))
+        self.show_kb_status()
+        self.root.after(RELOAD_MS, self.watch_kb)
+        self.schedule_precompute()  # fill in results before the first click
+
+    def build_symptoms(self):
+        # Rebuilt on reload; symptoms still in the knowledge base stay checked
+        checked = {symptom for symptom, var in self.symptom_vars.items() if var.get()}
+        for child in self.symptom_frame.winfo_children():
+            child.destroy()
+        self.symptom_vars = {}
+        for i, symptom in enumerate(self.kb.symptoms):
+            var = tk.BooleanVar(value=symptom in checked)
             cb = tk.Checkbutton(self.symptom_frame, text=symptom.capitalize(), variable=var, font=("Arial", 10))
             cb.grid(row=i // 2, column=i % 2, sticky='w', padx=10, pady=2)
+            var.trace_add("write", lambda *_, symptom=symptom: self.symptom_toggled(symptom))
             self.symptom_vars[symptom] = var
 
-        diagnose_button = tk.Button(root, text="Diagnose", command=self.diagnose, font=("Arial", 12), bg="lightblue")
-        diagnose_button.pack(pady=10)
-
-        self.result_text = tk.Text(root, height=15, width=80, font=("Courier", 10))
-        self.result_text.pack(padx=10, pady=10)
+    def show_kb_status(self):
+        if self.kb_error:
+            self.status.config(text=f"Knowledge base not reloaded: {self.kb_error}", fg="red")
+        elif self.kb.warnings:
+            self.status.config(text=f"Knowledge base: {self.kb.summary()} - {self.kb.warnings[0]}", fg="darkorange")
+        else:
+            # Precompute progress and hit counts of the result memo
+            self.status.config(text=f"Knowledge base: {self.kb.summary()} - {self.memo().summary()}", fg="gray")
+
+    def watch_kb(self):
+        try:
+            fresh = self.watcher.poll()
+        except (OSError, ValueError) as e:
+            self.kb_error = e
+            self.show_kb_status()
+        else:
+            if fresh is not None:
+                self.kb = fresh
+                self.kb_error = None
+                self.rules = self.compile_rules()
+                self.build_symptoms()
+                self.show_kb_status()
+                self.schedule_precompute()
+                if self.live:
+                    self.start_live()
+                elif self.diagnosed:
+                    self.diagnose()
+        self.root.after(RELOAD_MS, self.watch_kb)
+
+    def compile_rules(self):
+        # The rules run next to the weighted scores and add their findings above the diagnoses
+        if not self.kb.rules:
+            return None
+        return compile_rules(self.kb.rules, list(self.kb.symptoms) + list(self.kb.database))
+
+    def memo(self):
+        # Rebuilt automatically when the knowledge base is reloaded
+        return memo_for(self.kb.database, self.kb.symptoms, k=None)
+
+    def schedule_precompute(self):
+        if self.precompute_job is not None:
+            self.root.after_cancel(self.precompute_job)
+        self.precompute_job = self.root.after_idle(self.precompute)
+
+    def precompute(self):
+        # One slice per idle callback, so clicks and redraws get in between slices
+        self.precompute_job = None
+        if not self.memo().fill(PRECOMPUTE_WORK):
+            self.precompute_job = self.root.after_idle(self.precompute)
+        self.show_kb_status()
+
+    def findings(self):
+        return self.rules.findings() if self.rules else []
 
     def diagnose(self):
+        self.diagnosed = True
         symptoms = {symptom: var.get() for symptom, var in self.symptom_vars.items()}
-        diagnosis = self.get_diagnosis(symptoms)
-
-        if not diagnosis:
+        entry = self.memo().lookup(symptoms)
+        if self.rules:
+            self.rules.observe(symptoms, entry.scores)
+        self.show(entry.ranked)
+        self.show_kb_status()
+
+    def show(self, ranked, refresh=False):
+        # Notes and disclaimer go in result_text, the diagnoses in the paged table
+        if not ranked:
+            summary = NO_DIAGNOSIS
+        else:
+            summary = format_summary(conflict(ranked), self.findings())
+        if summary != self.shown_summary:
             self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, "\nNo clear diagnosis. Please consult a doctor.")
+            self.result_text.insert(tk.END, summary)
+            self.shown_summary = summary
+        if refresh:
+            self.results_view.refresh(ranked)
+        else:
+            self.results_view.set_results(ranked)
+
+    def toggle_live(self):
+        if self.live_var.get():
+            self.start_live()
+        else:
+            self.live = None
+
+    def start_live(self):
+        checked = [symptom for symptom, var in self.symptom_vars.items() if var.get()]
+        self.live = LiveDiagnosis(self.kb.database, checked)
+        if self.rules:
+            symptoms = {symptom: var.get() for symptom, var in self.symptom_vars.items()}
+            self.rules.observe(symptoms, self.memo().lookup(symptoms).scores)
+        self.show(self.live.ranked())
+
+    def symptom_toggled(self, symptom):
+        if not self.live:
             return
-
-        result = self.generate_result(diagnosis)
-        self.result_text.delete(1.0, tk.END)
-        self.result_text.insert(tk.END, result)
+        present = self.symptom_vars[symptom].get()
+        changed = self.live.toggle(symptom, present)
+        if self.rules:
+            facts = {disease: self.live.score(disease) for disease in changed}
+            facts[symptom] = present
+            self.rules.update(facts)
+        # The table rewrites only the rows on its page that changed
+        self.show(self.live.ranked(), refresh=True)
 
     def get_diagnosis(self, symptoms):
-        result = {}
-
-        for disease, data in DISEASE_DATABASE.items():
-            disease_symptoms = data["symptoms"]
-            match_score = 0
-            total_score = sum(disease_symptoms.values())
-
-            for symptom, weight in disease_symptoms.items():
-                if symptoms.get(symptom, False):
-                    match_score += weight
-
-            confidence = (match_score / total_score) * 100
-            if confidence > 0:
-                result[disease] = round(confidence, 2)
-
-        return result
+        return dict(self.memo().lookup(symptoms).scores)
 
     def generate_result(self, diagnosis):
-        sorted_diag = sorted(diagnosis.items(), key=lambda x: x[1], reverse=True)
-        result_text = ""
-
-        # Conflict detection
-        if len(sorted_diag) > 1 and abs(sorted_diag[0][1] - sorted_diag[1][1]) <= 15:
-            result_text += f"⚠️ Conflict: Symptoms match both {sorted_diag[0][0]} and {sorted_diag[1][0]}\n\n"
-
-        result_text += "Possible Diagnoses:\n\n"
-        for disease, score in sorted_diag:
-            advice = DISEASE_DATABASE[disease]["advice"]
-            result_text += f"{disease} ({score}%)\n  → {advice}\n\n"
-
-        result_text += "\n⚠️ This is not medical advice. Always consult a qualified doctor!"
-        return result_text
+        return generate_result(diagnosis, self.kb.database)
 
 # Main window
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Tk-free logic for the medical expert system."""
@@ -0,0 +1,252 @@
+"""Headless batch diagnosis over exported patient files.
+
+The disease database is compiled once into a symptom x disease weight
+matrix. Patients are read in chunks into a 0/1 symptom matrix, and a
+chunk is scored with one matrix multiply. Confidences, ranking, ties and
+the conflict flag match get_diagnosis, rank and conflict.
+
+Input is CSV or JSONL, chosen by file extension ("-" reads CSV from
+stdin). A CSV has a header row, an optional "id" column and one column
+per symptom, where 1/true/yes/y/x means present. A JSONL line is an
+object with an optional "id" and "symptoms", either a list of names or a
+{symptom: bool} mapping. Unknown symptoms are ignored. Output is one
+JSON line per patient, {"id", "top": [[disease, confidence], ...],
+"conflict": [a, b] or null}, or CSV when the output ends in .csv.
+
+    python -m medical.batch patients.csv --output ranked.jsonl --top 5
+"""
+
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+
+import numpy as np
+
+from medical.diagnosis import CONFLICT_MARGIN, DISEASE_DATABASE, TOP_K
+from medical.kb import load as load_kb
+
+CHUNK_ROWS = 65536
+CHUNK_CELLS = 8 * 1024 * 1024  # chunk rows x diseases, bounds the score matrix
+TRUTHY = {"1", "true", "yes", "y", "x"}
+MIDPOINT = 1e-6  # hundredths of a percent from a rounding midpoint that get re-added exactly
+
+
+class Compiled:
+    def __init__(self, database=DISEASE_DATABASE):
+        self.diseases = list(database)
+        self.encoded = [json.dumps(name) for name in self.diseases]
+        symptoms = {}
+        for disease in self.diseases:
+            for symptom in database[disease]["symptoms"]:
+                symptoms.setdefault(symptom, len(symptoms))
+        self.symptoms = symptoms  # {name: column}
+        self.columns = []  # per disease: [(column, weight)] in database order
+        for disease in self.diseases:
+            self.columns.append([(symptoms[s], w) for s, w in database[disease]["symptoms"].items()])
+        totals = [sum(w for _, w in entries) for entries in self.columns]  # in database order, as rank() sums
+        # Whole weights add exactly in any order, in float32 up to 2**24. Fractional
+        # ones need float64, and sums on a rounding midpoint are redone in score()
+        self.whole = max(totals, default=0) < 2 ** 24 and all(
+            float(w).is_integer() for entries in self.columns for _, w in entries)
+        self.dtype = np.float32 if self.whole else np.float64  # of weights and presence matrices
+        self.weights = np.zeros((len(symptoms), len(self.diseases)), dtype=self.dtype)
+        for d, entries in enumerate(self.columns):
+            for column, weight in entries:
+                self.weights[column, d] = weight
+        self.totals = np.array(totals, dtype=np.float64)
+        # Ties on confidence go to the earlier disease, as in rank()
+        self.order = np.arange(len(self.diseases) - 1, -1, -1, dtype=np.int64)
+
+    def chunk_rows(self):
+        return max(1, min(CHUNK_ROWS, CHUNK_CELLS // max(1, len(self.diseases))))
+
+    def score(self, present):
+        """Confidence of every disease for an (n, symptoms) 0/1 matrix, as get_diagnosis rounds it."""
+        confidence = (present @ self.weights).astype(np.float64) / self.totals * 100
+        if self.whole:
+            return np.round(confidence, 2)
+        # The product adds fractional weights in its own order. That only matters
+        # where a confidence sits on a rounding midpoint such as 65.625, so those
+        # few are summed and rounded again the way get_diagnosis does it
+        hundredths = confidence * 100
+        rounded = np.rint(hundredths)
+        near = np.abs(np.abs(hundredths - rounded) - 0.5) < MIDPOINT
+        rounded /= 100
+        for n, d in zip(*np.nonzero(near)):
+            row = present[n]
+            match = sum(w for column, w in self.columns[d] if row[column])
+            rounded[n, d] = round(match / float(self.totals[d]) * 100, 2)
+        return rounded
+
+    def top_k(self, present, k=TOP_K):
+        """(diseases, confidences) arrays of shape (n, k), best first; -1 / 0 pad missing entries."""
+        confidence = self.score(present)
+        n, count = confidence.shape
+        k = min(k, count)
+        # One exact integer key per cell: confidence in hundredths, then database order
+        key = np.rint(confidence * 100).astype(np.int64) * count + self.order
+        if k < count:
+            part = np.argpartition(-key, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(count), (n, count))
+        picked = np.take_along_axis(key, part, axis=1)
+        best = np.take_along_axis(part, np.argsort(-picked, axis=1), axis=1)
+        conf = np.take_along_axis(confidence, best, axis=1)
+        best = np.where(conf > 0, best, -1)
+        return best, np.where(conf > 0, conf, 0.0)
+
+
+def conflicts(best, confidences):
+    """(n, 2) top two diseases of rows within CONFLICT_MARGIN, as conflict() decides; -1 elsewhere.
+
+    best and confidences need at least the top two columns, even when
+    fewer diagnoses are written out.
+    """
+    pairs = np.full((len(best), 2), -1, dtype=np.int64)
+    if best.shape[1] < 2:
+        return pairs
+    first, second = confidences[:, 0], confidences[:, 1]
+    flagged = (second > 0) & (np.abs(first - second) <= CONFLICT_MARGIN)
+    pairs[flagged] = best[flagged, :2]
+    return pairs
+
+
+def _open(path):
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def read_csv(stream, compiled, rows):
+    """Yield (ids, present) chunks of at most rows patients from a CSV stream."""
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    header = [name.strip() for name in header]
+    id_col = header.index("id") if "id" in header else None
+    fields = [i for i, name in enumerate(header) if name in compiled.symptoms]
+    columns = [compiled.symptoms[header[i]] for i in fields]
+    width = max(fields, default=-1) + 1
+    cells, ids = [], []
+    for row in reader:
+        if not row:
+            continue
+        if len(row) < width:
+            row += [""] * (width - len(row))
+        cells.append([row[i] for i in fields])
+        ids.append(row[id_col] if id_col is not None else None)
+        if len(ids) == rows:
+            yield ids, _truth_matrix(cells, columns, len(compiled.symptoms), compiled.dtype)
+            cells, ids = [], []
+    if ids:
+        yield ids, _truth_matrix(cells, columns, len(compiled.symptoms), compiled.dtype)
+
+
+def _truth_matrix(cells, columns, width, dtype):
+    """0/1 symptom matrix for CSV cells, parsing each distinct cell text once."""
+    present = np.zeros((len(cells), width), dtype=dtype)
+    if columns:
+        texts, inverse = np.unique(np.array(cells, dtype=str), return_inverse=True)
+        truth = np.array([text.strip().lower() in TRUTHY for text in texts.tolist()], dtype=dtype)
+        present[:, columns] = truth[inverse.reshape(len(cells), len(columns))]
+    return present
+
+
+def read_jsonl(stream, compiled, rows):
+    """Yield (ids, present) chunks of at most rows patients from a JSONL stream."""
+    columns = compiled.symptoms
+    present = np.zeros((rows, len(columns)), dtype=compiled.dtype)
+    ids, n = [], 0
+    for line in stream:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        symptoms = record.get("symptoms", ())
+        if isinstance(symptoms, dict):
+            symptoms = [name for name, value in symptoms.items() if value]
+        for name in symptoms:
+            col = columns.get(name)
+            if col is not None:
+                present[n, col] = 1
+        ids.append(record.get("id"))
+        n += 1
+        if n == rows:
+            yield ids, present
+            present = np.zeros_like(present)
+            ids, n = [], 0
+    if n:
+        yield ids, present[:n]
+
+
+def diagnose_file(path, compiled, k=TOP_K):
+    """Yield (ids, diseases, confidences, conflict pairs) per chunk of the patient file."""
+    reader = read_jsonl if path.endswith((".jsonl", ".json")) else read_csv
+    with _open(path) as stream:
+        for ids, present in reader(stream, compiled, compiled.chunk_rows()):
+            # The conflict test needs the top two even when fewer are written out
+            best, conf = compiled.top_k(present, max(k, 2))
+            yield ids, best[:, :k], conf[:, :k], conflicts(best, conf)
+
+
+def write_jsonl(out, compiled, ids, best, conf, pairs):
+    names = compiled.encoded  # json.dumps of every disease name
+    lines = []
+    for id_, diseases, confidences, (a, b) in zip(ids, best.tolist(), conf.tolist(), pairs.tolist()):
+        top = ", ".join(f"[{names[d]}, {c!r}]" for d, c in zip(diseases, confidences) if d >= 0)
+        pair = f"[{names[a]}, {names[b]}]" if a >= 0 else "null"
+        lines.append(f'{{"id": {json.dumps(id_)}, "top": [{top}], "conflict": {pair}}}')
+    out.write("\n".join(lines) + "\n")
+
+
+def write_csv(writer, compiled, ids, best, conf, pairs):
+    names = compiled.diseases
+    for r in range(len(ids)):
+        row = [ids[r], int(pairs[r, 0] >= 0)]
+        for d, c in zip(best[r].tolist(), conf[r].tolist()):
+            row += [names[d], c] if d >= 0 else ["", ""]
+        writer.writerow(row)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank diagnoses for every patient in a CSV or JSONL file.")
+    parser.add_argument("input", help="patients .csv or .jsonl, or - for CSV on stdin")
+    parser.add_argument("--output", default="-", help="ranked results, .csv or JSON lines (default: stdout)")
+    parser.add_argument("--top", type=int, default=TOP_K, help="diagnoses kept per patient")
+    parser.add_argument("--kb", help="JSON or SQLite knowledge base (default: the bundled one)")
+    args = parser.parse_args(argv)
+
+    compiled = Compiled(load_kb(args.kb).database if args.kb else DISEASE_DATABASE)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    writer = None
+    if args.output.endswith(".csv"):
+        writer = csv.writer(out)
+        header = ["id", "conflict"]
+        for i in range(1, min(args.top, len(compiled.diseases)) + 1):
+            header += [f"disease_{i}", f"confidence_{i}"]
+        writer.writerow(header)
+    start = time.perf_counter()
+    total = flagged = 0
+    try:
+        for ids, best, conf, pairs in diagnose_file(args.input, compiled, args.top):
+            if writer:
+                write_csv(writer, compiled, ids, best, conf, pairs)
+            else:
+                write_jsonl(out, compiled, ids, best, conf, pairs)
+            total += len(ids)
+            flagged += int((pairs[:, 0] >= 0).sum())
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"{total:,} patients in {elapsed:.2f}s ({rate:,.0f} rows/sec), {flagged:,} conflicts",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
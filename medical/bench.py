@@ -0,0 +1,216 @@
+"""Diagnosis benchmark over synthetic or real knowledge bases.
+
+Every backend ranks the same patients to the top k. The harness reports
+diagnoses per second, p50/p99 latency per diagnosis and the memory the
+backend holds once built (traced with tracemalloc after the modules it
+needs are imported, so NumPy itself is not counted). It also checks every
+ranking against "scan", the original loop over every disease. Batched
+backends are timed per chunk, and their latency is the chunk time divided
+by the patients in it.
+
+    python -m medical.bench --diseases 5000 --symptoms 500 --patients 2000
+    python -m medical.bench --kb medical/knowledge_base.json --patients 5000 --check
+"""
+
+import argparse
+import gc
+import importlib
+import sys
+import time
+import tracemalloc
+
+from medical.diagnosis import TOP_K, rank
+from medical.index import SymptomIndex
+from medical.memo import DiagnosisMemo
+from medical.synthetic import WEIGHTS, generate_kb, generate_patients
+
+BATCH_CHUNK = 1024
+
+
+def scan_backend(database, symptoms, k):
+    # The scorer as it was before the index: every disease, every call
+    def diagnose(patient):
+        result = {}
+        for disease, data in database.items():
+            disease_symptoms = data["symptoms"]
+            total = sum(disease_symptoms.values())
+            match = sum(w for s, w in disease_symptoms.items() if patient.get(s, False))
+            confidence = (match / total) * 100
+            if confidence > 0:
+                result[disease] = round(confidence, 2)
+        return rank(result)[:k]
+    return diagnose
+
+
+def index_backend(database, symptoms, k):
+    index = SymptomIndex(database)
+    return lambda patient: rank(index.score(patient))[:k]
+
+
+def top_k_backend(database, symptoms, k):
+    index = SymptomIndex(database)
+    return lambda patient: index.top_k(patient, k)
+
+
+def memo_backend(database, symptoms, k):
+    memo = DiagnosisMemo(database, symptoms, k)
+    memo.fill()
+    return lambda patient: memo.lookup(patient).ranked
+
+
+def batch_backend(database, symptoms, k):
+    from medical.batch import Compiled
+
+    compiled = Compiled(database)
+    columns = compiled.symptoms
+    names = compiled.diseases
+
+    def diagnose_many(patients):
+        import numpy as np
+
+        present = np.zeros((len(patients), len(columns)), dtype=compiled.dtype)
+        for row, patient in enumerate(patients):
+            for symptom, value in patient.items():
+                if value and symptom in columns:
+                    present[row, columns[symptom]] = 1
+        best, conf = compiled.top_k(present, k)
+        return [[(names[d], c) for d, c in zip(ds, cs) if d >= 0]
+                for ds, cs in zip(best.tolist(), conf.tolist())]
+    diagnose_many.batched = True
+    return diagnose_many
+
+
+batch_backend.requires = ("medical.batch",)  # imported before tracing; NumPy is not the backend's memory
+
+
+BACKENDS = {
+    "scan": scan_backend,
+    "index": index_backend,
+    "top_k": top_k_backend,
+    "memo": memo_backend,
+    "batch": batch_backend,  # needs NumPy
+}
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+def build(name, database, symptoms, k):
+    """(backend, bytes it holds) for one backend."""
+    factory = BACKENDS[name]
+    for module in getattr(factory, "requires", ()):
+        importlib.import_module(module)
+    gc.collect()
+    tracemalloc.start()
+    backend = factory(database, symptoms, k)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return backend, held
+
+
+def run(backend, patients):
+    """(rankings, per-diagnosis latencies in seconds, total seconds)."""
+    rankings, latencies = [], []
+    clock = time.perf_counter
+    start = clock()
+    if getattr(backend, "batched", False):
+        for i in range(0, len(patients), BATCH_CHUNK):
+            chunk = patients[i:i + BATCH_CHUNK]
+            t = clock()
+            rankings += backend(chunk)
+            latencies += [(clock() - t) / len(chunk)] * len(chunk)
+    else:
+        for patient in patients:
+            t = clock()
+            rankings.append(backend(patient))
+            latencies.append(clock() - t)
+    return rankings, latencies, clock() - start
+
+
+def benchmark(database, symptoms, patients, names, k=TOP_K):
+    """One result dict per backend, with "mismatches" counted against the first backend."""
+    results, reference = [], None
+    for name in names:
+        try:
+            backend, held = build(name, database, symptoms, k)
+        except ImportError as e:
+            results.append({"backend": name, "error": str(e)})
+            continue
+        rankings, latencies, elapsed = run(backend, patients)
+        latencies.sort()
+        if reference is None:
+            reference = rankings
+        mismatches = sum(1 for mine, theirs in zip(rankings, reference) if mine != theirs)
+        results.append({
+            "backend": name,
+            "per_sec": len(patients) / elapsed if elapsed else 0.0,
+            "p50_us": percentile(latencies, 50) * 1e6,
+            "p99_us": percentile(latencies, 99) * 1e6,
+            "memory_kb": held / 1024,
+            "mismatches": mismatches,
+        })
+    return results
+
+
+def report(results):
+    lines = [f"{'backend':<8}{'diag/sec':>12}{'p50 us':>10}{'p99 us':>10}{'memory KB':>12}{'mismatch':>10}"]
+    for r in results:
+        if "error" in r:
+            lines.append(f"{r['backend']:<8}  skipped: {r['error']}")
+            continue
+        lines.append(f"{r['backend']:<8}{r['per_sec']:>12,.0f}{r['p50_us']:>10.1f}{r['p99_us']:>10.1f}"
+                     f"{r['memory_kb']:>12,.0f}{r['mismatches']:>10}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the diagnosis backends.")
+    parser.add_argument("--kb", help="JSON or SQLite knowledge base instead of a synthetic one")
+    parser.add_argument("--diseases", type=int, default=1000)
+    parser.add_argument("--symptoms", type=int, default=200, help="symptom vocabulary size")
+    parser.add_argument("--per-disease", type=float, default=6, help="mean symptoms per disease")
+    parser.add_argument("--weights", choices=WEIGHTS, default="uniform")
+    parser.add_argument("--skew", type=float, default=1.0, help="symptom popularity skew (0 = uniform)")
+    parser.add_argument("--noise", type=float, default=2, help="mean unrelated symptoms per patient")
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--top", type=int, default=TOP_K)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="comma-separated, first is the reference")
+    parser.add_argument("--check", action="store_true",
+                        help="exit 1 if any backend ranks differently; also runs a fractional-weight KB")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.backends.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(unknown)} (choose from {', '.join(BACKENDS)})")
+    if args.kb:
+        from medical.kb import load
+
+        kb = load(args.kb)
+        kbs = [(kb.symptoms, kb.database)]
+    else:
+        kbs = [generate_kb(args.diseases, args.symptoms, args.per_disease, args.weights,
+                           skew=args.skew, seed=args.seed)]
+    if args.check and args.weights != "fractional":
+        # Fractional weights are where float sums in different orders round apart
+        kbs.append(generate_kb(args.diseases, args.symptoms, args.per_disease, "fractional",
+                               skew=args.skew, seed=args.seed))
+    failed = False
+    for symptoms, database in kbs:
+        patients = list(generate_patients(symptoms, database, args.patients, args.noise, args.skew, args.seed + 1))
+        print(f"{len(database):,} diseases, {len(symptoms):,} symptoms, {len(patients):,} patients, top {args.top}")
+        results = benchmark(database, symptoms, patients, names, args.top)
+        print(report(results))
+        bad = [r["backend"] for r in results if r.get("mismatches")]
+        if bad:
+            print(f"RANKING MISMATCH: {', '.join(bad)} differ from {names[0]}")
+            failed = True
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Weighted-symptom diagnosis, importable without a window.
+
+A disease's confidence is the share of its symptom weight that the
+patient reports, as a percentage rounded to two places. Diseases with
+no matching symptom are left out. Scoring goes through the compiled
+symptom index in medical.index, which is rebuilt when the database
+object changes. The default database is loaded by medical.kb; pass
+another KnowledgeBase's database to score against it.
+"""
+
+from medical.index import compiled
+from medical.kb import load as load_kb
+
+# Disease data (symptoms with weights and advice) and the checkbox order,
+# from medical/knowledge_base.json through its compiled cache
+KNOWLEDGE_BASE = load_kb()
+DISEASE_DATABASE = KNOWLEDGE_BASE.database
+SYMPTOMS_LIST = KNOWLEDGE_BASE.symptoms
+
+CONFLICT_MARGIN = 15  # top two diagnoses this close (in points) are flagged
+TOP_K = 10  # diagnoses kept when no k is given
+
+FOOTER = "\n⚠️ This is not medical advice. Always consult a qualified doctor!"
+NO_DIAGNOSIS = "\nNo clear diagnosis. Please consult a doctor."
+
+
+def get_diagnosis(symptoms, database=DISEASE_DATABASE):
+    """{disease: confidence} for a {symptom: bool} mapping, in database order."""
+    return compiled(database).score(symptoms)
+
+
+def top_diagnoses(symptoms, k=TOP_K, min_confidence=0.0, database=DISEASE_DATABASE):
+    """rank(get_diagnosis(...)) cut to k entries of at least min_confidence, without scoring the rest."""
+    return compiled(database).top_k(symptoms, k, min_confidence)
+
+
+def rank(diagnosis):
+    """Diagnoses as (disease, score) pairs, best first; ties keep database order."""
+    return sorted(diagnosis.items(), key=lambda x: x[1], reverse=True)
+
+
+def conflict(ranked):
+    """The top two diseases when they are within CONFLICT_MARGIN, else None."""
+    if len(ranked) > 1 and abs(ranked[0][1] - ranked[1][1]) <= CONFLICT_MARGIN:
+        return ranked[0][0], ranked[1][0]
+    return None
+
+
+def generate_result(diagnosis, database=DISEASE_DATABASE):
+    return format_ranked(rank(diagnosis), database)
+
+
+def format_notes(pair, findings=()):
+    """The conflict warning for a conflict() pair, then rule findings."""
+    text = f"⚠️ Conflict: Symptoms match both {pair[0]} and {pair[1]}\n\n" if pair else ""
+    if findings:
+        text += "".join(f"📋 {finding}\n" for finding in findings) + "\n"
+    return text
+
+
+def format_header(pair, findings=()):
+    """Text above the diagnosis rows."""
+    return format_notes(pair, findings) + "Possible Diagnoses:\n\n"
+
+
+def format_summary(pair, findings=()):
+    """What goes around a table of diagnoses: the notes and the disclaimer."""
+    return format_notes(pair, findings) + FOOTER.lstrip("\n")
+
+
+def format_row(disease, score, database=DISEASE_DATABASE):
+    """One diagnosis as three lines of text; line breaks in the advice are flattened."""
+    advice = " ".join(database[disease]["advice"].splitlines())
+    return f"{disease} ({score}%)\n  → {advice}\n\n"
+
+
+def format_ranked(sorted_diag, database=DISEASE_DATABASE, findings=()):
+    rows = "".join(format_row(disease, score, database) for disease, score in sorted_diag)
+    return format_header(conflict(sorted_diag), findings) + rows + FOOTER
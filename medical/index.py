@@ -0,0 +1,112 @@
+"""Inverted symptom index over a disease database.
+
+Compiling a database once gives, for every symptom, a postings list of
+(disease, weight) pairs, plus each disease's total weight. Scoring a
+patient then touches only the diseases linked to the reported symptoms.
+top_k() runs the threshold algorithm over the postings of the reported
+symptoms, each sorted by how much the posting adds to a disease's
+confidence. It stops once no disease it has not seen yet could reach the
+top k or the minimum confidence.
+
+Scores and order match get_diagnosis and rank: match weight / total
+weight * 100, rounded to two places, zero scores left out, and ties kept
+in database order.
+"""
+
+import heapq
+
+EPSILON = 1e-9  # slack for float sums in the threshold bound
+
+
+class SymptomIndex:
+    def __init__(self, database):
+        self.database = database
+        self.diseases = list(database)
+        self.totals = []
+        self.weights = []  # per disease: {symptom: weight}
+        postings = {}
+        for d, disease in enumerate(self.diseases):
+            symptoms = database[disease]["symptoms"]
+            total = sum(symptoms.values())
+            self.totals.append(total)
+            self.weights.append(dict(symptoms))
+            for symptom, weight in symptoms.items():
+                postings.setdefault(symptom, []).append((d, weight))
+        # Highest contribution to confidence first, database order within ties
+        self.postings = {
+            symptom: sorted(entries, key=lambda e: (-e[1] / self.totals[e[0]], e[0]))
+            for symptom, entries in postings.items()
+        }
+
+    def selected(self, symptoms):
+        """Reported symptoms that appear in the index, from a {symptom: bool} mapping."""
+        return [s for s, present in symptoms.items() if present and s in self.postings]
+
+    def confidence(self, d, match):
+        return round((match / self.totals[d]) * 100, 2)
+
+    def score(self, symptoms):
+        """{disease: confidence} like get_diagnosis, touching only linked diseases."""
+        matches = {}
+        for symptom in self.selected(symptoms):
+            for d, weight in self.postings[symptom]:
+                matches[d] = matches.get(d, 0) + weight
+        result = {}
+        for d in sorted(matches):
+            confidence = self.confidence(d, matches[d])
+            if confidence > 0:
+                result[self.diseases[d]] = confidence
+        return result
+
+    def top_k(self, symptoms, k=10, min_confidence=0.0):
+        """Best k (disease, confidence) pairs with confidence >= min_confidence, best first."""
+        selected = self.selected(symptoms)
+        lists = [self.postings[s] for s in selected]
+        chosen = set(selected)
+        cursors = [0] * len(lists)
+        seen = set()
+        heap = []  # (confidence, -d) of the k best so far; heap[0] is the k-th
+        while True:
+            progressed = False
+            for n, postings in enumerate(lists):
+                if cursors[n] < len(postings):
+                    d, weight = postings[cursors[n]]
+                    cursors[n] += 1
+                    progressed = True
+                    if d not in seen:
+                        seen.add(d)
+                        # Random access: the disease's full match over every reported symptom
+                        match = sum(w for s, w in self.weights[d].items() if s in chosen)
+                        confidence = self.confidence(d, match)
+                        if confidence > 0 and confidence >= min_confidence:
+                            entry = (confidence, -d)
+                            if len(heap) < k:
+                                heapq.heappush(heap, entry)
+                            elif entry > heap[0]:
+                                heapq.heapreplace(heap, entry)
+            if not progressed:
+                break
+            # Every unseen disease scores at most the contributions at the cursors
+            bound = 0.0
+            for n, postings in enumerate(lists):
+                if cursors[n] < len(postings):
+                    d, weight = postings[cursors[n]]
+                    bound += weight / self.totals[d] * 100
+            limit = round(bound + EPSILON, 2)
+            if limit < min_confidence or limit <= 0:
+                break
+            if len(heap) == k and limit < heap[0][0]:
+                break
+        ranked = sorted(heap, key=lambda e: (-e[0], -e[1]))
+        return [(self.diseases[-neg_d], confidence) for confidence, neg_d in ranked]
+
+
+_compiled = None
+
+
+def compiled(database):
+    """The index for database, rebuilt only when a different database object is passed."""
+    global _compiled
+    if _compiled is None or _compiled.database is not database:
+        _compiled = SymptomIndex(database)
+    return _compiled
@@ -0,0 +1,278 @@
+"""Knowledge base loading: JSON or SQLite source, compiled cache, reload on change.
+
+A JSON source mirrors the in-memory layout:
+
+    {"symptoms": ["fever", ...],
+     "diseases": {"Flu": {"symptoms": {"fever": 2, ...}, "advice": "..."}, ...},
+     "rules": ["name: fever AND rash THEN ...", ...]}
+
+"rules" is optional and uses the language in medical.rules. A SQLite
+source (.db, .sqlite, .sqlite3) has the tables written by write_sqlite:
+symptoms(name), diseases(name, advice), weights(disease, symptom, weight)
+and optionally rules(text), each read in rowid order.
+
+The parsed knowledge base is kept in a marshal cache in the user's cache
+directory (CACHE_DIR), one ".kbc" file per source path, so loading never
+writes into the package. The cache is keyed by the size and CRC-32 of the
+source bytes, so a start-up with an unchanged source skips parsing and
+validation. Watcher.poll() reloads when the source's mtime changes.
+
+    python -m medical.kb medical/knowledge_base.json    # validate and build the cache
+    python -m medical.kb kb.json --sqlite kb.db        # also export to SQLite
+"""
+
+import marshal
+import os
+import struct
+import sys
+import zlib
+
+from medical.rules import compile_rules, parse_rules
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PATH = os.path.join(DIRECTORY, "knowledge_base.json")
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                         "medical-kb")
+CACHE_SUFFIX = ".kbc"
+MAGIC = b"MKBC"
+CACHE_HEADER = struct.Struct("<4sHHIQ")  # magic, marshal version, format version, crc32, size
+FORMAT = 2
+
+
+class KnowledgeBase:
+    def __init__(self, path, symptoms, database, warnings, mtime, rules=()):
+        self.path = path
+        self.symptoms = symptoms  # checkbox order
+        self.database = database  # {disease: {"symptoms": {symptom: weight}, "advice": str}}
+        self.rules = rules  # rule-language lines
+        self.warnings = warnings  # from validate()
+        self.mtime = mtime
+
+    def summary(self):
+        text = f"{len(self.database)} diseases, {len(self.symptoms)} symptoms"
+        if self.warnings:
+            text += f", {len(self.warnings)} warning{'s' if len(self.warnings) != 1 else ''}"
+        return text
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def parse_json(data, path="<knowledge base>"):
+    import json
+
+    try:
+        doc = json.loads(data)
+    except ValueError as e:  # also bad UTF-8
+        raise ValueError(f"{path}: {e}") from None
+    if not isinstance(doc, dict):
+        raise ValueError("knowledge base must be a JSON object")
+    return doc.get("symptoms", []), doc.get("diseases", {}), doc.get("rules", [])
+
+
+def read_sqlite(path):
+    import sqlite3
+
+    con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        symptoms = [name for (name,) in con.execute("SELECT name FROM symptoms ORDER BY rowid")]
+        database = {name: {"symptoms": {}, "advice": advice or ""}
+                    for name, advice in con.execute("SELECT name, advice FROM diseases ORDER BY rowid")}
+        for disease, symptom, weight in con.execute("SELECT disease, symptom, weight FROM weights ORDER BY rowid"):
+            if disease not in database:
+                raise ValueError(f"weight for unknown disease {disease!r}")
+            database[disease]["symptoms"][symptom] = weight
+        rules = []
+        if con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'rules'").fetchone():
+            rules = [text for (text,) in con.execute("SELECT text FROM rules ORDER BY rowid")]
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"{path}: {e}") from None
+    finally:
+        con.close()
+    return symptoms, database, rules
+
+
+def check(symptoms, database, rules=()):
+    """Raise ValueError when the knowledge base cannot be scored or its rules do not parse."""
+    if not isinstance(symptoms, list) or not all(isinstance(s, str) for s in symptoms):
+        raise ValueError("symptoms must be a list of names")
+    if not isinstance(database, dict):
+        raise ValueError("diseases must map names to entries")
+    for disease, entry in database.items():
+        weights = entry.get("symptoms") if isinstance(entry, dict) else None
+        if not isinstance(weights, dict):
+            raise ValueError(f"{disease}: missing symptom weights")
+        for symptom, weight in weights.items():
+            if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0:
+                raise ValueError(f"{disease}: weight for {symptom!r} must be a positive number")
+        if not weights:
+            raise ValueError(f"{disease}: no symptoms")
+        if not isinstance(entry.get("advice", ""), str):
+            raise ValueError(f"{disease}: advice must be text")
+    if not isinstance(rules, list) or not all(isinstance(r, str) for r in rules):
+        raise ValueError("rules must be a list of lines")
+    parse_rules(rules)
+
+
+def validate(symptoms, database, rules=()):
+    """Warnings for a knowledge base that check() accepts."""
+    warnings = []
+    listed = set(symptoms)
+    if len(listed) != len(symptoms):
+        warnings.append("symptom list has duplicates")
+    missing = {}
+    for disease, entry in database.items():
+        for symptom in entry["symptoms"]:
+            if symptom not in listed:
+                missing.setdefault(symptom, []).append(disease)
+    for symptom, diseases in missing.items():
+        warnings.append(f"symptom {symptom!r} used by {', '.join(diseases)} is missing from the symptom list")
+    for disease, entry in database.items():
+        if not entry.get("advice"):
+            warnings.append(f"{disease} has no advice")
+    if rules:
+        warnings += compile_rules(rules, list(symptoms) + list(database)).warnings
+    return warnings
+
+
+def _cache_path(path):
+    # The source's file name to read, a hash of its full path to tell same-named sources apart
+    name = f"{os.path.basename(path)}-{zlib.crc32(os.fsencode(path)):08x}{CACHE_SUFFIX}"
+    return os.path.join(CACHE_DIR, name)
+
+
+def _read_cache(path, crc, size):
+    try:
+        with open(_cache_path(path), "rb") as f:
+            blob = f.read()
+        header = CACHE_HEADER.unpack_from(blob)
+    except (OSError, struct.error):
+        return None
+    if header != (MAGIC, marshal.version, FORMAT, crc, size):
+        return None
+    try:
+        return marshal.loads(blob[CACHE_HEADER.size:])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_cache(path, crc, size, value):
+    target = _cache_path(path)
+    part = target + ".part"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(part, "wb") as f:
+            f.write(CACHE_HEADER.pack(MAGIC, marshal.version, FORMAT, crc, size))
+            f.write(marshal.dumps(value))
+        os.replace(part, target)
+    except OSError:
+        pass  # without a writable cache directory every start-up parses
+
+
+def load(path=DEFAULT_PATH, cache=True):
+    """KnowledgeBase from a JSON or SQLite source; ValueError if it is malformed."""
+    path = os.path.abspath(path)
+    mtime = _mtime(path)
+    with open(path, "rb") as f:
+        data = f.read()
+    crc, size = zlib.crc32(data), len(data)
+    cached = _read_cache(path, crc, size) if cache else None
+    if cached is not None:
+        symptoms, database, rules, warnings = cached
+        return KnowledgeBase(path, symptoms, database, warnings, mtime, rules)
+    if path.endswith(SQLITE_SUFFIXES):
+        symptoms, database, rules = read_sqlite(path)
+    else:
+        symptoms, database, rules = parse_json(data, path)
+    check(symptoms, database, rules)
+    warnings = validate(symptoms, database, rules)
+    if cache:
+        _write_cache(path, crc, size, (symptoms, database, rules, warnings))
+    return KnowledgeBase(path, symptoms, database, warnings, mtime, rules)
+
+
+class Watcher:
+    """Polls a knowledge base's source and reloads it after each change."""
+
+    def __init__(self, kb):
+        self.kb = kb
+        self.seen = kb.mtime
+
+    def poll(self):
+        """The reloaded KnowledgeBase if the source changed since the last poll, else None.
+
+        A failed load raises once; the same broken file is not retried
+        until it changes again.
+        """
+        mtime = _mtime(self.kb.path)
+        if mtime is None or mtime == self.seen:
+            return None
+        self.seen = mtime
+        self.kb = load(self.kb.path)
+        return self.kb
+
+
+def write_json(path, symptoms, database, rules=()):
+    import json
+
+    doc = {"symptoms": symptoms, "diseases": database}
+    if rules:
+        doc["rules"] = list(rules)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def write_sqlite(path, symptoms, database, rules=()):
+    import sqlite3
+
+    if os.path.exists(path):
+        os.remove(path)
+    con = sqlite3.connect(path)
+    with con:
+        con.execute("CREATE TABLE symptoms (name TEXT PRIMARY KEY)")
+        con.execute("CREATE TABLE diseases (name TEXT PRIMARY KEY, advice TEXT)")
+        con.execute("CREATE TABLE weights (disease TEXT REFERENCES diseases(name), symptom TEXT, weight REAL)")
+        con.executemany("INSERT INTO symptoms VALUES (?)", [(s,) for s in symptoms])
+        con.executemany("INSERT INTO diseases VALUES (?, ?)",
+                        [(name, entry.get("advice", "")) for name, entry in database.items()])
+        con.executemany("INSERT INTO weights VALUES (?, ?, ?)",
+                        [(name, symptom, weight) for name, entry in database.items()
+                         for symptom, weight in entry["symptoms"].items()])
+        if rules:
+            con.execute("CREATE TABLE rules (text TEXT)")
+            con.executemany("INSERT INTO rules VALUES (?)", [(r,) for r in rules])
+    con.close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate a knowledge base and build its cache.")
+    parser.add_argument("source", nargs="?", default=DEFAULT_PATH, help="JSON or SQLite knowledge base")
+    parser.add_argument("--sqlite", help="also write the knowledge base to this SQLite file")
+    parser.add_argument("--json", help="also write the knowledge base to this JSON file")
+    args = parser.parse_args(argv)
+    try:
+        kb = load(args.source)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    for warning in kb.warnings:
+        print(f"warning: {warning}")
+    if args.sqlite:
+        write_sqlite(args.sqlite, kb.symptoms, kb.database, kb.rules)
+    if args.json:
+        write_json(args.json, kb.symptoms, kb.database, kb.rules)
+    print(f"{kb.path}: {kb.summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
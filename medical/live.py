@@ -0,0 +1,69 @@
+"""Incremental diagnosis for one patient whose symptoms are toggled one at a time.
+
+Each toggle adds or subtracts the symptom's weight for just the diseases
+on its postings list in the compiled index, and moves those diseases in
+a sorted ranking. The cost of a toggle depends on how many diseases share
+the symptom, not on the size of the knowledge base. ranked() matches
+rank(get_diagnosis(...)) for the same symptoms.
+"""
+
+from bisect import bisect_left, insort
+
+from medical.index import compiled
+
+
+class LiveDiagnosis:
+    def __init__(self, database, symptoms=()):
+        self.index = compiled(database)
+        self.position = {name: d for d, name in enumerate(self.index.diseases)}
+        self.match = [0] * len(self.index.diseases)
+        self.confidence = [0.0] * len(self.index.diseases)
+        self.present = set()
+        self.ranking = []  # (-confidence, disease index) for every disease above zero, best first
+        for symptom in symptoms:
+            self.toggle(symptom, True)
+
+    def toggle(self, symptom, present):
+        """Report symptom present or absent; returns the names of diseases whose confidence changed."""
+        if present == (symptom in self.present):
+            return []
+        if present:
+            self.present.add(symptom)
+        else:
+            self.present.discard(symptom)
+        changed = []
+        for d, weight in self.index.postings.get(symptom, ()):
+            self.match[d] += weight if present else -weight
+            old = self.confidence[d]
+            new = self.index.confidence(d, self.match[d])
+            if new == old:
+                continue
+            if old > 0:
+                del self.ranking[bisect_left(self.ranking, (-old, d))]
+            if new > 0:
+                insort(self.ranking, (-new, d))
+            self.confidence[d] = new
+            changed.append(self.index.diseases[d])
+        return changed
+
+    def score(self, disease):
+        return self.confidence[self.position[disease]]
+
+    def ranked(self):
+        """Every match as a read-only sequence of (disease, confidence), without copying the ranking."""
+        return Ranking(self)
+
+
+class Ranking:
+    def __init__(self, live):
+        self.live = live
+
+    def __len__(self):
+        return len(self.live.ranking)
+
+    def __getitem__(self, key):
+        names = self.live.index.diseases
+        if isinstance(key, slice):
+            return [(names[d], -negative) for negative, d in self.live.ranking[key]]
+        negative, d = self.live.ranking[key]
+        return names[d], -negative
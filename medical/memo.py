@@ -0,0 +1,134 @@
+"""Memoized diagnosis results keyed by symptom bitmask.
+
+A patient's symptoms become an integer with one bit per symptom that some
+disease uses. A symptom set's entry holds everything derived from it: the
+scores and the top-k ranking (k=None keeps every match).
+
+When every symptom set costs at most FULL_WORK disease scores in total
+(2048 sets x 6 diseases for the bundled knowledge base), the memo keeps a
+table of all of them. The table is filled by lookups and by fill(),
+which the GUI calls a slice at a time while it is idle, so building a
+memo never blocks. Larger knowledge bases use a bounded LRU cache that
+counts hits, misses and evictions.
+
+memo_for() keeps one memo and builds a new one when it is given a
+different database object or k, which is what a knowledge-base reload
+produces.
+"""
+
+from collections import OrderedDict
+
+from medical.diagnosis import TOP_K, rank
+from medical.index import compiled
+
+FULL_BITS = 12  # vocabularies up to this size can be precomputed in full
+FULL_WORK = 1 << 18  # symptom sets x diseases, about half a second of scoring
+LRU_SIZE = 4096
+
+
+class Entry:
+    __slots__ = ("ranked", "scores")
+
+    def __init__(self, ranked, scores):
+        self.ranked = ranked  # top-k (disease, confidence), as top_diagnoses returns them
+        self.scores = scores  # {disease: confidence}, as get_diagnosis returns them; do not modify
+
+
+class DiagnosisMemo:
+    def __init__(self, database, vocabulary=(), k=TOP_K, full_bits=FULL_BITS, full_work=FULL_WORK,
+                 size=LRU_SIZE):
+        self.database = database
+        self.vocabulary = tuple(vocabulary)
+        self.index = compiled(database)
+        # Bits follow the checkbox order, then any symptoms only the diseases list
+        names = [s for s in dict.fromkeys(vocabulary) if s in self.index.postings]
+        listed = set(names)
+        names += [s for s in self.index.postings if s not in listed]
+        self.symptoms = names
+        self.bits = {symptom: 1 << i for i, symptom in enumerate(names)}
+        self.k = k
+        self.size = size
+        self.hits = self.misses = self.evictions = 0
+        self.table = None  # every symptom set's Entry, or None until computed
+        self.filled = 0  # table entries computed
+        self.next_mask = 0  # where fill() resumes
+        self.lru = OrderedDict()
+        if len(names) <= full_bits and (1 << len(names)) * len(database) <= full_work:
+            self.table = [None] * (1 << len(names))
+
+    def mask(self, symptoms):
+        """Bitmask for a {symptom: bool} mapping; symptoms no disease uses are dropped."""
+        mask = 0
+        bits = self.bits
+        for symptom, present in symptoms.items():
+            if present:
+                mask |= bits.get(symptom, 0)
+        return mask
+
+    def compute(self, mask):
+        chosen = {symptom: True for symptom, bit in self.bits.items() if mask & bit}
+        scores = self.index.score(chosen)
+        return Entry(rank(scores)[:self.k], scores)
+
+    def fill(self, work=None):
+        """Compute table entries costing about work disease scores (all if None); True once complete."""
+        table = self.table
+        if table is None:
+            return True
+        budget = None if work is None else max(1, work // max(1, len(self.database)))
+        while self.next_mask < len(table) and (budget is None or budget > 0):
+            mask = self.next_mask
+            self.next_mask += 1
+            if table[mask] is None:
+                table[mask] = self.compute(mask)
+                self.filled += 1
+                if budget is not None:
+                    budget -= 1
+        return self.next_mask == len(table)
+
+    def lookup(self, symptoms):
+        """The Entry for a {symptom: bool} mapping."""
+        mask = self.mask(symptoms)
+        if self.table is not None:
+            entry = self.table[mask]
+            if entry is None:
+                self.misses += 1
+                entry = self.table[mask] = self.compute(mask)
+                self.filled += 1
+            else:
+                self.hits += 1
+            return entry
+        entry = self.lru.get(mask)
+        if entry is not None:
+            self.hits += 1
+            self.lru.move_to_end(mask)
+            return entry
+        self.misses += 1
+        entry = self.lru[mask] = self.compute(mask)
+        if len(self.lru) > self.size:
+            self.lru.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self):
+        if self.table is not None:
+            return (f"{self.filled}/{len(self.table)} symptom sets precomputed, "
+                    f"{self.hits} hits, {self.misses} misses")
+        return (f"LRU {len(self.lru)}/{self.size}: {self.hits} hits, {self.misses} misses "
+                f"({self.hit_rate():.0%}), {self.evictions} evictions")
+
+
+_memo = None
+
+
+def memo_for(database, vocabulary=(), k=TOP_K):
+    """The memo for database, rebuilt when a different database object, vocabulary or k is passed."""
+    global _memo
+    vocabulary = tuple(vocabulary)
+    if _memo is None or _memo.database is not database or _memo.vocabulary != vocabulary or _memo.k != k:
+        _memo = DiagnosisMemo(database, vocabulary, k)
+    return _memo
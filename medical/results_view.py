@@ -0,0 +1,143 @@
+"""Paged, sortable ttk.Treeview of ranked diagnoses.
+
+Only the current page, at most PAGE_SIZE rows, exists as tree items. The
+first FIRST_ROWS are inserted as soon as results arrive. The rest of the
+page is added IDLE_ROWS at a time in after_idle callbacks, so a long list
+never blocks the window. Results can be any sequence of (disease,
+confidence) pairs in rank order that supports len() and slicing, so a
+live ranking is never copied while it is shown in rank order. Clicking a
+heading sorts by that column, and clicking it again reverses the order.
+refresh() changes only the rows on the page whose values differ.
+"""
+
+from tkinter import ttk
+
+PAGE_SIZE = 200
+FIRST_ROWS = 25
+IDLE_ROWS = 50
+
+COLUMNS = ("rank", "disease", "confidence", "advice")
+HEADINGS = {"rank": "#", "disease": "Disease", "confidence": "Confidence", "advice": "Advice"}
+WIDTHS = {"rank": 50, "disease": 160, "confidence": 90, "advice": 420}
+
+
+class ResultsView(ttk.Frame):
+    def __init__(self, master, advice=None, height=12, **kwargs):
+        super().__init__(master, **kwargs)
+        self.advice = advice or (lambda disease: "")
+        self.tree = ttk.Treeview(self, columns=COLUMNS, show="headings", height=height, selectmode="browse")
+        for column in COLUMNS:
+            self.tree.heading(column, text=HEADINGS[column], command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=WIDTHS[column], stretch=column == "advice",
+                             anchor="e" if column in ("rank", "confidence") else "w")
+        scroll = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scroll.set)
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        scroll.grid(row=0, column=1, sticky="ns")
+
+        nav = ttk.Frame(self)
+        nav.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(4, 0))
+        self.prev_button = ttk.Button(nav, text="◀ Prev", command=lambda: self.show_page(self.page - 1))
+        self.prev_button.pack(side="left")
+        self.next_button = ttk.Button(nav, text="Next ▶", command=lambda: self.show_page(self.page + 1))
+        self.next_button.pack(side="right")
+        self.page_label = ttk.Label(nav, anchor="center")
+        self.page_label.pack(side="left", expand=True, fill="x")
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(0, weight=1)
+
+        self.results = []  # rank order
+        self.rows = []  # display order: self.results, or a sorted copy with ranks attached
+        self.sort_column = None  # None is rank order
+        self.reverse = False
+        self.page = 0
+        self.visible = []  # row values of the items on the page, in order
+        self.pending = None  # after_idle id while a page is still streaming in
+
+    def set_results(self, ranked):
+        """Show a new ranked sequence from its first page."""
+        self.results = ranked
+        self._order()
+        self.show_page(0)
+
+    def clear(self):
+        self.set_results([])
+
+    def refresh(self, ranked):
+        """Show a changed ranked sequence, keeping the page and rewriting only rows that differ."""
+        self.results = ranked
+        self._order()
+        last = max(0, (len(self.rows) - 1) // PAGE_SIZE)
+        if self.pending is not None or self.page > last:
+            self.show_page(min(self.page, last))
+            return
+        wanted = self._page_rows(self.page)
+        tree = self.tree
+        for i, (values, shown) in enumerate(zip(wanted, self.visible)):
+            if values != shown:
+                tree.item(f"row{i}", values=values)
+        for i in range(len(self.visible), len(wanted)):
+            tree.insert("", "end", iid=f"row{i}", values=wanted[i])
+        for i in range(len(wanted), len(self.visible)):
+            tree.delete(f"row{i}")
+        self.visible = wanted
+        self._label()
+
+    def sort_by(self, column):
+        if column == "rank" or (column == self.sort_column and self.reverse):
+            self.sort_column, self.reverse = None, False
+        elif column == self.sort_column:
+            self.reverse = True
+        else:
+            # Confidence sorts best first, text columns A to Z
+            self.sort_column, self.reverse = column, False
+        self._order()
+        self.show_page(0)
+
+    def _order(self):
+        if self.sort_column is None:
+            self.rows = self.results
+            return
+        rows = [(n, disease, confidence) for n, (disease, confidence) in enumerate(self.results, 1)]
+        if self.sort_column == "confidence":
+            rows.sort(key=lambda r: (-r[2], r[0]), reverse=self.reverse)
+        elif self.sort_column == "disease":
+            rows.sort(key=lambda r: r[1].lower(), reverse=self.reverse)
+        else:
+            rows.sort(key=lambda r: self.advice(r[1]).lower(), reverse=self.reverse)
+        self.rows = rows
+
+    def _page_rows(self, page):
+        start = page * PAGE_SIZE
+        chunk = self.rows[start:start + PAGE_SIZE]
+        if self.sort_column is None:
+            chunk = [(start + i + 1, disease, confidence) for i, (disease, confidence) in enumerate(chunk)]
+        return [(n, disease, f"{confidence}%", self.advice(disease)) for n, disease, confidence in chunk]
+
+    def show_page(self, page):
+        last = max(0, (len(self.rows) - 1) // PAGE_SIZE)
+        page = max(0, min(page, last))
+        if self.pending is not None:
+            self.after_cancel(self.pending)
+            self.pending = None
+        items = self.tree.get_children()
+        if items:
+            self.tree.delete(*items)
+        self.page = page
+        self.visible = self._page_rows(page)
+        self._insert(0, FIRST_ROWS)
+        self._label()
+
+    def _insert(self, start, count):
+        self.pending = None
+        end = min(len(self.visible), start + count)
+        for i in range(start, end):
+            self.tree.insert("", "end", iid=f"row{i}", values=self.visible[i])
+        if end < len(self.visible):
+            self.pending = self.after_idle(self._insert, end, IDLE_ROWS)
+
+    def _label(self):
+        pages = max(1, (len(self.rows) + PAGE_SIZE - 1) // PAGE_SIZE)
+        self.page_label.config(text=f"{len(self.rows):,} matches - page {self.page + 1} of {pages}")
+        self.prev_button.state(["!disabled"] if self.page > 0 else ["disabled"])
+        self.next_button.state(["!disabled"] if self.page < pages - 1 else ["disabled"])
@@ -0,0 +1,469 @@
+"""Forward-chaining rules for the expert system, compiled into a Rete-style network.
+
+One rule per line, "name: condition AND condition ... THEN fact", with an
+optional quoted message after the fact:
+
+    measles pattern: fever AND rash AND NOT cough THEN measles pattern "Isolate until measles is ruled out."
+    respiratory: AT LEAST 2 OF (cough, sore throat, runny nose) THEN respiratory infection
+    covid alert: respiratory infection AND loss of taste THEN covid alert "Test for COVID-19."
+    malaria alert: Malaria >= 70 AND chills THEN malaria alert "Get a blood test today."
+
+A condition is a fact, NOT fact, fact >= number (also >, <=, <) or AT
+LEAST n OF (fact, ...). Facts are symptoms (true or false), diseases
+(their weighted-scoring confidence) and the facts concluded by other
+rules, so rules chain. A concluded fact holds while at least one rule
+concluding it is active. Rules whose conclusions lead back to a NOT (or
+a < / <= test) of one of their own conclusions could switch each other
+on and off forever, so compiling them raises ValueError.
+
+Each distinct condition is one alpha node, shared by every rule that
+uses it. A rule's conditions, in a canonical order, form a chain of join
+(beta) nodes, and rules with a common prefix share the chain. Setting a
+fact re-tests only the alpha nodes that read it and walks down only from
+the joins whose state changed.
+
+    python -m medical.rules                   # profile the bundled knowledge base's rules
+    python -m medical.rules --check 2000      # fuzz the network against naive forward chaining
+"""
+
+import operator
+import sys
+import time
+
+OPERATORS = {">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt}
+MAX_STEPS = 100000  # fact changes allowed per update before the rules are declared unstable
+
+
+class Rule:
+    def __init__(self, name, conditions, conclusion, message, line):
+        self.name = name
+        self.conditions = conditions  # tuples, see parse_condition()
+        self.conclusion = conclusion
+        self.message = message
+        self.line = line
+
+
+def parse_condition(term):
+    """A condition tuple: ("is", f), ("not", f), ("cmp", f, op, number) or ("atleast", n, facts)."""
+    if term.startswith("NOT "):
+        return ("not", _fact(term[4:]))
+    if term.startswith("AT LEAST "):
+        count, sep, rest = term[9:].partition(" OF ")
+        rest = rest.strip()
+        if not sep or not (rest.startswith("(") and rest.endswith(")")):
+            raise ValueError(f"expected AT LEAST n OF (fact, ...): {term!r}")
+        facts = tuple(sorted({_fact(f) for f in rest[1:-1].split(",")}))
+        return ("atleast", _number(count, term), facts)
+    for symbol in OPERATORS:
+        if symbol in term:
+            fact, _, value = term.partition(symbol)
+            return ("cmp", _fact(fact), symbol, float(_number(value, term)))
+    return ("is", _fact(term))
+
+
+def _fact(text):
+    fact = text.strip()
+    if not fact:
+        raise ValueError("empty fact name")
+    return fact
+
+
+def _number(text, term):
+    text = text.strip()
+    try:
+        return int(text)
+    except ValueError:
+        try:
+            return float(text)
+        except ValueError:
+            raise ValueError(f"not a number in {term!r}") from None
+
+
+def parse_rule(text, line=0):
+    """Rule for one line of the rule language, or None for a blank or # comment line."""
+    text = text.strip()
+    if not text or text.startswith("#"):
+        return None
+    try:
+        name, sep, body = text.partition(":")
+        if not sep or not name.strip():
+            raise ValueError("expected 'name: conditions THEN fact'")
+        conditions, sep, then = body.partition(" THEN ")
+        if not sep:
+            raise ValueError("missing THEN")
+        fact, quote, message = then.partition('"')
+        if quote and not message.endswith('"'):
+            raise ValueError("unterminated message")
+        return Rule(name.strip(), tuple(parse_condition(t.strip()) for t in conditions.split(" AND ")),
+                    _fact(fact), message[:-1] if quote else "", line)
+    except ValueError as e:
+        raise ValueError(f"rule {line}: {e}") from None
+
+
+def parse_rules(lines):
+    rules, names = [], set()
+    for n, text in enumerate(lines, 1):
+        rule = parse_rule(text, n)
+        if rule is not None:
+            if rule.name in names:
+                raise ValueError(f"rule {n}: duplicate rule name {rule.name!r}")
+            names.add(rule.name)
+            rules.append(rule)
+    return rules
+
+
+def reads(condition):
+    """Facts a condition depends on."""
+    return condition[2] if condition[0] == "atleast" else (condition[1],)
+
+
+def _test(condition):
+    kind = condition[0]
+    if kind == "is":
+        fact = condition[1]
+        return lambda facts: bool(facts.get(fact))
+    if kind == "not":
+        fact = condition[1]
+        return lambda facts: not facts.get(fact)
+    if kind == "cmp":
+        _, fact, symbol, value = condition
+        compare = OPERATORS[symbol]
+        return lambda facts: compare(facts.get(fact) or 0, value)
+    _, count, names = condition
+    return lambda facts: sum(1 for f in names if facts.get(f)) >= count
+
+
+def negative_cycle(rules):
+    """Rules on a cycle of conclusions that passes through a negation, else None.
+
+    Such rules can switch each other on and off forever, so Network rejects
+    them instead of failing to settle on some patient later.
+    """
+    concluded = {rule.conclusion for rule in rules}
+    readers = {}  # concluded fact -> [(rule reading it, whether it reads it negated)]
+    for rule in rules:
+        for condition in rule.conditions:
+            negated = condition[0] == "not" or condition[0] == "cmp" and condition[2] in ("<", "<=")
+            for fact in reads(condition):
+                if fact in concluded:
+                    readers.setdefault(fact, []).append((rule, negated))
+    for fact, entries in readers.items():
+        for start, negated in entries:
+            if not negated:
+                continue
+            # Does the negating rule's conclusion lead back to the fact it negates?
+            path = {start.conclusion: [start]}
+            stack = [start.conclusion]
+            while stack:
+                current = stack.pop()
+                if current == fact:
+                    return path[current]
+                for rule, _ in readers.get(current, ()):
+                    if rule.conclusion not in path:
+                        path[rule.conclusion] = path[current] + [rule]
+                        stack.append(rule.conclusion)
+    return None
+
+
+class Alpha:
+    __slots__ = ("condition", "test", "value", "joins")
+
+    def __init__(self, condition):
+        self.condition = condition
+        self.test = _test(condition)
+        self.value = False
+        self.joins = []  # Beta nodes testing this condition
+
+
+class Beta:
+    __slots__ = ("parent", "alpha", "value", "children", "rules")
+
+    def __init__(self, parent, alpha):
+        self.parent = parent
+        self.alpha = alpha
+        self.value = False
+        self.children = []
+        self.rules = []  # rules whose last condition this is
+
+
+class Network:
+    """Compiled rules plus their working memory for one patient."""
+
+    def __init__(self, rules, known=None):
+        cycle = negative_cycle(rules)
+        if cycle:
+            names = ", ".join(repr(rule.name) for rule in cycle)
+            raise ValueError(f"rule {cycle[0].line}: rules {names} depend on their own conclusions "
+                             "through NOT, so they may never settle")
+        self.rules = rules
+        self.alphas = {}  # condition -> Alpha
+        self.betas = []  # in creation order, so parents come before children
+        self.by_fact = {}  # fact -> alpha nodes reading it
+        self.concluded = {rule.conclusion for rule in rules}
+        self.fired = {rule.name: 0 for rule in rules}
+        self.updates = 0
+        self.match_seconds = 0.0
+        shared = {}
+        for rule in rules:
+            node = None
+            for condition in sorted(set(rule.conditions), key=repr):
+                alpha = self.alphas.get(condition)
+                if alpha is None:
+                    alpha = self.alphas[condition] = Alpha(condition)
+                    for fact in reads(condition):
+                        self.by_fact.setdefault(fact, []).append(alpha)
+                key = (id(node), condition)
+                beta = shared.get(key)
+                if beta is None:
+                    beta = shared[key] = Beta(node, alpha)
+                    alpha.joins.append(beta)
+                    if node is not None:
+                        node.children.append(beta)
+                    self.betas.append(beta)
+                node = beta
+            node.rules.append(rule)
+        self.inputs = set(self.by_fact) - self.concluded  # facts the caller supplies
+        self.warnings = []
+        if known is not None:
+            for fact in sorted(self.inputs - set(known)):
+                self.warnings.append(f"rules use {fact!r}, which is neither a symptom, a disease nor a conclusion")
+        self.reset()
+
+    def reset(self):
+        """Forget every fact and settle the network from scratch."""
+        self.facts = {}
+        self.support = dict.fromkeys(self.concluded, 0)
+        self.active = set()
+        for alpha in self.alphas.values():
+            alpha.value = alpha.test(self.facts)
+        for beta in self.betas:
+            beta.value = False
+        queue = []
+        for beta in self.betas:
+            if beta.parent is None:
+                self._join(beta, queue)
+        self._settle(queue)
+
+    def _join(self, beta, queue):
+        value = beta.alpha.value and (beta.parent is None or beta.parent.value)
+        if value == beta.value:
+            return
+        beta.value = value
+        for rule in beta.rules:
+            if value:
+                self.active.add(rule.name)
+                self.fired[rule.name] += 1
+                self.support[rule.conclusion] += 1
+            else:
+                self.active.discard(rule.name)
+                self.support[rule.conclusion] -= 1
+            queue.append((rule.conclusion, None))
+        for child in beta.children:
+            self._join(child, queue)
+
+    def _settle(self, queue):
+        steps = 0
+        while queue:
+            fact, value = queue.pop()
+            if value is None:  # a conclusion; read its support when it is processed
+                value = self.support[fact] > 0
+            if self.facts.get(fact, False) == value:
+                continue
+            self.facts[fact] = value
+            steps += 1
+            if steps > MAX_STEPS:
+                raise RuntimeError("rules do not settle; check for rules that negate their own conclusion")
+            for alpha in self.by_fact.get(fact, ()):
+                new = alpha.test(self.facts)
+                if new != alpha.value:
+                    alpha.value = new
+                    for beta in alpha.joins:
+                        self._join(beta, queue)
+
+    def update(self, facts):
+        """Set input facts from a {fact: value} mapping; unread facts are ignored."""
+        start = time.perf_counter()
+        queue = [(fact, value) for fact, value in facts.items() if fact in self.inputs]
+        self._settle(queue)
+        self.updates += 1
+        self.match_seconds += time.perf_counter() - start
+
+    def observe(self, symptoms, scores):
+        """Feed a {symptom: bool} mapping and {disease: confidence} scores (missing diseases score 0)."""
+        facts = {fact: bool(symptoms.get(fact)) for fact in self.inputs if fact in symptoms}
+        for fact in self.inputs:
+            if fact not in facts:
+                facts[fact] = scores.get(fact, 0)
+        self.update(facts)
+
+    def findings(self):
+        """Messages of the active rules that have one, in rule order."""
+        return [rule.message for rule in self.rules if rule.message and rule.name in self.active]
+
+    def profile(self):
+        conditions = sum(len(set(rule.conditions)) for rule in self.rules)
+        lines = [f"{len(self.rules)} rules, {conditions} conditions -> "
+                 f"{len(self.alphas)} alpha and {len(self.betas)} join nodes"]
+        if self.updates:
+            lines.append(f"{self.updates} updates, {self.match_seconds * 1000:.2f} ms matching "
+                         f"({self.match_seconds / self.updates * 1e6:.1f} us per update)")
+        for rule in self.rules:
+            lines.append(f"  {self.fired[rule.name]:>8}  {rule.name}")
+        return "\n".join(lines)
+
+
+def compile_rules(lines, known=None):
+    """Network for rule-language lines; ValueError names the first bad line."""
+    return Network(parse_rules(lines), known)
+
+
+# Self-check: random rule sets against naive forward chaining
+
+PARSE_ERRORS = (
+    (["fever THEN x"], "rule 1: expected 'name: conditions THEN fact'"),
+    (["a: fever AND rash"], "rule 1: missing THEN"),
+    (['a: fever THEN x "see a doctor'], "rule 1: unterminated message"),
+    (["a: THEN x"], "rule 1: empty fact name"),
+    (["a: AT LEAST 2 OF fever, rash THEN x"], "rule 1: expected AT LEAST n OF (fact, ...)"),
+    (["a: Malaria >= high THEN x"], "rule 1: not a number"),
+    (["a: fever THEN x", "", "a: rash THEN y"], "rule 3: duplicate rule name 'a'"),
+)
+
+COMPILE_ERRORS = (
+    (["a: fever AND NOT x THEN x"], "rule 1: rules 'a' depend on their own conclusions through NOT"),
+    (["a: fever AND NOT y THEN x", "b: x THEN z", "c: z THEN y"],
+     "rule 1: rules 'a', 'b', 'c' depend on their own conclusions through NOT"),
+    (["a: fever THEN x", "b: x < 1 THEN y", "c: y THEN x"],
+     "rule 2: rules 'b', 'c' depend on their own conclusions through NOT"),
+)
+
+
+def naive_active(rules, inputs):
+    """Names of the active rules, re-testing every rule until nothing changes."""
+    tests = [(rule, [_test(c) for c in rule.conditions]) for rule in rules]
+    concluded = {rule.conclusion for rule in rules}
+    active = None
+    for _ in range(len(rules) + 2):
+        facts = dict(inputs)
+        facts.update((fact, False) for fact in concluded)
+        facts.update((rule.conclusion, True) for rule in rules if active and rule.name in active)
+        now = {rule.name for rule, conditions in tests if all(test(facts) for test in conditions)}
+        if now == active:
+            return active
+        active = now
+    raise RuntimeError("naive forward chaining did not settle")
+
+
+def random_rules(rng, symptoms, diseases, conclusions, count):
+    """Rule-language lines for count random rules.
+
+    A rule reads only earlier conclusions, so the rules settle to one
+    fixpoint whatever order they are evaluated in.
+    """
+    lines = []
+    for n in range(count):
+        level = rng.randrange(len(conclusions))
+        facts = symptoms + conclusions[:level]
+        terms = []
+        for _ in range(rng.randint(1, 4)):
+            kind = rng.random()
+            if kind < 0.4:
+                terms.append(rng.choice(facts))
+            elif kind < 0.6:
+                terms.append("NOT " + rng.choice(facts))
+            elif kind < 0.8:
+                symbol = rng.choice(list(OPERATORS))
+                terms.append(f"{rng.choice(diseases)} {symbol} {rng.choice((0, 25, 50, 50.5, 75))}")
+            else:
+                chosen = rng.sample(facts, rng.randint(1, min(4, len(facts))))
+                terms.append(f"AT LEAST {rng.randint(1, len(chosen))} OF ({', '.join(chosen)})")
+        message = f' "message {n}"' if rng.random() < 0.5 else ""
+        lines.append(f"r{n}: {' AND '.join(terms)} THEN {conclusions[level]}{message}")
+    return lines
+
+
+def check(cases, seed=0, steps=20):
+    """Failure descriptions from the error tables and cases random networks."""
+    import random
+
+    failures = []
+    for lines, expected in PARSE_ERRORS + COMPILE_ERRORS:
+        try:
+            compile_rules(lines)
+            failures.append(f"{lines!r} compiled; expected {expected!r}")
+        except ValueError as e:
+            if not str(e).startswith(expected):
+                failures.append(f"{lines!r} raised {str(e)!r}; expected {expected!r}")
+
+    rng = random.Random(seed)
+    symptoms = [f"s{i}" for i in range(6)]
+    diseases = [f"D{i}" for i in range(3)]
+    conclusions = [f"c{i}" for i in range(5)]
+    for case in range(cases):
+        lines = random_rules(rng, symptoms, diseases, conclusions, rng.randint(1, 8))
+        rules = parse_rules(lines)
+        network = Network(rules)
+        state = {}
+        for step in range(steps):
+            if rng.random() < 0.1:
+                network.reset()
+                state = {}
+            elif rng.random() < 0.5:
+                changes = {fact: rng.random() < 0.5 for fact in rng.sample(symptoms, rng.randint(1, 3))}
+                changes.update((d, rng.choice((0, 25, 50, 60, 75, 100))) for d in diseases if rng.random() < 0.3)
+                network.update(changes)
+                state.update(changes)
+            else:
+                present = {fact: rng.random() < 0.5 for fact in symptoms}
+                scores = {d: rng.choice((25, 50, 60, 75, 100)) for d in diseases if rng.random() < 0.7}
+                network.observe(present, scores)
+                state = dict(present, **{d: scores.get(d, 0) for d in diseases})
+            expected = naive_active(rules, state)
+            if network.active != expected:
+                failures.append(f"case {case} step {step}: network {sorted(network.active)}, naive "
+                                f"{sorted(expected)}\n  facts {state}\n  " + "\n  ".join(lines))
+                break
+    return failures
+
+
+def main(argv=None):
+    import argparse
+    import random
+
+    from medical.index import compiled
+    from medical.kb import DEFAULT_PATH, load
+
+    parser = argparse.ArgumentParser(description="Compile a knowledge base's rules and profile matching.")
+    parser.add_argument("source", nargs="?", default=DEFAULT_PATH, help="JSON or SQLite knowledge base")
+    parser.add_argument("--patients", type=int, default=10000, help="random patients to run through the rules")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check", type=int, metavar="N",
+                        help="check the parser and N random rule sets against naive forward chaining instead")
+    args = parser.parse_args(argv)
+
+    if args.check is not None:
+        failures = check(args.check, args.seed)
+        for failure in failures[:5]:
+            print(failure)
+        print(f"{len(failures)} failures ({len(PARSE_ERRORS)} parse errors, {len(COMPILE_ERRORS)} compile errors, "
+              f"{args.check} random rule sets)")
+        return 1 if failures else 0
+    kb = load(args.source)
+    try:
+        network = compile_rules(kb.rules, list(kb.symptoms) + list(kb.database))
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    for warning in network.warnings:
+        print(f"warning: {warning}")
+    rng = random.Random(args.seed)
+    index = compiled(kb.database)
+    for _ in range(args.patients):
+        symptoms = {symptom: rng.random() < 0.3 for symptom in kb.symptoms}
+        network.observe(symptoms, index.score(symptoms))
+    print(network.profile())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Seeded synthetic knowledge bases and patients for benchmarking.
+
+Symptom popularity follows a Zipf-like curve (skew 0 is uniform), so a few
+symptoms such as fever are shared by many diseases, as in real data.
+Disease weights are drawn from one of WEIGHTS. Most patients are built
+from one disease: each of its symptoms is present with probability
+RECALL, plus a few unrelated symptoms. The rest have only unrelated
+symptoms. The same seed always gives the same data.
+
+    python -m medical.synthetic --diseases 5000 --symptoms 800 --kb kb.json --patients 100000 --out p.jsonl
+"""
+
+import json
+import random
+import sys
+
+WEIGHTS = ("uniform", "geometric", "constant", "fractional")
+RECALL = 0.7  # chance a patient built from a disease reports each of its symptoms
+SICK = 0.8  # share of patients built from a disease
+
+
+def _popularity(count, skew):
+    return [1 / (rank + 1) ** skew for rank in range(count)]
+
+
+def _sample(rng, population, cumulative, k):
+    """k distinct items drawn by popularity."""
+    k = min(k, len(population))
+    chosen = set()
+    while len(chosen) < k:
+        chosen.update(rng.choices(population, cum_weights=cumulative, k=k - len(chosen)))
+    return sorted(chosen)
+
+
+def _weight(rng, distribution, max_weight):
+    if distribution == "constant":
+        return 1
+    if distribution == "fractional":  # tenths, as hand-written knowledge bases use
+        return rng.randint(1, max_weight * 10) / 10
+    if distribution == "geometric":  # small weights common, large ones rare
+        weight = 1
+        while weight < max_weight and rng.random() < 0.5:
+            weight += 1
+        return weight
+    return rng.randint(1, max_weight)
+
+
+def _cumulative(weights):
+    total, out = 0.0, []
+    for w in weights:
+        total += w
+        out.append(total)
+    return out
+
+
+def generate_kb(diseases=1000, symptoms=200, per_disease=6, weights="uniform", max_weight=5,
+                skew=1.0, seed=0):
+    """(symptom list, database) with the layout of DISEASE_DATABASE."""
+    if weights not in WEIGHTS:
+        raise ValueError(f"weights must be one of {', '.join(WEIGHTS)}")
+    rng = random.Random(seed)
+    names = [f"symptom {i:0{len(str(symptoms - 1))}d}" for i in range(symptoms)]
+    cumulative = _cumulative(_popularity(symptoms, skew))
+    database = {}
+    for d in range(diseases):
+        count = max(1, min(symptoms, round(rng.gauss(per_disease, per_disease / 3))))
+        chosen = _sample(rng, names, cumulative, count)
+        database[f"Disease {d}"] = {
+            "symptoms": {s: _weight(rng, weights, max_weight) for s in chosen},
+            "advice": f"Synthetic advice for disease {d}.",
+        }
+    return names, database
+
+
+def generate_patients(symptoms, database, count=1000, noise=2, skew=1.0, seed=0):
+    """Yield count {symptom: True} mappings for the knowledge base."""
+    rng = random.Random(seed)
+    cumulative = _cumulative(_popularity(len(symptoms), skew))
+    diseases = list(database)
+    for _ in range(count):
+        present = set()
+        if rng.random() < SICK:
+            disease = database[rng.choice(diseases)]["symptoms"]
+            present.update(s for s in disease if rng.random() < RECALL)
+        extra = min(len(symptoms), int(rng.expovariate(1 / noise)) if noise else 0)
+        present.update(_sample(rng, symptoms, cumulative, extra) if extra else ())
+        yield dict.fromkeys(sorted(present), True)
+
+
+def main(argv=None):
+    import argparse
+
+    from medical.kb import write_json
+
+    parser = argparse.ArgumentParser(description="Write a synthetic knowledge base and patients.")
+    parser.add_argument("--diseases", type=int, default=1000)
+    parser.add_argument("--symptoms", type=int, default=200, help="symptom vocabulary size")
+    parser.add_argument("--per-disease", type=float, default=6, help="mean symptoms per disease")
+    parser.add_argument("--weights", choices=WEIGHTS, default="uniform")
+    parser.add_argument("--max-weight", type=int, default=5)
+    parser.add_argument("--skew", type=float, default=1.0, help="symptom popularity skew (0 = uniform)")
+    parser.add_argument("--noise", type=float, default=2, help="mean unrelated symptoms per patient")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--kb", help="write the knowledge base here (JSON)")
+    parser.add_argument("--patients", type=int, default=0)
+    parser.add_argument("--out", default="-", help="patients as JSON lines (default: stdout)")
+    args = parser.parse_args(argv)
+
+    symptoms, database = generate_kb(args.diseases, args.symptoms, args.per_disease, args.weights,
+                                     args.max_weight, args.skew, args.seed)
+    if args.kb:
+        write_json(args.kb, symptoms, database)
+    if args.patients:
+        out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+        try:
+            patients = generate_patients(symptoms, database, args.patients, args.noise, args.skew, args.seed + 1)
+            for n, patient in enumerate(patients):
+                out.write(json.dumps({"id": n, "symptoms": list(patient)}) + "\n")
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
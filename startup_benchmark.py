@@ -0,0 +1,126 @@
+"""Guard the import time of the Tk-free core modules.
+
+Each module is imported in a fresh interpreter, best of --repeats. A
+core module fails the check when it goes over its budget, or when it
+pulls in a GUI, audio or other heavy dependency that should only load
+with a window or on first use. The app scripts are imported too. They
+may import tkinter, but must not create a Tk root or load pygame on
+import.
+
+    python startup_benchmark.py            # print import times
+    python startup_benchmark.py --check    # exit 1 on a regression
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Budgets in milliseconds, several times what a warm import takes today
+CORE_MODULES = {
+    "tictactoe.bitboard": 40,
+    "tictactoe.engines": 60,
+    "tictactoe.nxn": 15,
+    "tictactoe.mcts": 20,
+    "tictactoe.records": 15,
+    "tictactoe.tablebase": 20,
+    "medical.diagnosis": 10,
+    "medical.kb": 10,
+    "medical.live": 10,
+    "medical.rules": 10,
+    "medical.memo": 10,
+    "typingtest.core": 20,
+}
+APP_MODULES = ["expt11alphabetaNEW", "expt11alphabetaNEW1", "expt11alphabetaNEW11", "expt12new", "typingspeed"]
+
+CORE_FORBIDDEN = ["tkinter", "pygame", "numpy", "asyncio", "multiprocessing", "concurrent.futures", "argparse",
+                  "sqlite3"]
+APP_FORBIDDEN = ["pygame", "numpy"]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+__import__({name!r})
+elapsed = time.perf_counter() - start
+loaded = [m for m in {watched!r} if m in sys.modules]
+tk = sys.modules.get("tkinter")
+import json
+print(json.dumps({{"ms": elapsed * 1000, "loaded": loaded,
+                  "tk_root": bool(tk and getattr(tk, "_default_root", None))}}))
+"""
+
+
+def probe(name, watched):
+    code = PROBE.format(name=name, watched=watched)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                         capture_output=True, text=True, timeout=60)
+    if out.returncode:
+        return {"error": out.stderr.strip().splitlines()[-1] if out.stderr else "failed"}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure(name, watched, repeats):
+    best = None
+    for _ in range(repeats):
+        result = probe(name, watched)
+        if "error" in result:
+            return result
+        if best is None or result["ms"] < best["ms"]:
+            best = result
+    return best
+
+
+def run(repeats):
+    rows, problems = [], []
+    for name, budget in CORE_MODULES.items():
+        result = measure(name, CORE_FORBIDDEN, repeats)
+        rows.append((name, result, budget))
+        if "error" in result:
+            problems.append(f"{name}: import failed: {result['error']}")
+            continue
+        if result["ms"] > budget:
+            problems.append(f"{name}: {result['ms']:.1f} ms over its {budget} ms budget")
+        if result["loaded"]:
+            problems.append(f"{name}: imports {', '.join(result['loaded'])}")
+    for name in APP_MODULES:
+        result = measure(name, APP_FORBIDDEN, 1)
+        rows.append((name, result, None))
+        if "error" in result:
+            problems.append(f"{name}: import failed: {result['error']}")
+            continue
+        if result["loaded"]:
+            problems.append(f"{name}: imports {', '.join(result['loaded'])}")
+        if result["tk_root"]:
+            problems.append(f"{name}: creates a Tk root on import")
+    return rows, problems
+
+
+def report(rows):
+    lines = [f"{'module':<24}{'ms':>9}{'budget':>9}  heavy imports"]
+    for name, result, budget in rows:
+        if "error" in result:
+            lines.append(f"{name:<24}{'error':>9}")
+            continue
+        limit = f"{budget}" if budget else "-"
+        lines.append(f"{name:<24}{result['ms']:>9.1f}{limit:>9}  {', '.join(result['loaded']) or '-'}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time of the core modules.")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="exit 1 on budget or dependency violations")
+    args = parser.parse_args(argv)
+    rows, problems = run(args.repeats)
+    print(report(rows))
+    for problem in problems:
+        print("REGRESSION", problem)
+    return 1 if args.check and problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
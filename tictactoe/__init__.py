@@ -0,0 +1 @@
+"""Tk-free Tic Tac Toe engines shared by the game windows."""
@@ -0,0 +1,160 @@
+"""Batched NumPy solver for large sets of 3x3 positions.
+
+Boards are an (n, 9) integer array in row-major cell order with 0 for an
+empty cell, 1 for X and 2 for O. Instead of recursing per board, the
+solver builds a value table for every one of the 3**9 boards, one search
+depth at a time: depth d is a single vectorized max/min over the depth
+d - 1 values of all children. A batch is then answered by indexing that
+table, and best moves come from one more vectorized step over each
+board's children.
+
+Values and moves match TicTacToe.alpha_beta: +1/-1/0 from X's side, the
+first row-major move reaching the best value, and -1 as the move for a
+position that is already over (or searched to depth 0).
+
+    python -m tictactoe.batch --verify 20000
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+EMPTY, X, O = 0, 1, 2
+MAX_DEPTH = 9
+POW3 = 3 ** np.arange(9, dtype=np.int64)
+CODES = np.arange(3 ** 9, dtype=np.int64)
+DIGITS = (CODES[:, None] // POW3) % 3
+
+# Rows, columns, diagonals, in the order check_winner scans them.
+LINES = np.array([[0, 1, 2], [3, 4, 5], [6, 7, 8],
+                  [0, 3, 6], [1, 4, 7], [2, 5, 8],
+                  [0, 4, 8], [2, 4, 6]])
+
+_values = None
+
+
+def winners(boards):
+    """Owner (1 or 2) of the first completed line of each board, or 0."""
+    cells = boards[:, LINES]
+    won = (cells[:, :, 0] != EMPTY) & (cells[:, :, 0] == cells[:, :, 1]) & (cells[:, :, 1] == cells[:, :, 2])
+    first = won.argmax(axis=1)
+    owner = cells[np.arange(len(boards)), first, 0]
+    return np.where(won.any(axis=1), owner, EMPTY)
+
+
+def terminal_values(boards):
+    """(is_terminal, value) for each board, as alpha_beta sees them before searching."""
+    owner = winners(boards)
+    full = (boards != EMPTY).all(axis=1)
+    value = np.select([owner == X, owner == O], [1, -1], 0).astype(np.int8)
+    return (owner != EMPTY) | full, value
+
+
+def _children(codes, empty):
+    """Child codes after X or O plays each cell; 0 where the cell is taken."""
+    after_x = np.where(empty, codes[:, None] + POW3 * X, 0)
+    after_o = np.where(empty, codes[:, None] + POW3 * O, 0)
+    return after_x, after_o
+
+
+def value_tables():
+    """values[d][side, code] for d = 0..9; side 0 is X to move, 1 is O to move."""
+    global _values
+    if _values is None:
+        terminal, term_value = terminal_values(DIGITS)
+        empty = DIGITS == EMPTY
+        after_x, after_o = _children(CODES, empty)
+        level = np.where(terminal, term_value, 0).astype(np.int8)
+        values = [np.stack([level, level])]
+        for _ in range(MAX_DEPTH):
+            prev = values[-1]
+            best_x = np.where(empty, prev[1][after_x], -2).max(axis=1)
+            best_o = np.where(empty, prev[0][after_o], 2).min(axis=1)
+            values.append(np.stack([np.where(terminal, term_value, best_x),
+                                    np.where(terminal, term_value, best_o)]).astype(np.int8))
+        _values = values
+    return _values
+
+
+def encode(rows_list):
+    """Turn list-of-rows boards of "X"/"O"/" " into an (n, 9) array."""
+    marks = {" ": EMPTY, "X": X, "O": O}
+    return np.array([[marks[cell] for row in rows for cell in row] for rows in rows_list],
+                    dtype=np.int8).reshape(-1, 9)
+
+
+def solve(boards, is_max=True, depth=MAX_DEPTH):
+    """Return (values, moves) arrays for an (n, 9) batch of boards.
+
+    is_max may be a scalar or an (n,) array (True where X is to move).
+    """
+    boards = np.asarray(boards, dtype=np.int64).reshape(-1, 9)
+    n = len(boards)
+    is_max = np.broadcast_to(np.asarray(is_max, dtype=bool), (n,))
+    depth = min(depth, MAX_DEPTH)
+    values = value_tables()
+    side = np.where(is_max, 0, 1)
+    codes = boards @ POW3
+    result = values[depth][side, codes]
+
+    moves = np.full(n, -1, dtype=np.int8)
+    if depth == 0:
+        return result, moves
+    terminal, _ = terminal_values(boards)
+    empty = boards == EMPTY
+    after_x, after_o = _children(codes, empty)
+    prev = values[depth - 1]
+    # Score children from the mover's side so the first argmax is the first best move.
+    child = np.where(is_max[:, None], prev[1][after_x], -prev[0][after_o])
+    child = np.where(empty, child, -3)
+    moves = np.where(terminal, -1, child.argmax(axis=1)).astype(np.int8)
+    return result, moves
+
+
+def verify(count, seed=0, depths=(2, MAX_DEPTH)):
+    """Compare solve() with TicTacToe.alpha_beta on random boards; returns mismatches."""
+    from expt11alphabetaNEW11 import TicTacToe
+
+    # alpha_beta only looks at the board it is given, so no Tk window is needed.
+    engine = TicTacToe.__new__(TicTacToe)
+    rng = np.random.default_rng(seed)
+    boards = rng.integers(0, 3, size=(count, 9))
+    is_max = rng.integers(0, 2, size=count).astype(bool)
+    marks = {EMPTY: " ", X: "X", O: "O"}
+    bad = 0
+    for depth in depths:
+        values, moves = solve(boards, is_max, depth)
+        for board, side, value, move in zip(boards, is_max, values, moves):
+            rows = [[marks[int(c)] for c in board[i * 3:i * 3 + 3]] for i in range(3)]
+            score, cell = engine.alpha_beta(rows, depth, -float("inf"), float("inf"), bool(side))
+            cell = -1 if cell is None else cell[0] * 3 + cell[1]
+            if (score, cell) != (int(value), int(move)):
+                bad += 1
+    return bad
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve 3x3 positions in bulk.")
+    parser.add_argument("--verify", type=int, metavar="N", help="check N random boards against alpha_beta")
+    parser.add_argument("--bench", type=int, metavar="N", default=0, help="time a batch of N random boards")
+    args = parser.parse_args(argv)
+    if args.verify:
+        bad = verify(args.verify)
+        print(f"{bad} mismatches")
+        return 1 if bad else 0
+    start = time.perf_counter()
+    value_tables()
+    print(f"value tables built in {time.perf_counter() - start:.3f}s")
+    if args.bench:
+        boards = np.random.default_rng(0).integers(0, 3, size=(args.bench, 9))
+        start = time.perf_counter()
+        solve(boards)
+        elapsed = time.perf_counter() - start
+        print(f"{args.bench} boards in {elapsed:.3f}s ({args.bench / elapsed:,.0f} boards/sec)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
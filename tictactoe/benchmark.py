@@ -0,0 +1,253 @@
+"""Benchmark the minimax implementations in the three game windows.
+
+Engines compared:
+
+  new      module-level best_move/minimax in expt11alphabetaNEW.py
+  new1     TicTacToe.minimax in expt11alphabetaNEW1.py (root loop of ai_move)
+  new11    TicTacToe.alpha_beta in expt11alphabetaNEW11.py at depth 9
+  bitboard tictactoe.bitboard.alpha_beta, the engine behind get_ai_move
+
+Each engine picks X's move on a fixed corpus of opening, midgame and
+endgame positions. The shared transposition table is cleared before every
+move so runs are reproducible. Reported per position: best-of-N time per
+move, nodes visited (positions searched below the root), prune rate
+(share of the full game tree that was never visited) and peak traced
+memory. No Tk root is created.
+
+    python -m tictactoe.benchmark                 # print results
+    python -m tictactoe.benchmark --save          # write the baseline
+    python -m tictactoe.benchmark --check         # fail on regressions
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from tictactoe import bitboard
+from tictactoe.bitboard import FULL, MOVES, WINS, Position
+from tictactoe.transposition import TABLE
+
+VERSION = 1
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_baseline.json")
+
+# Board strings read row by row; X (the AI) is to move in every position.
+CORPUS = {
+    "opening/empty": "         ",
+    "opening/o-center": "    O    ",
+    "opening/o-corner": "O        ",
+    "opening/o-edge": " O       ",
+    "midgame/fork-threat": "O   X   O",
+    "midgame/block-needed": "XO  O    ",
+    "midgame/losing": "X O  O   ",
+    "endgame/lost": "XXOO O   ",
+    "endgame/win-column": "XOXXOO  O",
+    "endgame/win-diagonal": "XOXOXO  O",
+}
+
+
+def parse(text):
+    return [[text[i * 3 + j] for j in range(3)] for i in range(3)]
+
+
+def full_tree_size(x, o, is_max, memo={}):
+    """Positions below (x, o) in the unpruned game tree."""
+    key = (x, o, is_max)
+    if key not in memo:
+        total = 0
+        for cell in MOVES[x | o]:
+            cx, co = (x | 1 << cell, o) if is_max else (x, o | 1 << cell)
+            total += 1
+            if not (WINS[cx] or WINS[co] or cx | co == FULL):
+                total += full_tree_size(cx, co, not is_max)
+        memo[key] = total
+    return memo[key]
+
+
+class Counter:
+    """Wraps a recursive function and counts its calls."""
+
+    def __init__(self, func):
+        self.func = func
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.func(*args, **kwargs)
+
+
+def engine_new():
+    import expt11alphabetaNEW as new
+
+    counter = Counter(new.minimax)
+
+    def move(board):
+        new.minimax = counter
+        try:
+            return new.best_move(board)
+        finally:
+            new.minimax = counter.func
+    return move, counter, 0
+
+
+def engine_new1():
+    from expt11alphabetaNEW1 import AI, TicTacToe
+
+    game = TicTacToe.__new__(TicTacToe)
+    counter = Counter(game.minimax)
+    game.minimax = counter
+
+    def move(board):
+        # Same root loop as TicTacToe.ai_move, without placing the move.
+        game.board = board
+        best_score, best = float("-inf"), None
+        for i in range(3):
+            for j in range(3):
+                if board[i][j] == " ":
+                    board[i][j] = AI
+                    score = game.minimax(board, 0, False, float("-inf"), float("inf"))
+                    board[i][j] = " "
+                    if score > best_score:
+                        best_score, best = score, (i, j)
+        return best
+    return move, counter, 0
+
+
+def engine_new11():
+    from expt11alphabetaNEW11 import TicTacToe
+
+    game = TicTacToe.__new__(TicTacToe)
+    counter = Counter(game.alpha_beta)
+    game.alpha_beta = counter
+
+    def move(board):
+        return game.alpha_beta(board, 9, -float("inf"), float("inf"), True)[1]
+    # The root call is counted too.
+    return move, counter, 1
+
+
+def engine_bitboard():
+    counter = Counter(bitboard._value)
+
+    def move(board):
+        bitboard._value = counter
+        try:
+            return bitboard.best_move(board, 9)
+        finally:
+            bitboard._value = counter.func
+    return move, counter, 0
+
+
+ENGINES = {
+    "new": engine_new,
+    "new1": engine_new1,
+    "new11": engine_new11,
+    "bitboard": engine_bitboard,
+}
+
+
+def measure(make_engine, text, repeats):
+    move, counter, root_calls = make_engine()
+    times = []
+    for _ in range(repeats):
+        TABLE.clear()
+        counter.calls = 0
+        board = parse(text)
+        gc.disable()  # as timeit does
+        start = time.perf_counter()
+        move(board)
+        times.append(time.perf_counter() - start)
+        gc.enable()
+    nodes = counter.calls - root_calls
+
+    TABLE.clear()
+    tracemalloc.start()
+    move(parse(text))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    pos = Position.from_rows(parse(text))
+    full = full_tree_size(pos.x, pos.o, True)
+    return {
+        "time_ms": round(min(times) * 1000, 4),
+        "nodes": nodes,
+        "prune_rate": round(1 - nodes / full, 4) if full else 0.0,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(engines, repeats):
+    results = {}
+    for name in engines:
+        results[name] = {label: measure(ENGINES[name], text, repeats) for label, text in CORPUS.items()}
+    return {
+        "version": VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeats": repeats,
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold, slack_ms=0.25):
+    """List regressions: time or nodes worse than baseline by more than threshold.
+
+    Times also have to grow by slack_ms, so sub-millisecond jitter on the
+    endgame positions is not reported.
+    """
+    problems = []
+    for name, positions in current["results"].items():
+        for label, stats in positions.items():
+            old = baseline.get("results", {}).get(name, {}).get(label)
+            if old is None:
+                continue
+            for metric in ("time_ms", "nodes"):
+                limit = old[metric] * (1 + threshold)
+                if metric == "time_ms":
+                    limit = max(limit, old[metric] + slack_ms)
+                if old[metric] and stats[metric] > limit:
+                    problems.append(f"{name} {label}: {metric} {old[metric]} -> {stats[metric]}")
+    return problems
+
+
+def report(data):
+    lines = [f"{'engine':<10}{'position':<24}{'ms/move':>10}{'nodes':>10}{'pruned':>9}{'peak KiB':>10}"]
+    for name, positions in data["results"].items():
+        for label, stats in positions.items():
+            lines.append(f"{name:<10}{label:<24}{stats['time_ms']:>10.3f}{stats['nodes']:>10}"
+                         f"{stats['prune_rate']:>9.1%}{stats['peak_kib']:>10.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Tic Tac Toe search engines.")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="exit 1 if results regress past --threshold")
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown, 0.5 = 50%%")
+    args = parser.parse_args(argv)
+
+    data = run(args.engines, args.repeats)
+    print(report(data))
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+    if args.check:
+        with open(args.baseline) as f:
+            problems = compare(json.load(f), data, args.threshold)
+        for problem in problems:
+            print("REGRESSION", problem)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""Bitboard position and alpha-beta search for 3x3 Tic Tac Toe.
+
+Cells are numbered row by row (cell = i * 3 + j). Each side owns a 9-bit
+mask, so terminal detection is a couple of table lookups and the search
+never allocates per node. Scores follow the game windows: X (the AI) is
+the maximizing side, +1 is an X win, -1 an O win and 0 a draw.
+"""
+
+from tictactoe.transposition import SYMMETRIES, TABLE, position_key, probe_window, store_result
+
+SIZE = 3
+CELLS = SIZE * SIZE
+FULL = (1 << CELLS) - 1
+BITS = tuple(1 << cell for cell in range(CELLS))
+
+# Rows, columns, diagonals
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# WINS[mask] is True when the mask contains a full line.
+WINS = tuple(any(mask & line == line for line in WIN_MASKS) for mask in range(FULL + 1))
+
+# MOVES[occupied] lists the empty cells in row-major order.
+MOVES = tuple(tuple(cell for cell in range(CELLS) if not occupied & BITS[cell])
+              for occupied in range(FULL + 1))
+
+
+class Position:
+    __slots__ = ("x", "o")
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+
+    @classmethod
+    def from_rows(cls, board, x_mark="X", o_mark="O"):
+        x = o = 0
+        for i in range(SIZE):
+            for j in range(SIZE):
+                if board[i][j] == x_mark:
+                    x |= BITS[i * SIZE + j]
+                elif board[i][j] == o_mark:
+                    o |= BITS[i * SIZE + j]
+        return cls(x, o)
+
+    def make(self, cell, is_x):
+        if is_x:
+            self.x |= BITS[cell]
+        else:
+            self.o |= BITS[cell]
+
+    def unmake(self, cell, is_x):
+        if is_x:
+            self.x ^= BITS[cell]
+        else:
+            self.o ^= BITS[cell]
+
+    def winner(self):
+        if WINS[self.x]:
+            return "X"
+        if WINS[self.o]:
+            return "O"
+        return None
+
+    def is_full(self):
+        return self.x | self.o == FULL
+
+    def empty_cells(self):
+        return MOVES[self.x | self.o]
+
+
+def to_cell(i, j):
+    return i * SIZE + j
+
+
+def to_coords(cell):
+    return divmod(cell, SIZE)
+
+
+def _value(pos, depth, alpha, beta, is_max, table, stats=None):
+    if stats is not None:
+        stats.nodes += 1
+        stats.reached(stats.root_depth - depth)
+    if WINS[pos.x]:
+        return 1
+    if WINS[pos.o]:
+        return -1
+    occupied = pos.x | pos.o
+    if occupied == FULL or depth == 0:
+        return 0
+
+    if table is not None:
+        key, sym = position_key(pos.x, pos.o, is_max, depth)
+        score, alpha, beta = probe_window(table, key, alpha, beta)
+        if score is not None:
+            if stats is not None:
+                stats.tt_hits += 1
+            return score
+    window = (alpha, beta)
+
+    move = None
+    if is_max:
+        best = -2
+        for cell in MOVES[occupied]:
+            pos.x |= BITS[cell]
+            score = _value(pos, depth - 1, alpha, beta, False, table, stats)
+            pos.x ^= BITS[cell]
+            if score > best:
+                best, move = score, cell
+                if best > alpha:
+                    alpha = best
+            if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(is_max, stats.root_depth - depth)
+                break
+    else:
+        best = 2
+        for cell in MOVES[occupied]:
+            pos.o |= BITS[cell]
+            score = _value(pos, depth - 1, alpha, beta, True, table, stats)
+            pos.o ^= BITS[cell]
+            if score < best:
+                best, move = score, cell
+                if best < beta:
+                    beta = best
+            if beta <= alpha:
+                if stats is not None:
+                    stats.cutoff(is_max, stats.root_depth - depth)
+                break
+
+    if table is not None:
+        store_result(table, key, best, window, SYMMETRIES[sym][move])
+    return best
+
+
+def alpha_beta(pos, depth, alpha=-2, beta=2, is_max=True, table=TABLE, stats=None):
+    """Return (score, cell) like TicTacToe.alpha_beta; cell is None at a leaf.
+
+    Pass table=None to search without the shared transposition table, and
+    an instrument.SearchStats as stats to count nodes and cutoffs.
+    """
+    if stats is not None:
+        stats.start(depth)
+        try:
+            return _root(pos, depth, alpha, beta, is_max, table, stats)
+        finally:
+            stats.stop()
+    return _root(pos, depth, alpha, beta, is_max, table, None)
+
+
+def _root(pos, depth, alpha, beta, is_max, table, stats):
+    if stats is not None:
+        stats.nodes += 1
+    if WINS[pos.x]:
+        return (1, None)
+    if WINS[pos.o]:
+        return (-1, None)
+    occupied = pos.x | pos.o
+    if occupied == FULL or depth == 0:
+        return (0, None)
+
+    best, move = (-2, None) if is_max else (2, None)
+    for cell in MOVES[occupied]:
+        pos.make(cell, is_max)
+        score = _value(pos, depth - 1, alpha, beta, not is_max, table, stats)
+        pos.unmake(cell, is_max)
+        if is_max:
+            if score > best:
+                best, move = score, cell
+            alpha = max(alpha, best)
+        else:
+            if score < best:
+                best, move = score, cell
+            beta = min(beta, best)
+        if beta <= alpha:
+            if stats is not None:
+                stats.cutoff(is_max, 0)
+            break
+    return (best, move)
+
+
+def best_move(board, depth, is_max=True, table=TABLE, stats=None):
+    """Pick a move for a list-of-rows board; returns (i, j) or None."""
+    move = alpha_beta(Position.from_rows(board), depth, is_max=is_max, table=table, stats=stats)[1]
+    return None if move is None else to_coords(move)
@@ -0,0 +1,88 @@
+"""One tk.Canvas that draws a board, shared by the game windows.
+
+The grid lines and pieces are canvas items, so a board of any size is a
+single widget. Clicks are hit-tested from the pointer coordinates and
+passed on as on_click(i, j). set_cell only touches a cell whose mark
+changed, and the winning line is one overlay item on top.
+"""
+
+import tkinter as tk
+
+MARK_COLORS = {"X": "#1f4e99", "O": "#b03a2e"}
+
+
+class BoardCanvas(tk.Canvas):
+    def __init__(self, master, size=3, cell=100, on_click=None, font_family="Arial", **kwargs):
+        kwargs.setdefault("bg", "white")
+        kwargs.setdefault("highlightthickness", 0)
+        super().__init__(master, **kwargs)
+        self.on_click = on_click
+        self.font_family = font_family
+        self.enabled = True
+        self.bind("<Button-1>", self._click)
+        self.resize(size, cell)
+
+    def resize(self, size, cell=None):
+        """Redraw the empty grid for a size x size board."""
+        self.size = size
+        self.cell = cell or self.cell
+        self.font = (self.font_family, max(8, int(self.cell * 0.45)), "bold")
+        extent = size * self.cell
+        self.config(width=extent, height=extent)
+        self.delete("all")
+        for n in range(1, size):
+            offset = n * self.cell
+            self.create_line(offset, 0, offset, extent, fill="gray60", tags="grid")
+            self.create_line(0, offset, extent, offset, fill="gray60", tags="grid")
+        self.items = [[None] * size for _ in range(size)]
+        self.marks = [[" "] * size for _ in range(size)]
+        self.enabled = True
+
+    def center(self, i, j):
+        return (j + 0.5) * self.cell, (i + 0.5) * self.cell
+
+    def set_cell(self, i, j, mark):
+        if self.marks[i][j] == mark:
+            return
+        if self.items[i][j] is not None:
+            self.delete(self.items[i][j])
+            self.items[i][j] = None
+        if mark != " ":
+            x, y = self.center(i, j)
+            self.items[i][j] = self.create_text(x, y, text=mark, font=self.font,
+                                                fill=MARK_COLORS.get(mark, "black"), tags="mark")
+        self.marks[i][j] = mark
+
+    def sync(self, board):
+        """Bring the drawing in line with a list-of-rows board."""
+        for i, row in enumerate(board):
+            for j, mark in enumerate(row):
+                self.set_cell(i, j, mark)
+
+    def clear(self):
+        self.delete("mark", "highlight")
+        self.items = [[None] * self.size for _ in range(self.size)]
+        self.marks = [[" "] * self.size for _ in range(self.size)]
+        self.enabled = True
+
+    def highlight(self, cells, color="limegreen"):
+        """Strike through a winning line given as its cells in order."""
+        self.delete("highlight")
+        if cells:
+            x0, y0 = self.center(*cells[0])
+            x1, y1 = self.center(*cells[-1])
+            self.create_line(x0, y0, x1, y1, fill=color, width=max(3, self.cell // 10),
+                             capstyle=tk.ROUND, tags="highlight")
+
+    def clear_highlight(self):
+        self.delete("highlight")
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+
+    def _click(self, event):
+        if not self.enabled or self.on_click is None:
+            return
+        i, j = int(event.y // self.cell), int(event.x // self.cell)
+        if 0 <= i < self.size and 0 <= j < self.size:
+            self.on_click(i, j)
@@ -0,0 +1,65 @@
+"""Difficulty levels as plain functions on bitboard positions.
+
+Each engine takes (x, o, is_max, rng) and returns the cell to play, so the
+same levels back the game window and headless runs such as the
+tournament. X is the maximizing side. An optional instrument.SearchStats
+passed as stats is filled in by the search.
+"""
+
+import random
+
+from tictactoe import bitboard, mcts as uct, perfect_play
+from tictactoe.bitboard import MOVES, Position, to_coords
+
+MCTS_PLAYOUTS = 2000
+
+
+def easy(x, o, is_max, rng=random, stats=None):
+    if stats is not None:
+        stats.source = "random"
+    return rng.choice(MOVES[x | o])
+
+
+def medium(x, o, is_max, rng=random, stats=None):
+    move = bitboard.alpha_beta(Position(x, o), 2, is_max=is_max, stats=stats)[1]
+    return move if move is not None else rng.choice(MOVES[x | o])
+
+
+def hard(x, o, is_max, rng=random, stats=None):
+    entry = perfect_play.lookup(x, o, is_max)
+    if entry is not None:
+        if stats is not None:
+            stats.source = "table"
+        return entry[1]
+    return search(x, o, is_max, rng, stats)
+
+
+def search(x, o, is_max, rng=random, stats=None):
+    """Full-depth alpha-beta without the precomputed table."""
+    move = bitboard.alpha_beta(Position(x, o), 9, is_max=is_max, stats=stats)[1]
+    return move if move is not None else rng.choice(MOVES[x | o])
+
+
+def mcts(x, o, is_max, rng=random, stats=None):
+    """UCT with a fixed playout budget, in-process so it can run inside pool workers."""
+    cells = [uct.X if x >> c & 1 else uct.O if o >> c & 1 else uct.EMPTY for c in range(9)]
+    if stats is not None:
+        stats.source = "mcts"
+    cell = uct.best_cell(cells, uct.X if is_max else uct.O, 3, 3, playouts=MCTS_PLAYOUTS,
+                         seed=rng.randrange(1 << 30), stats=stats)
+    return cell if cell is not None else rng.choice(MOVES[x | o])
+
+
+ENGINES = {
+    "easy": easy,
+    "medium": medium,
+    "hard": hard,
+    "search": search,
+    "mcts": mcts,
+}
+
+
+def choose_move(level, board, is_max=True, rng=random, stats=None):
+    """Move for a list-of-rows board at a difficulty level ("Easy", "medium", ...)."""
+    pos = Position.from_rows(board)
+    return to_coords(ENGINES[level.lower()](pos.x, pos.o, is_max, rng, stats))
@@ -0,0 +1,68 @@
+"""Optional search instrumentation.
+
+Engines take stats=None. When a SearchStats is passed in they count
+nodes, alpha and beta cutoffs per ply, transposition hits and the deepest
+ply reached. With stats=None the only cost is an "is not None" test per
+node.
+"""
+
+import json
+import time
+
+
+class SearchStats:
+    __slots__ = ("engine", "source", "nodes", "alpha_cutoffs", "beta_cutoffs", "tt_hits",
+                 "max_depth", "root_depth", "started", "wall_ms")
+
+    def __init__(self, engine=""):
+        self.engine = engine
+        self.source = "search"
+        self.nodes = 0
+        self.alpha_cutoffs = {}
+        self.beta_cutoffs = {}
+        self.tt_hits = 0
+        self.max_depth = 0
+        self.root_depth = 0
+        self.started = None
+        self.wall_ms = 0.0
+
+    def start(self, root_depth=0):
+        self.root_depth = root_depth
+        self.started = time.perf_counter()
+
+    def stop(self):
+        self.wall_ms += (time.perf_counter() - self.started) * 1000
+
+    def reached(self, ply):
+        if ply > self.max_depth:
+            self.max_depth = ply
+
+    def cutoff(self, is_max, ply):
+        # A maximizing node failing high is a beta cutoff; a minimizing one an alpha cutoff.
+        counts = self.beta_cutoffs if is_max else self.alpha_cutoffs
+        counts[ply] = counts.get(ply, 0) + 1
+
+    def record(self, **extra):
+        record = {
+            "engine": self.engine,
+            "source": self.source,
+            "nodes": self.nodes,
+            "alpha_cutoffs": dict(sorted(self.alpha_cutoffs.items())),
+            "beta_cutoffs": dict(sorted(self.beta_cutoffs.items())),
+            "tt_hits": self.tt_hits,
+            "max_depth": self.max_depth,
+            "wall_ms": round(self.wall_ms, 3),
+        }
+        record.update(extra)
+        return record
+
+    def summary(self):
+        return (f"{self.engine} ({self.source}): {self.nodes} nodes | "
+                f"cutoffs a={sum(self.alpha_cutoffs.values())} b={sum(self.beta_cutoffs.values())} | "
+                f"TT hits {self.tt_hits} | depth {self.max_depth} | {self.wall_ms:.2f} ms")
+
+
+def append_trace(path, record):
+    """Append one record as a JSON line."""
+    with open(path, "a") as f:
+        f.write(json.dumps(record) + "\n")
@@ -0,0 +1,161 @@
+"""Load generator for tictactoe.server.
+
+Opens --connections connections that between them play --sessions games.
+The client picks random human moves and each connection keeps
+--concurrency sessions in flight. The run reports sessions per second
+and move latency percentiles, where latency is the time from sending a
+move to receiving the AI's reply.
+
+    python -m tictactoe.server --port 8765 &
+    python -m tictactoe.loadgen --port 8765 --sessions 5000 --connections 50
+
+--spawn starts a server on a temporary Unix socket for the run.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from tictactoe.tournament import percentile
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.waiting = {}
+        self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self):
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            reply = json.loads(line)
+            future = self.waiting.pop(reply.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(reply)
+        for future in self.waiting.values():
+            future.set_exception(ConnectionError("server closed the connection"))
+
+    async def call(self, **request):
+        request["id"] = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request["id"]] = future
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        reply = await future
+        if not reply["ok"]:
+            raise RuntimeError(reply["error"])
+        return reply
+
+    async def close(self):
+        self.writer.close()
+        self.listener.cancel()
+
+
+async def play_session(client, args, rng, latencies, results):
+    reply = await client.call(op="new", size=args.size, k=args.k, level=args.level,
+                              first="ai" if rng.random() < 0.5 else "human")
+    sid = reply["session"]
+    while reply["result"] is None:
+        empty = [(i, j) for i, row in enumerate(reply["board"]) for j, mark in enumerate(row) if mark == " "]
+        start = time.perf_counter()
+        reply = await client.call(op="move", session=sid, cell=rng.choice(empty))
+        latencies.append(time.perf_counter() - start)
+    results[reply["result"]] = results.get(reply["result"], 0) + 1
+    await client.call(op="close", session=sid)
+
+
+async def drive(args, quota, seed, latencies, results):
+    if args.unix:
+        reader, writer = await asyncio.open_unix_connection(args.unix)
+    else:
+        reader, writer = await asyncio.open_connection(args.host, args.port)
+    client = Client(reader, writer)
+    rng = random.Random(seed)
+    left = [quota]
+
+    async def lane():
+        while left[0] > 0:
+            left[0] -= 1
+            await play_session(client, args, rng, latencies, results)
+
+    try:
+        await asyncio.gather(*(lane() for _ in range(args.concurrency)))
+    finally:
+        await client.close()
+
+
+async def run(args):
+    latencies, results = [], {}
+    share, extra = divmod(args.sessions, args.connections)
+    quotas = [share + (n < extra) for n in range(args.connections)]
+    start = time.perf_counter()
+    await asyncio.gather(*(drive(args, quota, args.seed + n, latencies, results)
+                           for n, quota in enumerate(quotas) if quota))
+    return latencies, results, time.perf_counter() - start
+
+
+def report(args, latencies, results, elapsed):
+    samples = sorted(latencies)
+    ms = [percentile(samples, p) * 1000 for p in (50, 90, 99, 100)]
+    outcome = ", ".join(f"{name} {count}" for name, count in sorted(results.items()))
+    return "\n".join([
+        f"{args.sessions} sessions ({args.size}x{args.size}, {args.level}) over {args.connections} connections",
+        f"{elapsed:.2f}s, {args.sessions / elapsed:,.1f} sessions/sec, {len(samples) / elapsed:,.1f} moves/sec",
+        f"move latency ms: p50 {ms[0]:.2f}  p90 {ms[1]:.2f}  p99 {ms[2]:.2f}  max {ms[3]:.2f}",
+        f"results: {outcome}",
+    ])
+
+
+def spawn_server(args):
+    """Start python -m tictactoe.server on a temporary Unix socket."""
+    args.unix = os.path.join(tempfile.mkdtemp(), "tictactoe.sock")
+    command = [sys.executable, "-m", "tictactoe.server", "--unix", args.unix]
+    if args.workers is not None:
+        command += ["--workers", str(args.workers)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()  # "Serving ..." once it listens
+    return process
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive tictactoe.server with simulated players.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH")
+    parser.add_argument("--spawn", action="store_true", help="start a server for the run")
+    parser.add_argument("--workers", type=int, default=None, help="server search processes with --spawn")
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--connections", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5, help="sessions in flight per connection")
+    parser.add_argument("--size", type=int, default=3)
+    parser.add_argument("--k", type=int, default=None)
+    parser.add_argument("--level", default="hard")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    args.k = args.k or min(args.size, 5)
+
+    server = spawn_server(args) if args.spawn else None
+    try:
+        latencies, results, elapsed = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()  # the server shuts its search pool down on SIGTERM
+            server.wait()
+            shutil.rmtree(os.path.dirname(args.unix), ignore_errors=True)
+    print(report(args, latencies, results, elapsed))
+
+
+if __name__ == "__main__":
+    main()
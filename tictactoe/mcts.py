@@ -0,0 +1,323 @@
+"""Monte Carlo Tree Search (UCT) engine for any N x N, k-in-a-row board.
+
+Strength scales with the playout or time budget. Random playouts run on
+a flat list of cells with a reused scratch board and a reused buffer of
+empty cells, so a playout allocates nothing. A win is detected by walking
+the four directions through the last move only.
+
+With workers > 1 the search is root-parallel: every process grows its own
+tree from a different seed and the root visit counts are summed. The
+shared pool is started with "spawn", because the GUI searches from a
+worker thread and forking a threaded Tk process is unsafe. Setting stop
+cancels the tasks that have not started and signals the running ones
+through an Event shared with the pool, so they return within 64 playouts.
+"""
+
+import math
+import os
+import _thread  # a lock without importing threading at startup
+import random
+import time
+
+EMPTY, X, O = 0, 1, 2
+DRAW = 3
+EXPLORATION = math.sqrt(2)
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+POLL_SECONDS = 0.05  # how often a root-parallel search checks stop
+
+_pool = None
+_pool_workers = 0
+_pool_cancel = None  # multiprocessing Event every pool process sees as stop
+_pool_lock = _thread.allocate_lock()  # held for the whole of a root-parallel search
+_cancel = None  # _pool_cancel, inside a pool process
+
+
+def other(player):
+    return O if player == X else X
+
+
+class Geometry:
+    """Precomputed rays so win checks only walk the lines through one cell."""
+
+    def __init__(self, size, k):
+        self.size = size
+        self.k = k
+        self.cells = size * size
+        self.rays = []
+        for cell in range(self.cells):
+            i, j = divmod(cell, size)
+            rays = []
+            for di, dj in DIRECTIONS:
+                forward = self._ray(i, j, di, dj)
+                backward = self._ray(i, j, -di, -dj)
+                if len(forward) + len(backward) + 1 >= k:
+                    rays.append((forward, backward))
+            self.rays.append(tuple(rays))
+
+    def _ray(self, i, j, di, dj):
+        ray = []
+        for step in range(1, self.k):
+            ni, nj = i + di * step, j + dj * step
+            if not (0 <= ni < self.size and 0 <= nj < self.size):
+                break
+            ray.append(ni * self.size + nj)
+        return tuple(ray)
+
+    def wins(self, cells, cell, player):
+        k = self.k
+        for forward, backward in self.rays[cell]:
+            count = 1
+            for c in forward:
+                if cells[c] != player:
+                    break
+                count += 1
+            for c in backward:
+                if cells[c] != player:
+                    break
+                count += 1
+            if count >= k:
+                return True
+        return False
+
+    def candidates(self, cells, player):
+        """Moves the tree expands for player.
+
+        An immediate win, or else a block of the opponent's immediate win,
+        is the only move; otherwise all empties, or those near stones on
+        big boards where uniform random playouts cannot see such threats.
+        """
+        moves = self._moves(cells)
+        opponent = other(player)
+        blocks = []
+        for c in moves:
+            if self.wins(cells, c, player):
+                return [c]
+            if self.wins(cells, c, opponent):
+                blocks.append(c)
+        return blocks[:1] or moves
+
+    def _moves(self, cells):
+        size = self.size
+        empties = [c for c in range(self.cells) if cells[c] == EMPTY]
+        if size <= 5 or len(empties) == self.cells:
+            if size > 5:
+                return [(size // 2) * size + size // 2]
+            return empties
+        near = []
+        for c in empties:
+            i, j = divmod(c, size)
+            for ni in range(max(0, i - 2), min(size, i + 3)):
+                row = ni * size
+                if any(cells[row + nj] != EMPTY for nj in range(max(0, j - 2), min(size, j + 3))):
+                    near.append(c)
+                    break
+        return near
+
+
+class Node:
+    __slots__ = ("move", "parent", "player", "children", "untried", "visits", "wins", "result")
+
+    def __init__(self, move, parent, player, untried, result=None):
+        self.move = move
+        self.parent = parent
+        self.player = player  # who played move
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        self.result = result  # X, O or DRAW when the game is over here
+
+    def select(self):
+        log_n = math.log(self.visits)
+        best, best_score = None, -1.0
+        for child in self.children:
+            score = child.wins / child.visits + EXPLORATION * math.sqrt(log_n / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+
+def playout(geometry, cells, empties, player, rng):
+    """Play random moves on cells (modified in place) until the game ends."""
+    m = 0
+    for c in range(geometry.cells):
+        if cells[c] == EMPTY:
+            empties[m] = c
+            m += 1
+    randrange = rng.randrange
+    while m:
+        r = randrange(m)
+        cell = empties[r]
+        m -= 1
+        empties[r] = empties[m]
+        cells[cell] = player
+        if geometry.wins(cells, cell, player):
+            return player
+        player = O if player == X else X
+    return DRAW
+
+
+def search(cells, to_move, size, k, playouts=None, budget=None, seed=None, stop=None, stats=None):
+    """Grow a UCT tree from cells; returns {move: (visits, wins)} for the root children."""
+    geometry = Geometry(size, k)
+    rng = random.Random(seed)
+    root = Node(None, None, other(to_move), geometry.candidates(cells, to_move))
+    scratch = list(cells)
+    empties = [0] * len(cells)
+    deadline = None if budget is None else time.perf_counter() + budget
+    if playouts is None and deadline is None:
+        playouts = 1000
+    done = 0
+    max_depth = 0
+
+    while True:
+        if playouts is not None and done >= playouts:
+            break
+        if not done & 63 and ((deadline is not None and time.perf_counter() > deadline)
+                              or (stop is not None and stop.is_set())):
+            break
+        done += 1
+        node = root
+        scratch[:] = cells
+        depth = 0
+
+        # Selection
+        while not node.untried and node.children and node.result is None:
+            node = node.select()
+            scratch[node.move] = node.player
+            depth += 1
+
+        # Expansion
+        if node.untried and node.result is None:
+            untried = node.untried
+            r = rng.randrange(len(untried))
+            untried[r], untried[-1] = untried[-1], untried[r]
+            move = untried.pop()
+            player = other(node.player)
+            scratch[move] = player
+            if geometry.wins(scratch, move, player):
+                result = player
+            elif EMPTY not in scratch:
+                result = DRAW
+            else:
+                result = None
+            untried = [] if result else geometry.candidates(scratch, other(player))
+            child = Node(move, node, player, untried, result)
+            node.children.append(child)
+            node = child
+            depth += 1
+
+        # Simulation
+        if node.result is not None:
+            result = node.result
+        else:
+            result = playout(geometry, scratch, empties, other(node.player), rng)
+        if depth > max_depth:
+            max_depth = depth
+
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if result == node.player:
+                node.wins += 1.0
+            elif result == DRAW:
+                node.wins += 0.5
+            node = node.parent
+
+    if stats is not None:
+        stats.nodes += done
+        stats.reached(max_depth)
+    return {child.move: (child.visits, child.wins) for child in root.children}
+
+
+def _init_worker(cancel):
+    global _cancel
+    _cancel = cancel
+
+
+def _search_task(args):
+    return search(*args, stop=_cancel)
+
+
+def _get_pool(workers):
+    """The shared pool and its cancel event; call with _pool_lock held."""
+    global _pool, _pool_workers, _pool_cancel
+    if _pool is None or _pool_workers != workers:
+        import multiprocessing  # only root-parallel searches pay for these
+        from concurrent.futures import ProcessPoolExecutor
+
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+        context = multiprocessing.get_context("spawn")
+        _pool_cancel = context.Event()
+        _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                    initializer=_init_worker, initargs=(_pool_cancel,))
+        _pool_workers = workers
+    return _pool, _pool_cancel
+
+
+def _parallel_search(tasks, workers, stop):
+    """Summed {move: (visits, wins)} of the tasks run on the pool; {} if stopped before they start."""
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    while True:
+        if stop is not None and stop.is_set():
+            return {}
+        if _pool_lock.acquire(timeout=POLL_SECONDS):
+            break
+    try:
+        pool, cancel = _get_pool(workers)
+        cancel.clear()
+        pending = {pool.submit(_search_task, task) for task in tasks}
+        finished = []
+        while pending:
+            done, pending = wait(pending, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+            finished += done
+            if stop is not None and stop.is_set() and not cancel.is_set():
+                cancel.set()
+                for future in pending:
+                    future.cancel()
+        totals = {}
+        for future in finished:
+            if future.cancelled():
+                continue
+            for move, (visits, wins) in future.result().items():
+                old = totals.get(move, (0, 0.0))
+                totals[move] = (old[0] + visits, old[1] + wins)
+        return totals
+    finally:
+        _pool_lock.release()
+
+
+def best_cell(cells, to_move, size, k, playouts=None, budget=None, workers=1, seed=None,
+              stop=None, stats=None):
+    """Most visited root move after a (possibly root-parallel) search, or None if none was searched."""
+    if stats is not None:
+        stats.start()
+    if workers > 1:
+        base = random.randrange(1 << 30) if seed is None else seed
+        share = None if playouts is None else max(1, playouts // workers)
+        tasks = [(cells, to_move, size, k, share, budget, base + w) for w in range(workers)]
+        totals = _parallel_search(tasks, workers, stop)
+        if stats is not None:
+            stats.nodes += sum(visits for visits, _ in totals.values())
+    else:
+        totals = search(cells, to_move, size, k, playouts, budget, seed, stop, stats)
+    if stats is not None:
+        stats.stop()
+    if not totals:
+        return None
+    return max(totals, key=lambda move: totals[move][0])
+
+
+def best_move(rows, k, playouts=None, budget=None, workers=None, is_max=True, stop=None, stats=None):
+    """Pick a move for a list-of-rows board as (i, j), or None if it is over or nothing was searched."""
+    size = len(rows)
+    marks = {"X": X, "O": O}
+    cells = [marks.get(mark, EMPTY) for row in rows for mark in row]
+    if EMPTY not in cells:
+        return None
+    workers = workers or os.cpu_count() or 1
+    cell = best_cell(cells, X if is_max else O, size, k, playouts, budget, workers, stop=stop, stats=stats)
+    return None if cell is None else divmod(cell, size)
@@ -0,0 +1,265 @@
+"""N x N, k-in-a-row engine for boards the full-width 3x3 search cannot handle.
+
+The board keeps, for every length-k window, how many stones each side has
+in it. Making a move only touches the windows through that cell, which
+gives incremental win detection and an incrementally updated heuristic
+score. The search is iterative-deepening negamax alpha-beta under a
+wall-clock budget, with threat/center ordering plus killer and history
+heuristics.
+"""
+
+import time
+
+EMPTY, X, O = 0, 1, 2
+WIN = 10 ** 9
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+def other(player):
+    return O if player == X else X
+
+
+def line_windows(size, k):
+    """Every run of k cells in a row, column or diagonal, as cell tuples."""
+    windows = []
+    for i in range(size):
+        for j in range(size):
+            for di, dj in DIRECTIONS:
+                end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                if 0 <= end_i < size and 0 <= end_j < size:
+                    windows.append(tuple((i + di * s) * size + j + dj * s for s in range(k)))
+    return windows
+
+
+class Board:
+    def __init__(self, size=3, k=3):
+        self.size = size
+        self.k = k
+        self.cells = [EMPTY] * (size * size)
+        self.windows = line_windows(size, k)
+        self.cell_windows = [[] for _ in self.cells]
+        for w, window in enumerate(self.windows):
+            for cell in window:
+                self.cell_windows[cell].append(w)
+        self.x_count = [0] * len(self.windows)
+        self.o_count = [0] * len(self.windows)
+        # Heuristic value of a window for X, by (x stones, o stones).
+        self.value = [[0 if (xs and os) or xs == k or os == k else 10 ** xs - 10 ** os
+                       for os in range(k + 1)] for xs in range(k + 1)]
+        self.score = 0
+        self.winner = EMPTY
+        self.win_window = None
+        self.history = []
+
+    @classmethod
+    def from_rows(cls, rows, k, x_mark="X", o_mark="O"):
+        board = cls(len(rows), k)
+        for i, row in enumerate(rows):
+            for j, mark in enumerate(row):
+                if mark == x_mark:
+                    board.make(i * board.size + j, X)
+                elif mark == o_mark:
+                    board.make(i * board.size + j, O)
+        return board
+
+    def is_full(self):
+        return len(self.history) == len(self.cells)
+
+    def empty_cells(self):
+        return [cell for cell, mark in enumerate(self.cells) if mark == EMPTY]
+
+    def make(self, cell, player):
+        self.cells[cell] = player
+        self.history.append(cell)
+        counts = self.x_count if player == X else self.o_count
+        value, xs, os = self.value, self.x_count, self.o_count
+        for w in self.cell_windows[cell]:
+            self.score -= value[xs[w]][os[w]]
+            counts[w] += 1
+            self.score += value[xs[w]][os[w]]
+            if counts[w] == self.k and not self.winner:
+                self.winner = player
+                self.win_window = w
+
+    def unmake(self):
+        cell = self.history.pop()
+        player = self.cells[cell]
+        self.cells[cell] = EMPTY
+        counts = self.x_count if player == X else self.o_count
+        value, xs, os = self.value, self.x_count, self.o_count
+        for w in self.cell_windows[cell]:
+            self.score -= value[xs[w]][os[w]]
+            counts[w] -= 1
+            self.score += value[xs[w]][os[w]]
+        if self.winner and self.win_window in self.cell_windows[cell]:
+            self.winner = EMPTY
+            self.win_window = None
+
+    def winning_cells(self):
+        return None if self.win_window is None else self.windows[self.win_window]
+
+
+def winning_line(rows, k, blank=" "):
+    """Return (mark, [(i, j), ...]) for the first completed line in rows, or None."""
+    size = len(rows)
+    for window in line_windows(size, k):
+        first = rows[window[0] // size][window[0] % size]
+        if first != blank and all(rows[c // size][c % size] == first for c in window):
+            return first, [divmod(c, size) for c in window]
+    return None
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Searcher:
+    """Iterative-deepening alpha-beta with a wall-clock budget per move.
+
+    stop is an optional threading.Event; setting it ends the search like
+    running out of time. stats is an optional instrument.SearchStats.
+    """
+
+    def __init__(self, budget=1.0, max_depth=None, stop=None, stats=None):
+        self.budget = budget
+        self.max_depth = max_depth
+        self.stop = stop
+        self.stats = stats
+        self.nodes = 0
+        self.depth_reached = 0
+        self.killers = []
+        self.history = {}
+
+    def search(self, board, player):
+        """Return (cell, score) for player; score is from player's side."""
+        self.board = board
+        self.nodes = 0
+        self.depth_reached = 0
+        self.killers = [[None, None] for _ in range(len(board.cells) + 1)]
+        self.deadline = time.perf_counter() + self.budget
+        root_len = len(board.history)
+        limit = len(board.cells) - root_len
+        if self.max_depth is not None:
+            limit = min(limit, self.max_depth)
+
+        if self.stats is not None:
+            self.stats.start()
+        moves = self.candidates()
+        best_move, best_score = moves[0], 0
+        for depth in range(1, limit + 1):
+            try:
+                move, score = self._root(depth, player, moves, best_move)
+            except _Timeout:
+                while len(board.history) > root_len:
+                    board.unmake()
+                break
+            best_move, best_score = move, score
+            self.depth_reached = depth
+            if abs(score) >= WIN - len(board.cells) or self.out_of_time():
+                break
+        if self.stats is not None:
+            self.stats.stop()
+            self.stats.nodes += self.nodes
+            self.stats.reached(self.depth_reached)
+        return best_move, best_score
+
+    def out_of_time(self):
+        return time.perf_counter() > self.deadline or (self.stop is not None and self.stop.is_set())
+
+    def candidates(self):
+        """Empty cells, limited to the neighbourhood of stones on big boards."""
+        board = self.board
+        size = board.size
+        if size <= 5 or not board.history:
+            empties = board.empty_cells()
+            if not board.history and size > 5:
+                return [(size // 2) * size + size // 2]
+            return empties
+        near = set()
+        for cell in board.history:
+            i, j = divmod(cell, size)
+            for ni in range(max(0, i - 2), min(size, i + 3)):
+                for nj in range(max(0, j - 2), min(size, j + 3)):
+                    if board.cells[ni * size + nj] == EMPTY:
+                        near.add(ni * size + nj)
+        return list(near)
+
+    def order(self, moves, ply, first=None):
+        board = self.board
+        size = board.size
+        center = (size - 1) / 2
+        xs, os, k = board.x_count, board.o_count, board.k
+        killers = self.killers[ply]
+        history = self.history
+
+        def key(cell):
+            if cell == first:
+                return -1e18
+            threat = 0
+            for w in board.cell_windows[cell]:
+                x, o = xs[w], os[w]
+                if o == 0:
+                    threat += 1000 if x == k - 1 else 4 ** x
+                if x == 0:
+                    threat += 1000 if o == k - 1 else 4 ** o
+            i, j = divmod(cell, size)
+            bonus = threat * 1000 + history.get(cell, 0)
+            if cell in killers:
+                bonus += 10 ** 6
+            return -(bonus - abs(i - center) - abs(j - center))
+
+        return sorted(moves, key=key)
+
+    def _root(self, depth, player, moves, first):
+        board = self.board
+        alpha, beta = -WIN - 1, WIN + 1
+        best_move, best = None, -WIN - 1
+        for cell in self.order(moves, 0, first):
+            board.make(cell, player)
+            score = -self._negamax(depth - 1, -beta, -alpha, other(player), 1)
+            board.unmake()
+            if score > best:
+                best_move, best = cell, score
+                alpha = max(alpha, score)
+        return best_move, best
+
+    def _negamax(self, depth, alpha, beta, player, ply):
+        self.nodes += 1
+        if not self.nodes & 1023 and self.out_of_time():
+            raise _Timeout
+        board = self.board
+        if board.winner:
+            return -(WIN - ply)
+        if board.is_full():
+            return 0
+        if depth == 0:
+            return board.score if player == X else -board.score
+
+        best = -WIN - 1
+        for cell in self.order(self.candidates(), ply):
+            board.make(cell, player)
+            score = -self._negamax(depth - 1, -beta, -alpha, other(player), ply + 1)
+            board.unmake()
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+            if alpha >= beta:
+                if self.stats is not None:
+                    self.stats.cutoff(player == X, ply)
+                killers = self.killers[ply]
+                if cell != killers[0]:
+                    killers[1] = killers[0]
+                    killers[0] = cell
+                self.history[cell] = self.history.get(cell, 0) + depth * depth
+                break
+        return best
+
+
+def best_move(rows, k, budget=1.0, max_depth=None, is_max=True, stop=None, stats=None):
+    """Pick a move for a list-of-rows board as (i, j), or None if it is full."""
+    board = Board.from_rows(rows, k)
+    if board.winner or board.is_full():
+        return None
+    cell, _ = Searcher(budget, max_depth, stop, stats).search(board, X if is_max else O)
+    return divmod(cell, board.size)
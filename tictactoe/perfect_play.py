@@ -0,0 +1,151 @@
+"""Precomputed perfect-play table for the "Hard" difficulty.
+
+Every reachable 3x3 position (with either side moving first) is solved
+once by TicTacToe.alpha_beta and stored under its canonical symmetry key,
+so Hard becomes a dictionary lookup. The table is loaded lazily the first
+time it is needed; a missing or outdated file makes lookups return None
+and the caller falls back to searching.
+
+Regenerate (or check) the table from the repository root with:
+
+    python -m tictactoe.perfect_play [--check]
+"""
+
+import os
+import sys
+
+from tictactoe.bitboard import CELLS, FULL, MOVES, WINS, Position, to_coords
+from tictactoe.transposition import INVERSE, canonical
+
+VERSION = 1
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfect_play.json")
+
+_table = None
+
+
+def table_key(code, is_max):
+    return code | is_max << 18
+
+
+def load(path=TABLE_PATH):
+    """Read the table file; returns {} when it is missing or from another version."""
+    import json  # with re, only loaded once Hard needs the table
+
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != VERSION:
+        return {}
+    return {key: (value, move) for key, value, move in data["entries"]}
+
+
+def lookup(x, o, is_max):
+    """Return (value, cell) for a position, or None if it is not in the table."""
+    global _table
+    if _table is None:
+        _table = load()
+    code, sym = canonical(x, o)
+    entry = _table.get(table_key(code, is_max))
+    if entry is None:
+        return None
+    value, move = entry
+    return value, INVERSE[sym][move]
+
+
+def best_move(board, is_max=True):
+    """Table move for a list-of-rows board as (i, j), or None on a miss."""
+    pos = Position.from_rows(board)
+    entry = lookup(pos.x, pos.o, is_max)
+    return None if entry is None else to_coords(entry[1])
+
+
+def reachable_positions():
+    """Yield (canonical code, is_max) for every non-terminal reachable position."""
+    seen = set()
+    stack = [(0, 0, True), (0, 0, False)]
+    while stack:
+        x, o, is_max = stack.pop()
+        code, _ = canonical(x, o)
+        if (code, is_max) in seen:
+            continue
+        seen.add((code, is_max))
+        if WINS[x] or WINS[o] or x | o == FULL:
+            continue
+        yield code, is_max
+        for cell in MOVES[x | o]:
+            if is_max:
+                stack.append((x | 1 << cell, o, False))
+            else:
+                stack.append((x, o | 1 << cell, True))
+
+
+def _rows(code):
+    x, o = code & FULL, code >> CELLS
+    return [["X" if x >> (i * 3 + j) & 1 else "O" if o >> (i * 3 + j) & 1 else " "
+             for j in range(3)] for i in range(3)]
+
+
+def generate(solver):
+    """Solve every reachable position with solver(rows, is_max) -> (score, (i, j))."""
+    entries = []
+    for code, is_max in reachable_positions():
+        score, (i, j) = solver(_rows(code), is_max)
+        entries.append([table_key(code, is_max), score, i * 3 + j])
+    entries.sort()
+    return {"version": VERSION, "solver": "TicTacToe.alpha_beta", "entries": entries}
+
+
+def check(table, solver):
+    """Return the keys whose stored value or move disagrees with the solver."""
+    bad = []
+    for code, is_max in reachable_positions():
+        key = table_key(code, is_max)
+        if key not in table:
+            bad.append(key)
+            continue
+        value, move = table[key]
+        pos = Position(code & FULL, code >> CELLS)
+        pos.make(move, is_max)
+        if pos.winner():
+            reached = 1 if is_max else -1
+        elif pos.is_full():
+            reached = 0
+        else:
+            reached = solver(_rows(pos.x | pos.o << CELLS), not is_max)[0]
+        if value != solver(_rows(code), is_max)[0] or reached != value:
+            bad.append(key)
+    return bad
+
+
+def _legacy_solver():
+    from expt11alphabetaNEW11 import TicTacToe
+
+    # alpha_beta only looks at the board it is given, so no Tk window is needed.
+    engine = TicTacToe.__new__(TicTacToe)
+
+    def solve(rows, is_max):
+        return engine.alpha_beta(rows, 9, -float("inf"), float("inf"), is_max)
+    return solve
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    solver = _legacy_solver()
+    if "--check" in argv:
+        bad = check(load(), solver)
+        print(f"{len(bad)} bad entries")
+        return 1 if bad else 0
+    data = generate(solver)
+    import json
+
+    with open(TABLE_PATH, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.write("\n")
+    print(f"Wrote {len(data['entries'])} positions to {TABLE_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
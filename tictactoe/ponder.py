@@ -0,0 +1,85 @@
+"""Think on the human's time.
+
+While the human decides, a Ponderer solves the AI reply to every legal
+human move on a background thread and caches it. When the human moves,
+take() returns the cached reply (a hit) or None (a miss, the caller
+searches as usual). Replies are keyed by difficulty and the board after
+the human move, so entries stay valid across Undo and only New Game
+needs to clear them.
+"""
+
+import threading
+
+from tictactoe.worker import SearchWorker
+
+MAX_ENTRIES = 4096
+
+
+class Ponderer:
+    def __init__(self, root, search, human="O"):
+        # search(board, level, stop=event) -> move, or None to skip the board
+        self.worker = SearchWorker(root)
+        self.search = search
+        self.human = human
+        self.cache = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(board, level):
+        return level, tuple(map(tuple, board))
+
+    def start(self, board, level, last=None):
+        """Ponder every human move on board, nearest to the last move first."""
+        board = [row[:] for row in board]
+        size = len(board)
+        moves = [(i, j) for i in range(size) for j in range(size) if board[i][j] == " "]
+        if last is not None:
+            moves.sort(key=lambda m: max(abs(m[0] - last[0]), abs(m[1] - last[1])))
+        # A failed ponder only costs a miss; the real move searches again
+        self.worker.submit(self._ponder, lambda _: None, board, level, moves, on_error=lambda _: None)
+
+    def _ponder(self, board, level, moves, stop):
+        for i, j in moves:
+            board[i][j] = self.human
+            key = self.key(board, level)
+            with self.lock:
+                known = key in self.cache
+            if not known:
+                move = self.search([row[:] for row in board], level, stop=stop)
+                if stop.is_set():
+                    return  # the reply may be cut short, so it is not cached
+                if move is not None:
+                    with self.lock:
+                        if len(self.cache) >= MAX_ENTRIES:
+                            self.cache.clear()
+                        self.cache[key] = move
+            board[i][j] = " "
+
+    def ready(self, board, level):
+        with self.lock:
+            return self.key(board, level) in self.cache
+
+    def take(self, board, level):
+        """Cached reply for board (after the human move), counting hits and misses."""
+        with self.lock:
+            move = self.cache.get(self.key(board, level))
+        if move is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return move
+
+    def cancel(self):
+        self.worker.cancel()
+
+    def clear(self):
+        self.cancel()
+        with self.lock:
+            self.cache.clear()
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"ponder hits {self.hits}/{total} ({rate:.0%})"
@@ -0,0 +1,230 @@
+"""Compact binary game records.
+
+A record file is a 16-byte header followed by fixed-width 24-byte
+records, one per game:
+
+    offset  size  field
+    0       1     board size (3 or 4)
+    1       1     number of moves
+    2       1     outcome: 0 draw, 1 X won, 2 O won, 3 unfinished
+    3       1     engine id playing X (see ENGINES)
+    4       1     engine id playing O
+    5       1     flags: bit 0 set when O moved first
+    6       2     reserved
+    8       8     unix time in milliseconds, little endian
+    16      8     moves as 4-bit cell numbers (i * size + j), two per
+                  byte, low nibble first, unused nibbles 0xF
+
+A 4x4 game of 16 moves uses every nibble. Files are only appended to.
+RecordReader maps a file into memory. Its cursor() walks the records
+with one reusable object, so scanning millions of games allocates
+nothing per game.
+"""
+
+import mmap
+import os
+import struct
+import time
+
+MAGIC = b"TTTR"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x")
+RECORD = struct.Struct("<BBBBBBxxQ8s")
+HEADER_SIZE = HEADER.size
+RECORD_SIZE = RECORD.size
+MOVES_OFFSET = 16
+
+DRAW, X_WINS, O_WINS, UNFINISHED = 0, 1, 2, 3
+OUTCOME_NAMES = ["draw", "X", "O", "unfinished"]
+OUTCOMES = {"draw": DRAW, "X": X_WINS, "O": O_WINS, None: UNFINISHED}  # from game results
+O_FIRST = 1
+
+# Ids are stored in files, so only ever append to this list.
+ENGINES = ["human", "easy", "medium", "hard", "search", "mcts"]
+ENGINE_IDS = {name: index for index, name in enumerate(ENGINES)}
+UNKNOWN_ENGINE = 255
+
+# Byte columns that column() can slice out in one step
+COLUMNS = {"size": 0, "count": 1, "outcome": 2, "x_engine": 3, "o_engine": 4, "flags": 5}
+
+
+def engine_id(name):
+    return ENGINE_IDS.get(name.lower(), UNKNOWN_ENGINE)
+
+
+def engine_name(ident):
+    return ENGINES[ident] if ident < len(ENGINES) else "unknown"
+
+
+def pack_moves(cells):
+    packed = bytearray(b"\xff" * 8)
+    for n, cell in enumerate(cells):
+        if n % 2:
+            packed[n // 2] = (packed[n // 2] & 0x0F) | cell << 4
+        else:
+            packed[n // 2] = 0xF0 | cell
+    return bytes(packed)
+
+
+def pack(size, cells, outcome, x_engine, o_engine, o_first=False, timestamp=None):
+    """One record as bytes; cells are i * size + j in the order they were played."""
+    if size not in (3, 4) or len(cells) > size * size:
+        raise ValueError("records hold 3x3 and 4x4 games only")
+    millis = int((time.time() if timestamp is None else timestamp) * 1000)
+    return RECORD.pack(size, len(cells), outcome, x_engine, o_engine, O_FIRST if o_first else 0,
+                       millis, pack_moves(cells))
+
+
+class RecordWriter:
+    """Append-only writer; usable as a context manager."""
+
+    def __init__(self, path):
+        self.file = open(path, "ab")
+        end = self.file.tell()
+        if end == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE))
+            self.file.flush()
+            return
+        try:
+            with open(path, "rb") as f:
+                _check_header(f.read(HEADER_SIZE))
+        except BaseException:
+            self.file.close()
+            raise
+        # Drop a torn final record from an interrupted append, so that new
+        # records start on a record boundary instead of following it
+        whole = HEADER_SIZE + (end - HEADER_SIZE) // RECORD_SIZE * RECORD_SIZE
+        if whole != end:
+            self.file.truncate(whole)
+
+    def append(self, size, cells, outcome, x_engine, o_engine, o_first=False, timestamp=None):
+        self.file.write(pack(size, cells, outcome, x_engine, o_engine, o_first, timestamp))
+
+    def write_packed(self, data):
+        """Append records already made by pack()."""
+        if len(data) % RECORD_SIZE:
+            raise ValueError("partial record")
+        self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(data):
+    if len(data) < HEADER_SIZE:
+        raise ValueError("not a game record file")
+    magic, version, record_size = HEADER.unpack(data[:HEADER_SIZE])
+    if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+        raise ValueError("not a version %d game record file" % VERSION)
+
+
+class Cursor:
+    """A view of the record at self.offset; reads fields straight from the map."""
+
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = HEADER_SIZE
+
+    @property
+    def size(self):
+        return self.data[self.offset]
+
+    @property
+    def count(self):
+        return self.data[self.offset + 1]
+
+    @property
+    def outcome(self):
+        return self.data[self.offset + 2]
+
+    @property
+    def x_engine(self):
+        return self.data[self.offset + 3]
+
+    @property
+    def o_engine(self):
+        return self.data[self.offset + 4]
+
+    @property
+    def o_first(self):
+        return bool(self.data[self.offset + 5] & O_FIRST)
+
+    @property
+    def timestamp(self):
+        return RECORD.unpack_from(self.data, self.offset)[6] / 1000
+
+    def move(self, n):
+        byte = self.data[self.offset + MOVES_OFFSET + n // 2]
+        return byte >> 4 if n % 2 else byte & 0x0F
+
+
+class RecordReader:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        if os.fstat(self.file.fileno()).st_size < HEADER_SIZE:
+            self.file.close()
+            raise ValueError("not a game record file")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(self.data[:HEADER_SIZE])
+        # A torn final record from an interrupted append is ignored
+        self.count = (len(self.data) - HEADER_SIZE) // RECORD_SIZE
+
+    def __len__(self):
+        return self.count
+
+    def cursor(self):
+        """Yield the same Cursor positioned on each record in turn."""
+        cursor = Cursor(self.data)
+        end = HEADER_SIZE + self.count * RECORD_SIZE
+        offset = HEADER_SIZE
+        while offset < end:
+            cursor.offset = offset
+            yield cursor
+            offset += RECORD_SIZE
+
+    def column(self, name):
+        """One byte field of every record as a bytes object."""
+        start = HEADER_SIZE + COLUMNS[name]
+        return self.data[start:HEADER_SIZE + self.count * RECORD_SIZE:RECORD_SIZE]
+
+    def outcome_counts(self):
+        outcomes = self.column("outcome")
+        return {name: outcomes.count(code) for code, name in enumerate(OUTCOME_NAMES)}
+
+    def game(self, index):
+        """Decoded record: dict with size, outcome, engines, o_first, timestamp and moves as (i, j)."""
+        if not 0 <= index < self.count:
+            raise IndexError("game index out of range")
+        size, count, outcome, x_engine, o_engine, flags, millis, packed = RECORD.unpack_from(
+            self.data, HEADER_SIZE + index * RECORD_SIZE)
+        cells = [(packed[n // 2] >> 4 if n % 2 else packed[n // 2] & 0x0F) for n in range(count)]
+        return {
+            "size": size,
+            "outcome": outcome,
+            "x_engine": engine_name(x_engine),
+            "o_engine": engine_name(o_engine),
+            "o_first": bool(flags & O_FIRST),
+            "timestamp": millis / 1000,
+            "moves": [divmod(cell, size) for cell in cells],
+        }
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
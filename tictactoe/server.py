@@ -0,0 +1,268 @@
+"""Headless game server: JSON lines over TCP or a Unix socket.
+
+Every request is one JSON object per line and gets one JSON reply line
+carrying the same "id". A connection may run any number of sessions and
+pipeline requests; requests for one session are handled in order. The
+human plays O and the AI plays X.
+
+    {"id": 1, "op": "new", "size": 3, "k": 3, "level": "hard", "first": "human"}
+    {"id": 2, "op": "move", "session": 1, "cell": [1, 1]}
+    {"id": 3, "op": "undo", "session": 1}
+    {"id": 4, "op": "difficulty", "session": 1, "level": "mcts"}
+    {"id": 5, "op": "close", "session": 1}
+
+Replies hold "ok", the board as a list of row strings, the AI's reply
+move ("ai_move") and "result" ("X", "O", "draw" or null). A failed
+request gets {"ok": false, "error": "..."}. AI searches run in a process
+pool, so the event loop only parses, validates and writes.
+
+    python -m tictactoe.server --port 8765 --workers 4
+    python -m tictactoe.server --unix /tmp/tictactoe.sock
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import signal
+from concurrent.futures import ProcessPoolExecutor
+
+from tictactoe import engines, mcts, nxn
+
+LEVELS = ("easy", "medium", "hard", "search", "mcts")
+NXN_BUDGET = {"medium": 0.2, "hard": 1.0, "search": 1.0}  # seconds per move above 3x3
+MCTS_BUDGET = 1.0  # seconds per MCTS move above 3x3
+MAX_SIZE = 19
+MAX_LINE = 64 * 1024
+
+
+def ai_reply(rows, k, level, seed=None):
+    """AI move (i, j) for X; runs in a pool process."""
+    rng = random.Random(seed)
+    size = len(rows)
+    empty = [(i, j) for i in range(size) for j in range(size) if rows[i][j] == " "]
+    if level == "easy":
+        return rng.choice(empty)
+    if size == 3:
+        return engines.choose_move(level, rows, rng=rng)
+    if level == "mcts":
+        move = mcts.best_move(rows, k, budget=MCTS_BUDGET, workers=1)
+    else:
+        move = nxn.best_move(rows, k, budget=NXN_BUDGET[level],
+                             max_depth=2 if level == "medium" else None)
+    return move if move else rng.choice(empty)
+
+
+class Session:
+    def __init__(self, size=3, k=3, level="hard"):
+        self.size = size
+        self.k = k
+        self.level = level
+        self.board = [[" "] * size for _ in range(size)]
+        self.history = []
+        self.lock = asyncio.Lock()
+
+    def result(self):
+        line = nxn.winning_line(self.board, self.k)
+        if line:
+            return line[0]
+        if len(self.history) == self.size * self.size:
+            return "draw"
+        return None
+
+    def play(self, cell, mark):
+        i, j = cell
+        if not (0 <= i < self.size and 0 <= j < self.size):
+            raise ValueError("cell off the board")
+        if self.board[i][j] != " ":
+            raise ValueError("cell is taken")
+        if self.result() is not None:
+            raise ValueError("game is over")
+        self.board[i][j] = mark
+        self.history.append((i, j))
+
+    def undo(self):
+        # Take back the AI reply together with the human move before it
+        while self.history:
+            i, j = self.history.pop()
+            mark, self.board[i][j] = self.board[i][j], " "
+            if mark == "O":
+                break
+
+    def state(self):
+        return {"board": ["".join(row) for row in self.board], "result": self.result()}
+
+
+class GameServer:
+    def __init__(self, workers=None, max_sessions=100_000):
+        # workers=0 searches on the event loop thread (for comparison only)
+        self.pool = None if workers == 0 else ProcessPoolExecutor(max_workers=workers)
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        self.ids = itertools.count(1)
+        self.moves = 0
+        self.connections = {}  # handler task -> writer, for an orderly shutdown
+
+    async def search(self, session):
+        rows = [row[:] for row in session.board]
+        seed = random.randrange(1 << 30)
+        if self.pool is None:
+            return ai_reply(rows, session.k, session.level, seed)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, ai_reply, rows, session.k, session.level, seed)
+
+    async def ai_turn(self, session, reply):
+        if session.result() is None:
+            move = await self.search(session)
+            session.play(move, "X")
+            self.moves += 1
+            reply["ai_move"] = list(move)
+
+    async def handle(self, request, owned):
+        op = request.get("op")
+        if op == "new":
+            if len(self.sessions) >= self.max_sessions:
+                raise ValueError("too many sessions")
+            size = int(request.get("size", 3))
+            k = int(request.get("k", min(size, 5)))
+            level = request.get("level", "hard")
+            if not 3 <= size <= MAX_SIZE or not 3 <= k <= size:
+                raise ValueError("unsupported board")
+            if level not in LEVELS or (level == "search" and size != 3):
+                raise ValueError(f"unknown level {level!r}")
+            sid = next(self.ids)
+            session = self.sessions[sid] = Session(size, k, level)
+            owned.add(sid)
+            reply = {"session": sid}
+            async with session.lock:
+                if request.get("first", "human") == "ai":
+                    await self.ai_turn(session, reply)
+                reply.update(session.state())
+            return reply
+
+        sid = request.get("session")
+        session = self.sessions.get(sid) if sid in owned else None
+        if session is None:
+            raise ValueError("unknown session")
+        async with session.lock:
+            reply = {"session": sid}
+            if op == "move":
+                session.play(tuple(request["cell"]), "O")
+                await self.ai_turn(session, reply)
+            elif op == "undo":
+                session.undo()
+            elif op == "difficulty":
+                level = request.get("level")
+                if level not in LEVELS or (level == "search" and session.size != 3):
+                    raise ValueError(f"unknown level {level!r}")
+                session.level = level
+            elif op == "close":
+                del self.sessions[sid]
+                owned.discard(sid)
+                return reply
+            else:
+                raise ValueError(f"unknown op {op!r}")
+            reply.update(session.state())
+            return reply
+
+    async def respond(self, line, owned, writer, write_lock):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be an object")
+            request_id = request.get("id")
+            reply = await self.handle(request, owned)
+            reply["ok"] = True
+        except (ValueError, KeyError, TypeError) as exc:
+            reply = {"ok": False, "error": str(exc)}
+        except Exception as exc:  # an engine failure such as a broken pool still gets a reply
+            reply = {"ok": False, "error": f"internal error: {exc!r}"}
+        reply["id"] = request_id
+        if writer.is_closing():  # the client left or the server is shutting down
+            return
+        async with write_lock:
+            writer.write(json.dumps(reply).encode() + b"\n")
+            await writer.drain()
+
+    async def connection(self, reader, writer):
+        self.connections[asyncio.current_task()] = writer
+        owned = set()
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):  # reset, or a line over MAX_LINE
+                    break
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.create_task(self.respond(line, owned, writer, write_lock))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            for sid in owned:
+                self.sessions.pop(sid, None)
+            writer.close()
+            self.connections.pop(asyncio.current_task(), None)
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None):
+        if unix:
+            server = await asyncio.start_unix_server(self.connection, unix, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self.connection, host, port, limit=MAX_LINE)
+        where = unix or "{}:{}".format(*server.sockets[0].getsockname()[:2])
+        print(f"Serving Tic Tac Toe on {where}", flush=True)
+        async with server:
+            serving = asyncio.ensure_future(server.serve_forever())
+            # SIGTERM and Ctrl+C stop accepting, close the open connections and let their
+            # handlers finish; main() then shuts the search pool down
+            loop = asyncio.get_running_loop()
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                try:
+                    loop.add_signal_handler(signum, serving.cancel)
+                except (NotImplementedError, RuntimeError):  # no signal handlers on this loop
+                    pass
+            try:
+                await serving
+            except asyncio.CancelledError:
+                pass
+        for writer in list(self.connections.values()):
+            writer.close()  # the handler reads EOF and finishes its in-flight requests
+        if self.connections:
+            await asyncio.gather(*self.connections, return_exceptions=True)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve Tic Tac Toe games as JSON lines.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="search processes (default: all cores, 0 = search on the event loop)")
+    parser.add_argument("--max-sessions", type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    if args.unix and os.path.exists(args.unix):
+        os.unlink(args.unix)
+    server = GameServer(args.workers, args.max_sessions)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+"""Win/draw/loss and distance-to-result tablebase for 4x4 boards.
+
+Generation is retrograde. Layer n holds every position with n stones,
+with X having moved first. Layer 16 is scored directly, then each
+earlier layer is scored from the one after it, down to the empty board.
+
+Positions in a layer are numbered by a perfect hash,
+rank(X) * C(16 - |X|, |O|) + rank(O among the cells X left free), where
+rank is the colex rank of a cell set among sets of the same size. Every
+index in 0 .. layer size - 1 is a distinct position, and a probe is a
+few table lookups. Only one position per symmetry class (the one with
+the lowest index) is solved. Its code is then copied to the other seven,
+so probes need no canonicalisation. Chunks of each layer are solved in
+parallel by a process pool.
+
+Each position has one byte, from the side to move's point of view:
+
+    0        illegal (the side to move already has a line)
+    1        draw
+    16 + d   win in d plies
+    48 + d   loss in d plies (d = 0: the opponent has just completed a line)
+
+The file is a header, 17 layer offsets and the layers, and is read
+through mmap. Generating needs NumPy; probing does not.
+
+    python -m tictactoe.tablebase            # 4x4, four in a row
+    python -m tictactoe.tablebase --k 3      # 4x4, three in a row
+    python -m tictactoe.tablebase --verify 400   # check random positions against negamax
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+from math import comb
+
+SIZE = 4
+CELLS = SIZE * SIZE
+FULL = (1 << CELLS) - 1
+MAGIC = b"TTTB"
+VERSION = 1
+HEADER = struct.Struct("<4sHBB8x")
+OFFSETS = struct.Struct("<%dQ" % (CELLS + 1))
+DATA_START = HEADER.size + OFFSETS.size
+
+ILLEGAL, DRAW, WIN_BASE, LOSS_BASE = 0, 1, 16, 48
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+_tables = {}
+
+
+def path_for(k):
+    return os.path.join(DIRECTORY, f"tablebase_{SIZE}x{SIZE}_k{k}.bin")
+
+
+def layer_counts(n):
+    """(first player's stones, second player's stones) with n on the board."""
+    return (n + 1) // 2, n // 2
+
+
+def layer_size(n):
+    first, second = layer_counts(n)
+    return comb(CELLS, first) * comb(CELLS - first, second)
+
+
+def decode(code):
+    """(result, distance) with result "win", "draw", "loss" or None for illegal."""
+    if code == ILLEGAL:
+        return None, 0
+    if code == DRAW:
+        return "draw", 0
+    if code < LOSS_BASE:
+        return "win", code - WIN_BASE
+    return "loss", code - LOSS_BASE
+
+
+def preference(code):
+    """How good a child code is for the player who moved into it."""
+    if code == DRAW:
+        return 0
+    if code >= LOSS_BASE:
+        return 1000 - (code - LOSS_BASE + 1)
+    return -1000 + (code - WIN_BASE + 1)
+
+
+def _line_masks(k):
+    masks = []
+    for i in range(SIZE):
+        for j in range(SIZE):
+            for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                cells = [(i + di * s, j + dj * s) for s in range(k)]
+                if all(0 <= a < SIZE and 0 <= b < SIZE for a, b in cells):
+                    masks.append(sum(1 << (a * SIZE + b) for a, b in cells))
+    return masks
+
+
+# Pure-Python ranking for probes
+
+def _rank_table():
+    # Colex rank: the highest cell contributes C(cell, set size), the rest recurse.
+    ranks = [0] * (1 << CELLS)
+    for mask in range(1, 1 << CELLS):
+        high = mask.bit_length() - 1
+        ranks[mask] = ranks[mask ^ 1 << high] + comb(high, bin(mask).count("1"))
+    return ranks
+
+
+_ranks = None
+
+
+def _pext(value, mask):
+    out = bit = 0
+    while mask:
+        low = mask & -mask
+        if value & low:
+            out |= 1 << bit
+        bit += 1
+        mask ^= low
+    return out
+
+
+def index(first, second):
+    """Position index of (first player's cells, second player's cells) in its layer."""
+    global _ranks
+    if _ranks is None:
+        _ranks = _rank_table()
+    free = comb(CELLS - bin(first).count("1"), bin(second).count("1"))
+    return _ranks[first] * free + _ranks[_pext(second, ~first & FULL)]
+
+
+class Tablebase:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, size, self.k = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION or size != SIZE:
+            raise ValueError(f"{path} is not a version {VERSION} {SIZE}x{SIZE} tablebase")
+        self.offsets = OFFSETS.unpack_from(self.data, HEADER.size)
+
+    def probe(self, first, second):
+        """Code for the position, with first = cells of the player who moved first."""
+        n = bin(first | second).count("1")
+        return self.data[self.offsets[n] + index(first, second)]
+
+    def best_move(self, rows, mark="X"):
+        """(move, code) for mark on a list-of-rows board, or None if the game is over."""
+        masks = {"X": 0, "O": 0}
+        for i, row in enumerate(rows):
+            for j, cell in enumerate(row):
+                if cell in masks:
+                    masks[cell] |= 1 << (i * SIZE + j)
+        opponent = "O" if mark == "X" else "X"
+        mine, theirs = masks[mark], masks[opponent]
+        # The side to move moved first exactly when the stone counts are equal
+        mover_first = bin(mine).count("1") == bin(theirs).count("1")
+        first, second = (mine, theirs) if mover_first else (theirs, mine)
+        code = self.probe(first, second)
+        if code in (ILLEGAL, LOSS_BASE) or (first | second) == FULL:
+            return None
+        best = None
+        for cell in range(CELLS):
+            bit = 1 << cell
+            if (first | second) & bit:
+                continue
+            child = self.probe(first | bit, second) if mover_first else self.probe(first, second | bit)
+            if best is None or preference(child) > best[0]:
+                best = (preference(child), divmod(cell, SIZE))
+        return best[1], code
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+
+def load(size, k):
+    """The generated tablebase for a size x size, k-in-a-row board, or None."""
+    if size != SIZE:
+        return None
+    if k not in _tables:
+        path = path_for(k)
+        try:
+            _tables[k] = Tablebase(path)
+        except (OSError, ValueError):
+            _tables[k] = None
+    return _tables[k]
+
+
+# Vectorized generation
+
+class _Tables:
+    """NumPy lookup tables shared by the generator processes."""
+
+    def __init__(self, k):
+        import numpy as np
+
+        self.np = np
+        masks = np.arange(1 << CELLS, dtype=np.int64)
+        self.rank = np.array(_rank_table(), dtype=np.int64)
+        popcount = np.zeros(1 << CELLS, dtype=np.int64)
+        for pos in range(CELLS):
+            popcount += masks >> pos & 1
+        self.popcount = popcount
+        # Masks of each popcount in rank order; the first C(m, p) use only the low m cells
+        self.combs = [masks[popcount == p][np.argsort(self.rank[popcount == p], kind="stable")]
+                      for p in range(CELLS + 1)]
+        byte = np.arange(256)
+        self.pext8 = np.array([[_pext(v, m) for m in range(256)] for v in range(256)], dtype=np.int64)
+        self.pdep8 = np.zeros((256, 256), dtype=np.int64)
+        for m in range(256):
+            for v in range(1 << bin(m).count("1")):
+                out, bit, rest = 0, 0, m
+                while rest:
+                    low = rest & -rest
+                    if v >> bit & 1:
+                        out |= low
+                    bit += 1
+                    rest ^= low
+                self.pdep8[v, m] = out
+        self.pop8 = popcount[byte]
+        won = np.zeros(1 << CELLS, dtype=bool)
+        for line in _line_masks(k):
+            won |= (masks & line) == line
+        self.won = won
+        self.perms = []
+        for rotate in range(4):
+            for mirror in (False, True):
+                perm = np.zeros(1 << CELLS, dtype=np.int64)
+                for cell in range(CELLS):
+                    i, j = divmod(cell, SIZE)
+                    if mirror:
+                        j = SIZE - 1 - j
+                    for _ in range(rotate):
+                        i, j = j, SIZE - 1 - i
+                    perm |= (masks >> cell & 1) << (i * SIZE + j)
+                self.perms.append(perm)
+
+    def pext(self, value, mask):
+        lo = self.pext8[value & 0xFF, mask & 0xFF]
+        return lo | self.pext8[value >> 8 & 0xFF, mask >> 8 & 0xFF] << self.pop8[mask & 0xFF]
+
+    def pdep(self, value, mask):
+        low_bits = self.pop8[mask & 0xFF]
+        lo = self.pdep8[value & ((1 << low_bits) - 1), mask & 0xFF]
+        return lo | self.pdep8[value >> low_bits & 0xFF, mask >> 8 & 0xFF] << 8
+
+    def index(self, first, second, free_count):
+        return self.rank[first] * free_count + self.rank[self.pext(second, ~first & FULL)]
+
+    def positions(self, n, start, stop):
+        np = self.np
+        nf, ns = layer_counts(n)
+        free_count = comb(CELLS - nf, ns)
+        idx = np.arange(start, stop, dtype=np.int64)
+        first = self.combs[nf][idx // free_count]
+        second = self.pdep(self.combs[ns][idx % free_count], ~first & FULL)
+        return idx, first, second, free_count
+
+
+_worker = {}
+
+
+def _init_worker(path, k):
+    _worker["tables"] = _Tables(k)
+    _worker["path"] = path
+
+
+def solve_chunk(task):
+    """Solve the canonical positions of layer n in [start, stop).
+
+    Returns (start, canonical index of every position, codes of the
+    positions that are their own canonical form).
+    """
+    n, start, stop = task
+    t = _worker["tables"]
+    np = t.np
+    idx, first, second, free_count = t.positions(n, start, stop)
+    canon = idx.copy()
+    for perm in t.perms[1:]:
+        np.minimum(canon, t.index(perm[first], perm[second], free_count), out=canon)
+    own = canon == idx
+    first, second = first[own], second[own]
+
+    nf, ns = layer_counts(n)
+    mover, last = (first, second) if nf == ns else (second, first)
+    codes = np.full(len(first), DRAW, dtype=np.uint8)
+    lost = t.won[last]
+    if n < CELLS:
+        with open(_worker["path"], "rb") as f:
+            offsets = OFFSETS.unpack(f.read(DATA_START)[HEADER.size:])
+        child_layer = np.memmap(_worker["path"], dtype=np.uint8, mode="r",
+                                offset=offsets[n + 1], shape=(layer_size(n + 1),))
+        cf, cs = layer_counts(n + 1)
+        child_free = comb(CELLS - cf, cs)
+        best = np.full(len(first), -2000, dtype=np.int64)
+        occupied = first | second
+        for cell in range(CELLS):
+            empty = (occupied >> cell & 1) == 0
+            bit = 1 << cell
+            if nf == ns:
+                child = t.index(first | bit, second, child_free)
+            else:
+                child = t.index(first, second | bit, child_free)
+            child_code = child_layer[np.where(empty, child, 0)].astype(np.int64)
+            pref = np.select([child_code == DRAW, child_code >= LOSS_BASE],
+                             [0, 1000 - (child_code - LOSS_BASE + 1)],
+                             -1000 + (child_code - WIN_BASE + 1))
+            pref = np.where(empty & (child_code != ILLEGAL), pref, -2000)
+            np.maximum(best, pref, out=best)
+        codes = np.select([best == 0, best > 0],
+                          [DRAW, WIN_BASE + (1000 - best)],
+                          LOSS_BASE + (best + 1000)).astype(np.uint8)
+        del child_layer
+    codes = np.where(lost, LOSS_BASE, codes)
+    codes = np.where(t.won[mover], ILLEGAL, codes).astype(np.uint8)
+    return start, canon.astype(np.uint32), codes
+
+
+def generate(k=SIZE, path=None, workers=None, chunk=1 << 17, log=print):
+    import numpy as np
+    from multiprocessing import Pool
+
+    path = path or path_for(k)
+    tmp = path + ".part"
+    offsets, total = [], DATA_START
+    for n in range(CELLS + 1):
+        offsets.append(total)
+        total += layer_size(n)
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, SIZE, k) + OFFSETS.pack(*offsets))
+        f.truncate(total)
+
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    with Pool(workers, initializer=_init_worker, initargs=(tmp, k)) as pool:
+        for n in range(CELLS, -1, -1):
+            count = layer_size(n)
+            layer = np.zeros(count, dtype=np.uint8)
+            canon = np.zeros(count, dtype=np.uint32)
+            tasks = [(n, start, min(start + chunk, count)) for start in range(0, count, chunk)]
+            solved = 0
+            for start, chunk_canon, codes in pool.imap_unordered(solve_chunk, tasks):
+                canon[start:start + len(chunk_canon)] = chunk_canon
+                own = chunk_canon == np.arange(start, start + len(chunk_canon), dtype=np.uint32)
+                layer[start + np.flatnonzero(own)] = codes
+                solved += len(codes)
+            layer = layer[canon]  # every position takes its class representative's code
+            out = np.memmap(tmp, dtype=np.uint8, mode="r+", offset=offsets[n], shape=(count,))
+            out[:] = layer
+            out.flush()
+            del out
+            log(f"layer {n:2}: {count:>9,} positions, {solved:>8,} solved "
+                f"({time.perf_counter() - started:.1f}s)")
+    os.replace(tmp, path)
+    return path
+
+
+# Brute-force check
+
+VERIFY_MIN_STONES = 6  # sampled positions keep the negamax small
+
+
+def _outcome(code):
+    """Sort key for a code from the side to move's view: faster wins, then draws, then slower losses."""
+    result, distance = decode(code)
+    if result == "win":
+        return 2, -distance
+    if result == "draw":
+        return 1, 0
+    return 0, distance
+
+
+def _parent(code):
+    """Code for the player who moved into a position with this code."""
+    result, distance = decode(code)
+    if result == "win":
+        return LOSS_BASE + distance + 1
+    if result == "loss":
+        return WIN_BASE + distance + 1
+    return DRAW
+
+
+def negamax(mover, other, lines, memo):
+    """Code for the side to move (cells mover) against other, searched without the table."""
+    key = mover, other
+    if key not in memo:
+        if any(mover & line == line for line in lines):
+            code = ILLEGAL
+        elif any(other & line == line for line in lines):
+            code = LOSS_BASE
+        elif mover | other == FULL:
+            code = DRAW
+        else:
+            code = None
+            for cell in range(CELLS):
+                bit = 1 << cell
+                if not (mover | other) & bit:
+                    mine = _parent(negamax(other, mover | bit, lines, memo))
+                    if code is None or _outcome(mine) > _outcome(code):
+                        code = mine
+        memo[key] = code
+    return memo[key]
+
+
+def random_position(rng, lines, min_stones=VERIFY_MIN_STONES):
+    """(first player's cells, second player's cells) after random play, stopping at a line."""
+    first = second = 0
+    for n in range(rng.randint(min_stones, CELLS)):
+        free = [cell for cell in range(CELLS) if not (first | second) >> cell & 1]
+        bit = 1 << rng.choice(free)
+        if n % 2 == 0:
+            first |= bit
+        else:
+            second |= bit
+        if any(first & line == line or second & line == line for line in lines):
+            break
+    return first, second
+
+
+def verify(table, count, seed=0, min_stones=VERIFY_MIN_STONES):
+    """Random positions whose code or best move disagrees with negamax.
+
+    Random play reaches positions outside their symmetry class's
+    representative, so this covers the index hash and the copy-out too.
+    """
+    import random
+
+    lines = _line_masks(table.k)
+    rng = random.Random(seed)
+    memo = {}
+    bad = []
+    for _ in range(count):
+        first, second = random_position(rng, lines, min_stones)
+        mover_first = bin(first).count("1") == bin(second).count("1")
+        mover, other = (first, second) if mover_first else (second, first)
+        expected = negamax(mover, other, lines, memo)
+        if table.probe(first, second) != expected:
+            bad.append((first, second))
+            continue
+        rows = [["X" if first >> cell & 1 else "O" if second >> cell & 1 else " "
+                 for cell in range(i * SIZE, (i + 1) * SIZE)] for i in range(SIZE)]
+        found = table.best_move(rows, "X" if mover_first else "O")
+        if found is not None:
+            (i, j), _ = found
+            if _parent(negamax(other, mover | 1 << (i * SIZE + j), lines, memo)) != expected:
+                bad.append((first, second))
+    return bad
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate the 4x4 tablebase by retrograde analysis.")
+    parser.add_argument("--k", type=int, default=SIZE, choices=(3, 4), help="stones in a row to win")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--verify", type=int, metavar="N",
+                        help="check N random positions of an existing table against negamax instead")
+    parser.add_argument("--seed", type=int, default=0, help="seed for --verify")
+    args = parser.parse_args(argv)
+    if args.verify is not None:
+        path = args.output or path_for(args.k)
+        if not os.path.exists(path):
+            parser.error(f"{path} does not exist; generate it first")
+        table = Tablebase(path)
+        bad = verify(table, args.verify, args.seed)
+        print(f"{len(bad)} of {args.verify} positions disagree with negamax")
+        return 1 if bad else 0
+    path = generate(args.k, args.output, args.workers)
+    table = Tablebase(path)
+    result, distance = decode(table.probe(0, 0))
+    print(f"Wrote {path} ({os.path.getsize(path):,} bytes); empty board: {result}"
+          + (f" in {distance}" if result != "draw" else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Headless self-play tournament between the 3x3 engines.
+
+Every ordered pairing of the chosen engines plays --games games, with the
+engines swapping the first move between games. Games are split into
+chunks and spread over a process pool, and the run reports a
+win/draw/loss matrix, games per second and per-move latency percentiles.
+
+    python -m tictactoe.tournament --engines easy medium hard --games 2000
+
+--record PATH appends every game to a tictactoe.records file.
+"""
+
+import argparse
+import os
+import random
+import time
+from itertools import permutations
+from multiprocessing import Pool
+
+from tictactoe import records
+from tictactoe.bitboard import FULL, WINS
+from tictactoe.engines import ENGINES
+
+
+def play_game(first, second, rng, latencies, cells=None):
+    """Play one game; first moves as X. Returns 1 (first wins), 0 or -1.
+
+    The cells played are appended to cells when it is given.
+    """
+    x = o = 0
+    players = (first, second)
+    turn = 0
+    while True:
+        name = players[turn]
+        start = time.perf_counter_ns()
+        cell = ENGINES[name](x, o, turn == 0, rng)
+        latencies[name].append(time.perf_counter_ns() - start)
+        if cells is not None:
+            cells.append(cell)
+        if turn == 0:
+            x |= 1 << cell
+            if WINS[x]:
+                return 1
+        else:
+            o |= 1 << cell
+            if WINS[o]:
+                return -1
+        if x | o == FULL:
+            return 0
+        turn ^= 1
+
+
+def play_chunk(task):
+    """Play a block of games between a and b; a moves first in the even games."""
+    a, b, games, seed, record = task
+    rng = random.Random(seed)
+    latencies = {a: [], b: []}
+    wins = draws = losses = 0
+    packed = bytearray()
+    cells = [] if record else None
+    for game in range(games):
+        if game % 2 == 0:
+            result = play_game(a, b, rng, latencies, cells)
+            x_name, o_name, x_result = a, b, result
+        else:
+            result = -play_game(b, a, rng, latencies, cells)
+            x_name, o_name, x_result = b, a, -result
+        if record:
+            outcome = records.X_WINS if x_result > 0 else records.O_WINS if x_result < 0 else records.DRAW
+            packed += records.pack(3, cells, outcome, records.engine_id(x_name), records.engine_id(o_name))
+            cells.clear()
+        if result > 0:
+            wins += 1
+        elif result < 0:
+            losses += 1
+        else:
+            draws += 1
+    return a, b, (wins, draws, losses), latencies, bytes(packed)
+
+
+def make_tasks(engines, games, chunk, seed, record=False):
+    tasks = []
+    for a, b in permutations(engines, 2):
+        for start in range(0, games, chunk):
+            tasks.append((a, b, min(chunk, games - start), seed + len(tasks), record))
+    return tasks
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(engines, games, workers=None, chunk=100, seed=0, record=None):
+    if len(set(engines)) != len(engines):
+        raise ValueError("each engine may appear only once")
+    tasks = make_tasks(engines, games, chunk, seed, record is not None)
+    writer = records.RecordWriter(record) if record else None
+    results = {(a, b): [0, 0, 0] for a, b in permutations(engines, 2)}
+    latencies = {name: [] for name in engines}
+    start = time.perf_counter()
+    with Pool(workers or os.cpu_count()) as pool:
+        for a, b, wdl, lat, packed in pool.imap_unordered(play_chunk, tasks):
+            if writer is not None:
+                writer.write_packed(packed)
+            totals = results[(a, b)]
+            for i in range(3):
+                totals[i] += wdl[i]
+            for name, samples in lat.items():
+                latencies[name].extend(samples)
+    elapsed = time.perf_counter() - start
+    if writer is not None:
+        writer.close()
+    return results, latencies, elapsed
+
+
+def report(engines, results, latencies, elapsed):
+    total = sum(sum(wdl) for wdl in results.values())
+    width = max(len(name) for name in engines) + 2
+    lines = ["Win/draw/loss for the row engine against the column engine", ""]
+    lines.append("".ljust(width) + "".join(name.rjust(18) for name in engines))
+    for a in engines:
+        cells = []
+        for b in engines:
+            cells.append("-".rjust(18) if a == b else "{}/{}/{}".format(*results[(a, b)]).rjust(18))
+        lines.append(a.ljust(width) + "".join(cells))
+    lines.append("")
+    lines.append(f"{total} games in {elapsed:.2f}s ({total / elapsed:.0f} games/sec)")
+    lines.append("")
+    lines.append("Per-move latency (us)".ljust(width + 4) + "".join(
+        h.rjust(10) for h in ("moves", "p50", "p90", "p99", "max")))
+    for name in engines:
+        samples = sorted(latencies[name])
+        row = [len(samples)] + [percentile(samples, p) / 1000 for p in (50, 90, 99, 100)]
+        lines.append(name.ljust(width + 4) + str(row[0]).rjust(10)
+                     + "".join(f"{value:10.1f}" for value in row[1:]))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play engines against each other without a window.")
+    parser.add_argument("--engines", nargs="+", default=["easy", "medium", "hard"], choices=sorted(ENGINES))
+    parser.add_argument("--games", type=int, default=1000, help="games per ordered pairing")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--chunk", type=int, default=100, help="games per task")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record", metavar="PATH", help="append every game to a game record file")
+    args = parser.parse_args(argv)
+    if len(args.engines) < 2:
+        parser.error("need at least two engines")
+    duplicates = sorted({name for name in args.engines if args.engines.count(name) > 1})
+    if duplicates:
+        # Results and latencies are keyed by engine name, so copies would mix their samples
+        parser.error(f"engines given more than once: {', '.join(duplicates)}")
+
+    results, latencies, elapsed = run(args.engines, args.games, args.workers, args.chunk, args.seed, args.record)
+    print(report(args.engines, results, latencies, elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Process-wide transposition table for the 3x3 searches.
+
+Positions are keyed on their canonical form under the 8 rotations and
+reflections of the board, together with the side to move and the
+remaining search depth, so a result found in one game (or by one of the
+game windows) is reused by every later search in the same process.
+"""
+
+import threading
+from collections import OrderedDict
+
+SIZE = 3
+CELLS = SIZE * SIZE
+FULL = (1 << CELLS) - 1
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+def _rotate(cell):
+    i, j = divmod(cell, SIZE)
+    return j * SIZE + (SIZE - 1 - i)
+
+
+def _reflect(cell):
+    i, j = divmod(cell, SIZE)
+    return i * SIZE + (SIZE - 1 - j)
+
+
+def _symmetries():
+    perms = []
+    perm = tuple(range(CELLS))
+    for _ in range(4):
+        perms.append(perm)
+        perms.append(tuple(_reflect(c) for c in perm))
+        perm = tuple(_rotate(c) for c in perm)
+    return tuple(perms)
+
+
+# SYMMETRIES[s][cell] is where cell lands under symmetry s.
+SYMMETRIES = _symmetries()
+INVERSE = tuple(tuple(perm.index(c) for c in range(CELLS)) for perm in SYMMETRIES)
+
+def _permute_table(perm):
+    # Each mask is the mask without its lowest bit plus that bit moved.
+    table = [0] * (FULL + 1)
+    for mask in range(1, FULL + 1):
+        low = (mask & -mask).bit_length() - 1
+        table[mask] = table[mask & (mask - 1)] | 1 << perm[low]
+    return tuple(table)
+
+
+# PERMUTE[s][mask] applies symmetry s to a whole 9-bit mask.
+PERMUTE = tuple(_permute_table(perm) for perm in SYMMETRIES)
+EMPTIES = tuple(CELLS - bin(mask).count("1") for mask in range(FULL + 1))
+
+
+def canonical(x, o):
+    """Return (code, s): the smallest x | o << 9 over all symmetries and the one used."""
+    best, best_sym = None, 0
+    for s in range(8):
+        table = PERMUTE[s]
+        code = table[x] | table[o] << CELLS
+        if best is None or code < best:
+            best, best_sym = code, s
+    return best, best_sym
+
+
+def position_key(x, o, is_max, depth):
+    """Key a position; depths past the number of empty cells are all the same search."""
+    code, sym = canonical(x, o)
+    depth = min(depth, EMPTIES[x | o])
+    return code | is_max << 18 | depth << 19, sym
+
+
+def board_key(board, is_max, depth=CELLS):
+    """position_key for a list-of-rows board of "X"/"O"/" " cells."""
+    x = o = 0
+    for i in range(SIZE):
+        for j in range(SIZE):
+            cell = board[i][j]
+            if cell == "X":
+                x |= 1 << (i * SIZE + j)
+            elif cell == "O":
+                o |= 1 << (i * SIZE + j)
+    return position_key(x, o, is_max, depth)
+
+
+def bound_flag(score, alpha, beta):
+    if score <= alpha:
+        return UPPER
+    if score >= beta:
+        return LOWER
+    return EXACT
+
+
+def store_result(table, key, score, window, move=None):
+    """Store a fail-soft search result against the (alpha, beta) it was searched with.
+
+    A node entered with alpha >= beta only produced a one-sided bound of
+    unknown direction, so nothing is recorded for it.
+    """
+    alpha, beta = window
+    if alpha < beta:
+        table.store(key, bound_flag(score, alpha, beta), score, move)
+
+
+class TranspositionTable:
+    """Bounded LRU map from position key to (flag, score, canonical move).
+
+    Searches may run on worker threads, so updates are serialized by a lock.
+    """
+
+    def __init__(self, capacity=200_000):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def probe(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+    def store(self, key, flag, score, move=None):
+        entries = self.entries
+        with self.lock:
+            if key in entries:
+                entries.move_to_end(key)
+            elif len(entries) >= self.capacity:
+                entries.popitem(last=False)
+                self.evictions += 1
+            entries[key] = (flag, score, move)
+            self.stores += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.stores = self.evictions = 0
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / probes, 4) if probes else 0.0,
+        }
+
+
+# Shared by every search in the process.
+TABLE = TranspositionTable()
+
+
+def probe_window(table, key, alpha, beta):
+    """Apply a stored bound; returns (score or None, alpha, beta)."""
+    entry = table.probe(key)
+    if entry is None:
+        return None, alpha, beta
+    flag, score, _ = entry
+    if flag == EXACT:
+        return score, alpha, beta
+    if flag == LOWER:
+        alpha = max(alpha, score)
+    else:
+        beta = min(beta, score)
+    if alpha >= beta:
+        return score, alpha, beta
+    return None, alpha, beta
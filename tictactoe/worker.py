@@ -0,0 +1,78 @@
+"""Run AI searches off the Tk main thread.
+
+A search runs in a daemon thread and posts its result to a queue. The Tk
+loop polls that queue with root.after, so the window keeps repainting
+while the engine thinks. Starting a new search or calling cancel() makes
+any older result stale (it is dropped when it arrives) and sets the
+threading.Event handed to the search so engines that check it can stop
+early. An exception from the search goes to on_error on the Tk thread, so
+the caller can give the turn back instead of waiting for a result that
+never comes.
+"""
+
+import queue
+import threading
+
+
+class SearchWorker:
+    def __init__(self, root, poll_ms=20):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.results = queue.Queue()
+        self.job = 0
+        self.stop = None
+        self.callback = None
+        self.on_error = None
+        self.polling = None
+
+    def busy(self):
+        return self.callback is not None
+
+    def submit(self, search, callback, *args, on_error=None):
+        """Run search(*args, stop=event) in a thread and call callback(result) on the Tk thread.
+
+        If the search raises, on_error(exception) is called instead; without
+        on_error the exception is raised in the Tk callback.
+        """
+        self.cancel()
+        self.job += 1
+        job, stop = self.job, threading.Event()
+        self.stop, self.callback, self.on_error = stop, callback, on_error
+
+        def run():
+            try:
+                result = search(*args, stop=stop)
+            except Exception as exc:  # reported on the Tk thread
+                result = exc
+            self.results.put((job, result))
+
+        threading.Thread(target=run, daemon=True).start()
+        if self.polling is None:
+            self.polling = self.root.after(self.poll_ms, self.poll)
+        return job
+
+    def cancel(self):
+        if self.stop is not None:
+            self.stop.set()
+        self.stop = None
+        self.callback = None
+        self.on_error = None
+
+    def poll(self):
+        self.polling = None
+        while True:
+            try:
+                job, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if job == self.job and self.callback is not None:
+                callback, on_error = self.callback, self.on_error
+                self.callback = self.on_error = self.stop = None
+                if isinstance(result, Exception):
+                    if on_error is None:
+                        raise result
+                    on_error(result)
+                else:
+                    callback(result)
+        if self.callback is not None:
+            self.polling = self.root.after(self.poll_ms, self.poll)
@@ -1,48 +1,18 @@
 import tkinter as tk
 import time
-import random
 import os
-import pygame  # For sound effects
 
-# Initialize pygame mixer for sound
-pygame.mixer.init()
+from audio import SoundBank
+from typingtest.core import TEST_SECONDS, format_result, get_sentence, leaderboard, score
+
+# Sounds are decoded once; key repeats faster than 40 ms are coalesced
+SOUNDS = SoundBank(["typing.wav", "finish.wav"], channels=4, min_interval=0.04)
 
 def play_typing_sound():
-    try:
-        pygame.mixer.Sound("typing.wav").play()
-    except:
-        pass  # Skip if sound not found
+    SOUNDS.play("typing.wav")
 
 def play_finish_sound():
-    try:
-        pygame.mixer.Sound("finish.wav").play()
-    except:
-        pass
-
-# Sentences per level
-sentences = {
-    "Easy": [
-        "I love Python.",
-        "The sky is blue.",
-        "She drinks coffee.",
-        "He codes in Java.",
-        "They play chess."
-    ],
-    "Medium": [
-        "The programmer fixed a critical bug yesterday.",
-        "Typing fast requires regular practice and focus.",
-        "She managed to complete the project on time.",
-        "Learning algorithms can be fun and rewarding.",
-        "Streamlit is great for building quick apps."
-    ],
-    "Hard": [
-        "Understanding recursion requires thinking in layers.",
-        "Machine learning involves data preprocessing techniques.",
-        "Multithreading can lead to race conditions and deadlocks.",
-        "The database failed due to transaction isolation levels.",
-        "Typing accuracy and speed are equally important in tests."
-    ]
-}
+    SOUNDS.play("finish.wav")
 
 class TypingTest:
     def __init__(self, root):
@@ -96,8 +66,7 @@ class TypingTest:
         self.leaderboard_text.config(state=tk.DISABLED)
 
     def get_sentence(self):
-        level = self.level_var.get()
-        return random.choice(sentences[level])
+        return get_sentence(self.level_var.get())
 
     def start_typing(self):
         self.entry.delete("1.0", tk.END)
@@ -127,15 +96,11 @@ class TypingTest:
         play_finish_sound()
 
         typed_text = self.entry.get("1.0", tk.END).strip()
-        total_time = 60 - self.time_left
-        word_count = len(typed_text.split())
-        wpm = round(word_count / (total_time / 60)) if total_time > 0 else 0
-
+        total_time = TEST_SECONDS - self.time_left
         original = self.sentence_label.cget("text")
-        correct_chars = sum(1 for a, b in zip(typed_text, original) if a == b)
-        accuracy = round((correct_chars / len(original)) * 100, 2)
+        wpm, accuracy = score(typed_text, original, total_time)
 
-        result = f"{wpm} WPM | {accuracy}% Accuracy | Level: {self.level_var.get()}"
+        result = format_result(wpm, accuracy, self.level_var.get())
         self.result_label.config(text=result)
         self.save_result(result)
         self.update_history(result)
@@ -159,8 +124,7 @@ class TypingTest:
         try:
             with open("results.txt", "r") as file:
                 lines = file.readlines()
-            lines = sorted(lines, key=lambda x: int(x.split()[0]), reverse=True)
-            top = lines[:5]
+            top = leaderboard(lines)
         except:
             top = []
 
@@ -171,6 +135,8 @@ class TypingTest:
         self.leaderboard_text.config(state=tk.DISABLED)
 
 # Run app
-root = tk.Tk()
-app = TypingTest(root)
-root.mainloop()
+if __name__ == "__main__":
+    root = tk.Tk()
+    app = TypingTest(root)
+    root.after_idle(SOUNDS.preload)
+    root.mainloop()
@@ -0,0 +1 @@
+"""Tk-free scoring for the typing speed test."""
@@ -0,0 +1,52 @@
+"""Sentences and scoring for the typing test, importable without a window."""
+
+import random
+
+# Sentences per level
+SENTENCES = {
+    "Easy": [
+        "I love Python.",
+        "The sky is blue.",
+        "She drinks coffee.",
+        "He codes in Java.",
+        "They play chess."
+    ],
+    "Medium": [
+        "The programmer fixed a critical bug yesterday.",
+        "Typing fast requires regular practice and focus.",
+        "She managed to complete the project on time.",
+        "Learning algorithms can be fun and rewarding.",
+        "Streamlit is great for building quick apps."
+    ],
+    "Hard": [
+        "Understanding recursion requires thinking in layers.",
+        "Machine learning involves data preprocessing techniques.",
+        "Multithreading can lead to race conditions and deadlocks.",
+        "The database failed due to transaction isolation levels.",
+        "Typing accuracy and speed are equally important in tests."
+    ]
+}
+
+TEST_SECONDS = 60
+
+
+def get_sentence(level, rng=random):
+    return rng.choice(SENTENCES[level])
+
+
+def score(typed_text, original, total_time):
+    """(words per minute, accuracy %) for typed_text against original after total_time seconds."""
+    word_count = len(typed_text.split())
+    wpm = round(word_count / (total_time / 60)) if total_time > 0 else 0
+    correct_chars = sum(1 for a, b in zip(typed_text, original) if a == b)
+    accuracy = round((correct_chars / len(original)) * 100, 2)
+    return wpm, accuracy
+
+
+def format_result(wpm, accuracy, level):
+    return f"{wpm} WPM | {accuracy}% Accuracy | Level: {level}"
+
+
+def leaderboard(lines, n=5):
+    """The n fastest result lines, as written by format_result."""
+    return sorted(lines, key=lambda x: int(x.split()[0]), reverse=True)[:n]